@@ -0,0 +1,2 @@
+# Benchmarks module
+# This package contains performance benchmarks run from the command line
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""Pipeline throughput benchmark using the deterministic fake engine.
+
+Runs the full video pipeline (decode, silence detection, chunk planning,
+scheduling, caching and output) with a fake transcription engine of known
+latency, so the cost of everything around the model can be measured on any
+machine. Run from the repository root:
+
+    python -m benchmarks.pipeline_benchmark sample.mp4 --workers 1 2 4 --realtime-factor 0.05
+"""
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import yaml
+from pathlib import Path
+from typing import Dict, List, Optional
+
+def run_once(config: Dict, video: str) -> Dict:
+    """Process the video once and return its timing record"""
+    from video_processing.processor import VideoProcessor
+
+    processor = VideoProcessor(config=config)
+    processor.open_pool()
+    try:
+        started = time.perf_counter()
+        result = processor.process_video(video)
+        wall_time = time.perf_counter() - started
+    finally:
+        processor.close()
+    return {
+        'wall_time': wall_time,
+        'timings': dict(result.timings),
+        'rtf': result.real_time_factor,
+        'segments': len(result.segments)
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure pipeline throughput with the fake engine")
+    parser.add_argument("video", help="recording to process")
+    parser.add_argument("--config", default="config/settings.yaml", help="settings file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="worker counts to compare")
+    parser.add_argument("--latency", type=float, help="fake engine latency per call (seconds)")
+    parser.add_argument("--realtime-factor", type=float,
+                        help="fake engine latency per second of audio")
+    parser.add_argument("--with-cache", action="store_true",
+                        help="keep the transcription cache on and also time a warm second run")
+    parser.add_argument("--output", help="also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    from utils.logger.setup import setup_logging
+    setup_logging()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        base_config = yaml.safe_load(f)
+    video_config = base_config['video_processing']
+    engine_config = video_config.setdefault('engine', {})
+    engine_config['backend'] = 'fake'
+    fake_config = engine_config.setdefault('fake', {})
+    if args.latency is not None:
+        fake_config['latency'] = args.latency
+    if args.realtime_factor is not None:
+        fake_config['realtime_factor'] = args.realtime_factor
+    video_config.setdefault('checkpoint', {})['enabled'] = False
+
+    # 输出与缓存写入临时目录，不影响正式结果
+    scratch = Path(tempfile.mkdtemp(prefix="pipeline_benchmark_"))
+    report = []
+    try:
+        for workers in args.workers:
+            config = copy.deepcopy(base_config)
+            config['video_processing']['output_dir'] = str(scratch / "output")
+            config['video_processing']['temp_dir'] = str(scratch / "temp")
+            cache_config = config['video_processing'].setdefault('cache', {})
+            cache_config['enabled'] = args.with_cache
+            cache_config['dir'] = str(scratch / f"cache_{workers}")
+            config['video_processing'].setdefault('parallel', {})['workers'] = workers
+
+            record = {'workers': workers, 'cold': run_once(config, args.video)}
+            if args.with_cache:
+                record['warm'] = run_once(config, args.video)
+            report.append(record)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"{'workers':<9}{'wall(s)':>10}{'prepare':>10}{'transcribe':>12}{'RTF':>8}{'warm(s)':>10}")
+    for record in report:
+        cold = record['cold']
+        rtf = f"{cold['rtf']:.3f}" if cold['rtf'] is not None else "n/a"
+        warm = f"{record['warm']['wall_time']:.2f}" if 'warm' in record else "-"
+        print(f"{record['workers']:<9}{cold['wall_time']:>10.2f}"
+              f"{cold['timings'].get('prepare', 0.0):>10.2f}"
+              f"{cold['timings'].get('transcribe', 0.0):>12.2f}{rtf:>8}{warm:>10}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
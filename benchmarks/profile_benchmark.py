@@ -0,0 +1,143 @@
+"""Whisper inference profile benchmark: speed versus accuracy.
+
+Transcribes the same recording once per inference profile and reports the
+model load time, transcription time, real-time factor and error rate
+against a reference transcript. Only the profile varies: every run uses a
+single in-process model, decodes before transcribing, and skips the
+low-confidence retry and hallucination filter, which would change the
+scored text.
+Chinese text is scored per character (CER), other languages per word (WER).
+Run from the repository root:
+
+    python -m benchmarks.profile_benchmark sample.mp4 --reference sample.txt \
+        --profiles default fast_cpu
+"""
+import re
+import sys
+import copy
+import json
+import argparse
+import unicodedata
+import numpy as np
+import yaml
+from pathlib import Path
+from typing import Dict, List, Optional
+
+def tokenize(text: str, unit: str) -> List[str]:
+    """Normalise a transcript and split it into characters or words"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    # 去掉标点，标点差异不计入错误率
+    text = "".join(" " if unicodedata.category(ch).startswith("P") else ch for ch in text)
+    if unit == "char":
+        return [ch for ch in text if not ch.isspace()]
+    return re.findall(r"\S+", text)
+
+def edit_distance(reference: List[str], hypothesis: List[str]) -> int:
+    """Levenshtein distance between two token sequences, one row at a time"""
+    if not reference:
+        return len(hypothesis)
+    vocab: Dict[str, int] = {}
+    ref = np.array([vocab.setdefault(token, len(vocab)) for token in reference], dtype=np.int64)
+    hyp = np.array([vocab.setdefault(token, len(vocab)) for token in hypothesis], dtype=np.int64)
+    offsets = np.arange(len(hyp) + 1, dtype=np.int64)
+
+    row = offsets.copy()
+    for i, token in enumerate(ref, 1):
+        candidate = np.empty_like(row)
+        candidate[0] = i
+        # 替换与删除只依赖上一行，可整体向量化
+        candidate[1:] = np.minimum(row[:-1] + (hyp != token), row[1:] + 1)
+        # 插入：row[j] = min_k(candidate[k] + j - k)，用前缀最小值一次求出
+        row = np.minimum.accumulate(candidate - offsets) + offsets
+    return int(row[-1])
+
+def error_rate(reference: str, hypothesis: str, unit: str) -> float:
+    """Word (or character) error rate of hypothesis against reference"""
+    ref_tokens = tokenize(reference, unit)
+    hyp_tokens = tokenize(hypothesis, unit)
+    return edit_distance(ref_tokens, hyp_tokens) / max(1, len(ref_tokens))
+
+def run_profile(config: Dict, video: str, profile: str, use_cuda: bool) -> Dict:
+    """Transcribe the video with one profile and collect timing numbers"""
+    from video_processing.processor import VideoProcessor
+
+    config = copy.deepcopy(config)
+    config['video_processing']['whisper']['profile'] = profile
+    video_config = config['video_processing']
+    # 每次都完整转写，不读取缓存或检查点
+    video_config.setdefault('cache', {})['enabled'] = False
+    video_config.setdefault('checkpoint', {})['enabled'] = False
+    # 只比较推理配置本身：单进程转写（模型加载单独计时），解码不与转写重叠，
+    # 关闭会改写文本的重试与幻觉过滤
+    video_config.setdefault('parallel', {})['workers'] = 1
+    video_config.setdefault('pipeline', {})['enabled'] = False
+    video_config['whisper'].setdefault('retry', {})['enabled'] = False
+    video_config['whisper'].setdefault('hallucination', {})['enabled'] = False
+
+    processor = VideoProcessor(config=config, use_cuda=use_cuda)
+    try:
+        result = processor.process_video(video)
+    finally:
+        processor.close()
+    transcribe_time = result.timings.get('transcribe', 0.0)
+    return {
+        'profile': profile,
+        'load_time': result.timings.get('load_model', 0.0),
+        'transcribe_time': transcribe_time,
+        'timings': dict(result.timings),
+        'rtf': transcribe_time / result.audio_duration if result.audio_duration else None,
+        'text': result.get_full_text()
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare Whisper inference profiles on one recording")
+    parser.add_argument("video", help="recording to transcribe")
+    parser.add_argument("--reference", required=True, help="reference transcript (UTF-8 text)")
+    parser.add_argument("--profiles", nargs="+", help="profiles to compare (default: all configured)")
+    parser.add_argument("--config", default="config/settings.yaml", help="settings file")
+    parser.add_argument("--model", help="override models.whisper.model_size")
+    parser.add_argument("--cuda", action="store_true", help="use CUDA if available")
+    parser.add_argument("--unit", choices=["auto", "char", "word"], default="auto",
+                        help="error rate unit; auto uses characters for Chinese")
+    parser.add_argument("--output", help="also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    from utils.logger.setup import setup_logging
+    setup_logging()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    if args.model:
+        config['models']['whisper']['model_size'] = args.model
+
+    whisper_config = config['video_processing']['whisper']
+    profiles = args.profiles or list(whisper_config.get('profiles', {}).keys()) or ["default"]
+    unit = args.unit
+    if unit == "auto":
+        unit = "char" if whisper_config.get('language') in ("zh", "ja", "ko") else "word"
+    reference = Path(args.reference).read_text(encoding='utf-8')
+
+    report = []
+    for profile in profiles:
+        run = run_profile(config, args.video, profile, args.cuda)
+        run['error_rate'] = error_rate(reference, run.pop('text'), unit)
+        report.append(run)
+
+    # 加速比与 RTF 只按转写阶段计算，模型加载与量化单独列出
+    baseline = report[0]['transcribe_time']
+    label = "CER" if unit == "char" else "WER"
+    print(f"{'profile':<12}{'load(s)':>9}{'transcribe(s)':>15}{'RTF':>8}{'speedup':>9}{label:>8}")
+    for run in report:
+        rtf = f"{run['rtf']:.3f}" if run['rtf'] is not None else "n/a"
+        speedup = baseline / run['transcribe_time'] if run['transcribe_time'] else 0.0
+        print(f"{run['profile']:<12}{run['load_time']:>9.1f}{run['transcribe_time']:>15.1f}{rtf:>8}"
+              f"{speedup:>8.2f}x{run['error_rate']:>8.2%}")
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({'unit': unit, 'runs': report}, ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""GUI startup benchmark: measures import cost and time to first paint.
+
+Each run starts a fresh interpreter so module caches do not hide import
+cost. Run from the repository root:
+
+    python -m benchmarks.startup_benchmark --runs 5 --max-first-paint-ms 1500
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List
+
+RESULT_MARKER = "STARTUP_RESULT "
+
+# 首帧绘制前不应被导入的重量级模块
+HEAVY_MODULES = ["torch", "whisper", "aiohttp", "numpy"]
+
+CHILD_CODE = r'''
+import sys, time, json
+started = time.perf_counter()
+import gui.main_window
+from gui.main_window import MainWindow
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent
+imported = time.perf_counter()
+
+app = QApplication(sys.argv)
+window = MainWindow()
+painted = {}
+
+class PaintWatcher(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and 'at' not in painted:
+            painted['at'] = time.perf_counter()
+            # 记录首帧时刻已加载的模块，之后的后台加载不计入
+            painted['heavy'] = [name for name in HEAVY_MODULES if name in sys.modules]
+        return False
+
+watcher = PaintWatcher()
+window.installEventFilter(watcher)
+window.show()
+deadline = time.perf_counter() + 30
+while 'at' not in painted and time.perf_counter() < deadline:
+    app.processEvents()
+first_paint = painted.get('at', time.perf_counter())
+heavy = painted.get('heavy', [name for name in HEAVY_MODULES if name in sys.modules])
+print(RESULT_MARKER + json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_paint_ms': (first_paint - started) * 1000,
+    'heavy_modules': heavy
+}))
+sys.stdout.flush()
+'''
+
+def run_once(python: str) -> Dict:
+    """Start a fresh interpreter and measure one GUI startup"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    code = (f"RESULT_MARKER = {RESULT_MARKER!r}\n"
+            f"HEAVY_MODULES = {HEAVY_MODULES!r}\n" + CHILD_CODE)
+    completed = subprocess.run(
+        [python, "-c", code], capture_output=True, text=True, env=env, timeout=120
+    )
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"startup run failed:\n{completed.stderr[-2000:]}")
+
+def summarise(runs: List[Dict]) -> Dict:
+    """Aggregate run measurements into medians"""
+    heavy = sorted({name for run in runs for name in run['heavy_modules']})
+    return {
+        'runs': len(runs),
+        'import_ms_median': statistics.median(run['import_ms'] for run in runs),
+        'first_paint_ms_median': statistics.median(run['first_paint_ms'] for run in runs),
+        'first_paint_ms_max': max(run['first_paint_ms'] for run in runs),
+        'heavy_modules': heavy
+    }
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure GUI import and first-paint time")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh-process runs")
+    parser.add_argument("--python", default=sys.executable, help="interpreter to benchmark")
+    parser.add_argument("--max-import-ms", type=float, help="fail if the median import time exceeds this")
+    parser.add_argument("--max-first-paint-ms", type=float,
+                        help="fail if the median first-paint time exceeds this")
+    parser.add_argument("--allow-heavy", action="store_true",
+                        help="do not fail when heavy modules are imported before first paint")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.python) for _ in range(args.runs)]
+    report = summarise(runs)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    failures = []
+    if args.max_import_ms is not None and report['import_ms_median'] > args.max_import_ms:
+        failures.append(f"import {report['import_ms_median']:.0f}ms > {args.max_import_ms:.0f}ms")
+    if args.max_first_paint_ms is not None and report['first_paint_ms_median'] > args.max_first_paint_ms:
+        failures.append(
+            f"first paint {report['first_paint_ms_median']:.0f}ms > {args.max_first_paint_ms:.0f}ms"
+        )
+    if report['heavy_modules'] and not args.allow_heavy:
+        failures.append(f"heavy modules imported before first paint: {', '.join(report['heavy_modules'])}")
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
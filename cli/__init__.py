@@ -0,0 +1,2 @@
+# CLI module
+# This package contains headless command-line entry points
\ No newline at end of file
@@ -0,0 +1,213 @@
+import sys
+import json
+import glob
+import time
+import asyncio
+import argparse
+import yaml
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.logger.setup import setup_logging, get_logger
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mkv', '.mov', '.flv', '.webm', '.m4a', '.mp3', '.wav'}
+STAGES = ["cache", "load_model", "prepare", "transcribe", "output", "summary", "total"]
+
+def collect_videos(inputs: List[str], recursive: bool = False) -> List[Path]:
+    """Expand directories and glob patterns into a sorted, de-duplicated list of videos"""
+    videos = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = path.rglob("*") if recursive else path.glob("*")
+            videos.extend(p for p in candidates if p.suffix.lower() in VIDEO_EXTENSIONS)
+        elif any(ch in item for ch in "*?["):
+            videos.extend(Path(p) for p in glob.glob(item, recursive=recursive))
+        elif path.is_file():
+            videos.append(path)
+    return sorted({p.resolve() for p in videos if p.is_file()})
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m cli.batch",
+        description="Headless batch transcription (and optional summarisation) of videos"
+    )
+    parser.add_argument("inputs", nargs="+", help="video files, directories or glob patterns")
+    parser.add_argument("--config", default="config/settings.yaml", help="settings file")
+    parser.add_argument("--output", default="output/batch_results.jsonl",
+                        help="JSON-lines result file, '-' for stdout")
+    parser.add_argument("--recursive", action="store_true", help="search directories recursively")
+    parser.add_argument("--model", help="override models.whisper.model_size")
+    parser.add_argument("--profile", help="override video_processing.whisper.profile, e.g. fast_cpu")
+    parser.add_argument("--cuda", action="store_true", help="use CUDA if available")
+    parser.add_argument("--workers", type=int,
+                        help="transcription worker processes (overrides parallel.workers)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="videos processed concurrently, sharing the worker pool")
+    parser.add_argument("--summary-style", help="also summarise each transcript in this style, e.g. 技术博客")
+    parser.add_argument("--summary-length", type=int, default=300, help="summary length limit")
+    parser.add_argument("--no-summary-cache", action="store_true",
+                        help="bypass the LLM response cache and generate fresh summaries")
+    return parser.parse_args(argv)
+
+def load_config(args: argparse.Namespace) -> Dict:
+    """Load the settings file and apply command-line overrides"""
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    if args.model:
+        config['models']['whisper']['model_size'] = args.model
+    if args.profile:
+        config['video_processing']['whisper']['profile'] = args.profile
+    if args.workers is not None:
+        config['video_processing'].setdefault('parallel', {})['workers'] = args.workers
+    return config
+
+def format_timings(record: Dict) -> str:
+    """Render a one-line per-stage timing report"""
+    timings = record.get('timings', {})
+    stages = " ".join(f"{stage}={timings[stage]:.2f}s" for stage in STAGES if stage in timings)
+    rtf = record.get('rtf')
+    rtf_text = f"RTF={rtf:.3f}" if rtf is not None else "RTF=n/a"
+    return (f"[{record['status']}] {Path(record['video']).name} | "
+            f"audio={record.get('audio_duration', 0.0):.1f}s | {stages} | {rtf_text}")
+
+class BatchRunner:
+    """Runs the video (and summary) pipeline over many files with one model per worker"""
+
+    def __init__(self, args: argparse.Namespace, config: Dict):
+        from video_processing.parallel import resolve_pool_size, create_pool
+
+        self.logger = get_logger("batch")
+        self.args = args
+        self.config = config
+        self.use_cuda = args.cuda
+
+        # 整个批次共享一个转写进程池，每个工作进程只加载一次模型
+        workers, threads_per_worker = resolve_pool_size(config, self.use_cuda)
+        self.workers = workers
+        self.pool = create_pool(config, workers, threads_per_worker) if workers > 1 else None
+        self.duplicate_stems = set()
+        self.jobs = max(1, args.jobs)
+        if self.pool is None and self.jobs > 1:
+            # 进程内共享的模型不支持并发解码
+            self.logger.warning("单进程转写模式下不支持并发处理多个视频，--jobs 调整为 1")
+            self.jobs = 1
+
+    def process(self, video_path: Path) -> Dict:
+        """Process one video and return its JSON-serialisable record"""
+        from video_processing.processor import VideoProcessor
+
+        record = {'video': str(video_path), 'status': 'ok'}
+        processor = VideoProcessor(config=self.config, use_cuda=self.use_cuda)
+        processor.open_pool(self.pool, self.workers)
+        # 不同目录下的同名视频按路径区分输出文件，避免互相覆盖
+        output_name = processor.job_name(str(video_path)) if video_path.stem in self.duplicate_stems else None
+        try:
+            result = processor.process_video(str(video_path), output_name)
+            record.update({
+                'srt_path': str(result.srt_path),
+                'text_path': str(result.text_path),
+                'segments': len(result.segments),
+                'warnings': result.warnings,
+                'filtered': result.filtered,
+                'audio_duration': result.audio_duration,
+                'timings': dict(result.timings),
+                'rtf': result.real_time_factor
+            })
+            if self.args.summary_style:
+                record['summary'] = self._summarise(result.get_full_text(), record['timings'])
+        except Exception as e:
+            self.logger.error(f"处理失败：{video_path} - {str(e)}")
+            record.update({'status': 'error', 'error': str(e)})
+        finally:
+            processor.close()
+        return record
+
+    async def _generate(self, summary_processor, text: str, config):
+        # asyncio.run 结束时会关闭事件循环，连接池需在此之前关闭
+        try:
+            return await summary_processor.generate_summary(text, config)
+        finally:
+            await summary_processor.close()
+
+    def _summarise(self, text: str, timings: Dict) -> Dict:
+        from text_summarization.processor import SummaryProcessor
+        from text_summarization.models import SummaryConfig, SummaryStyle
+
+        started = time.perf_counter()
+        try:
+            # 每个任务使用独立的处理器，避免并发任务共享 processing 状态
+            summary_processor = SummaryProcessor(self.args.config)
+            config = SummaryConfig(
+                style=SummaryStyle.from_display_name(self.args.summary_style),
+                max_length=self.args.summary_length,
+                use_cache=not self.args.no_summary_cache
+            )
+            summary = asyncio.run(self._generate(summary_processor, text, config))
+            return summary.to_dict()
+        except Exception as e:
+            self.logger.error(f"生成摘要失败：{str(e)}")
+            return {'error': str(e)}
+        finally:
+            timings['summary'] = time.perf_counter() - started
+
+    def run(self, videos: List[Path], output) -> List[Dict]:
+        """Process all videos, writing one JSON line per video as it completes"""
+        records = []
+        stems = Counter(video.stem for video in videos)
+        self.duplicate_stems = {stem for stem, count in stems.items() if count > 1}
+        for stem in sorted(self.duplicate_stems):
+            self.logger.warning(f"多个视频同名（{stem}），输出文件名附加路径哈希以区分")
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                futures = [executor.submit(self.process, video) for video in videos]
+                for future in as_completed(futures):
+                    record = future.result()
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    output.flush()
+                    print(format_timings(record), file=sys.stderr)
+                    records.append(record)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(wait=True, cancel_futures=True)
+        return records
+
+def print_totals(records: List[Dict], wall_time: float):
+    """Print batch-level throughput numbers to stderr"""
+    succeeded = [r for r in records if r['status'] == 'ok']
+    audio_total = sum(r.get('audio_duration', 0.0) for r in succeeded)
+    summary = (f"完成 {len(succeeded)}/{len(records)} 个视频，"
+               f"音频总时长 {audio_total:.1f}s，墙钟时间 {wall_time:.1f}s")
+    if audio_total:
+        summary += f"，整体RTF={wall_time / audio_total:.3f}"
+    print(summary, file=sys.stderr)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    setup_logging()
+    logger = get_logger("batch")
+
+    videos = collect_videos(args.inputs, args.recursive)
+    if not videos:
+        logger.error(f"未找到视频文件：{' '.join(args.inputs)}")
+        return 2
+    logger.info(f"批处理开始：共{len(videos)}个视频")
+
+    config = load_config(args)
+    started = time.perf_counter()
+    runner = BatchRunner(args, config)
+
+    if args.output == "-":
+        records = runner.run(videos, sys.stdout)
+    else:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as output:
+            records = runner.run(videos, output)
+
+    print_totals(records, time.perf_counter() - started)
+    return 0 if all(r['status'] == 'ok' for r in records) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
 import sys
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
 from gui.main_window import MainWindow
+from video_processing.registry import preload_whisper_model
 from utils.logger.setup import setup_logging, show_log_window, get_logger
 
 def main():
@@ -19,6 +21,9 @@ def main():
         main_window.show()
         logger.info("主窗口已显示")
         
+        # 首帧绘制后再在后台预热Whisper模型，避免首次处理时等待加载
+        QTimer.singleShot(0, preload_whisper_model)
+        
         # 显示日志窗口
         show_log_window()
         logger.info("日志窗口已显示")
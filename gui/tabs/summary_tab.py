@@ -1,4 +1,6 @@
+import time
 import asyncio
+import threading
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QGroupBox, QHBoxLayout, QComboBox,
@@ -7,7 +9,6 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import QThread, pyqtSignal, Qt
 
-from text_summarization.processor import SummaryProcessor
 from text_summarization.models import SummaryConfig, SummaryStyle
 from text_summarization.exceptions import TextSummarizationError
 from utils.logger.setup import get_logger
@@ -16,39 +17,69 @@ from utils.logger.setup import get_logger
 GOOD_STYLE = "QProgressBar::chunk { background-color: #4CAF50; }"
 BAD_STYLE = "QProgressBar::chunk { background-color: #f44336; }"
 
+# 流式输出时合并词元，最多每隔这么多秒刷新一次文本框
+TOKEN_FLUSH_INTERVAL = 0.1
+
 class SummaryWorker(QThread):
     """Worker thread for summary generation"""
     finished = pyqtSignal(object)  # SummaryResult or Exception
     progress = pyqtSignal(float, str)  # progress value and status message
+    tokens = pyqtSignal(int, str)  # generation attempt and newly streamed text
 
-    def __init__(self, processor, text, config):
+    def __init__(self, processor, text, config, loop):
         super().__init__()
         self.processor = processor
         self.text = text
         self.config = config
+        self.loop = loop
+        self._future = None
+        self._buffer = []
+        self._attempt = 0
+        self._last_flush = 0.0
+
+    def _on_token(self, attempt: int, chunk: str):
+        """Collect streamed chunks and emit them in batches"""
+        if attempt != self._attempt:
+            self._flush()
+            self._attempt = attempt
+        self._buffer.append(chunk)
+        if time.monotonic() - self._last_flush >= TOKEN_FLUSH_INTERVAL:
+            self._flush()
 
-    async def _generate(self):
-        """Generate summary asynchronously"""
-        return await self.processor.generate_summary(self.text, self.config)
+    def _flush(self):
+        if self._buffer:
+            self.tokens.emit(self._attempt, "".join(self._buffer))
+            self._buffer = []
+        self._last_flush = time.monotonic()
 
     def run(self):
         """Run the worker thread"""
         try:
-            # 创建新的事件循环
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self._generate())
-            loop.close()
+            # 在标签页共享的事件循环中运行，使 Ollama 连接池在多次生成之间复用
+            self._future = asyncio.run_coroutine_threadsafe(
+                self.processor.generate_summary(self.text, self.config, on_token=self._on_token),
+                self.loop
+            )
+            result = self._future.result()
+            self._flush()
             self.finished.emit(result)
         except Exception as e:
             self.finished.emit(e)
 
+    def cancel(self):
+        """Cancel the running request"""
+        if self._future is not None:
+            self._future.cancel()
+
 class SummaryTab(QWidget):
     def __init__(self):
         super().__init__()
         self.logger = get_logger("gui.summary_tab")
-        self.processor = SummaryProcessor()
+        self._processor = None  # 首次生成总结时再创建，避免启动时加载配置和模板
+        self._loop = None  # 总结请求共用的事件循环，在后台线程中常驻
         self.current_worker = None
+        self._stream_attempt = None  # 文本框当前显示的生成尝试序号
+        self._last_request = None  # 上一次生成的（文本、风格、字数限制）
         self.init_ui()
         self.setup_connections()
     
@@ -142,15 +173,43 @@ class SummaryTab(QWidget):
         """Setup signal connections"""
         self.generate_button.clicked.connect(self.generate_summary)
         self.cancel_button.clicked.connect(self.cancel_generation)
-        
-        # 连接处理器的进度回调
-        self.processor.set_progress_callback(self.update_progress)
+    
+    @property
+    def processor(self):
+        """Create the summary processor on first use"""
+        if self._processor is None:
+            from text_summarization.processor import SummaryProcessor
+
+            self._processor = SummaryProcessor()
+            # 连接处理器的进度回调
+            self._processor.set_progress_callback(self.update_progress)
+        return self._processor
+    
+    @property
+    def loop(self):
+        """Start the background event loop on first use"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="summary-loop", daemon=True).start()
+        return self._loop
     
     def update_progress(self, value: float, status: str):
         """Update progress bar"""
         self.progress_bar.setValue(int(value * 100))
         self.progress_bar.setFormat(f"{int(value * 100)}% - {status}")
     
+    def append_summary(self, attempt: int, text: str):
+        """Append streamed summary text, starting over when a new attempt begins"""
+        if self.sender() is not self.current_worker:
+            return
+        if attempt != self._stream_attempt:
+            self._stream_attempt = attempt
+            self.summary_text.clear()
+        cursor = self.summary_text.textCursor()
+        cursor.movePosition(cursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.summary_text.setTextCursor(cursor)
+    
     def update_metrics(self, result):
         """Update quality metrics display"""
         self.info_retention.setValue(int(result.metrics.info_retention * 100))
@@ -184,19 +243,27 @@ class SummaryTab(QWidget):
             
             # 准备配置
             style = SummaryStyle.from_display_name(self.style_combo.currentText())
+            text = video_tab.current_result.get_full_text()
+            # 对同一内容再次点击生成表示想要新的结果，此时跳过响应缓存
+            request = (text, style, self.word_limit.value())
             config = SummaryConfig(
                 style=style,
-                max_length=self.word_limit.value()
+                max_length=self.word_limit.value(),
+                use_cache=request != self._last_request
             )
+            self._last_request = request
             
             # 创建并启动工作线程
             self.current_worker = SummaryWorker(
                 self.processor,
-                video_tab.current_result.get_full_text(),
-                config
+                text,
+                config,
+                self.loop
             )
             self.current_worker.progress.connect(self.update_progress)
+            self.current_worker.tokens.connect(self.append_summary)
             self.current_worker.finished.connect(self.handle_result)
+            self._stream_attempt = None
             
             # 更新UI状态
             self.generate_button.setEnabled(False)
@@ -212,6 +279,9 @@ class SummaryTab(QWidget):
     
     def handle_result(self, result):
         """Handle summary generation result"""
+        if self.sender() is not self.current_worker:
+            return  # 已取消的任务
+        
         self.generate_button.setEnabled(True)
         self.cancel_button.setEnabled(False)
         
@@ -234,7 +304,8 @@ class SummaryTab(QWidget):
     def cancel_generation(self):
         """Cancel ongoing summary generation"""
         if self.current_worker:
-            self.processor.cancel_processing()
+            self._processor.cancel_processing()
+            self.current_worker.cancel()
             self.current_worker.quit()
             self.current_worker = None
         
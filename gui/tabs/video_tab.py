@@ -1,19 +1,33 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QHBoxLayout, 
                                     QLineEdit, QPushButton, QFileDialog, QProgressBar, 
                                     QLabel, QTextEdit, QComboBox, QSpinBox, QCheckBox,
-                                    QMessageBox)
-from PyQt6.QtCore import QThread, pyqtSignal
+                                    QMessageBox, QApplication)
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor
 from pathlib import Path
+from typing import TYPE_CHECKING
+import json
 import traceback
-from video_processing.processor import VideoProcessor
-from video_processing.exceptions import VideoProcessingError
+from utils.logger.setup import get_logger
+
+# video_processing 会间接导入 numpy/torch/whisper，延迟到首次使用时再导入以加快启动
+if TYPE_CHECKING:
+    from video_processing.processor import VideoProcessor
+
+class CudaProbeThread(QThread):
+    """Probe CUDA availability off the UI thread, since importing torch is slow"""
+    probed = pyqtSignal(bool)
+
+    def run(self):
+        from video_processing.processor import VideoProcessor
+        self.probed.emit(VideoProcessor.is_cuda_available())
 
 class VideoProcessingThread(QThread):
     progress_updated = pyqtSignal(float, str)
     processing_finished = pyqtSignal(object)
     processing_error = pyqtSignal(str)
 
-    def __init__(self, processor: VideoProcessor, video_path: str):
+    def __init__(self, processor: "VideoProcessor", video_path: str):
         super().__init__()
         self.processor = processor
         self.video_path = video_path
@@ -32,10 +46,25 @@ class VideoProcessingThread(QThread):
 class VideoTab(QWidget):
     def __init__(self):
         super().__init__()
+        self.logger = get_logger("gui.video_tab")
         self.processor = None
+        # 应用生命周期内常驻的转写进程池，各工作进程只加载一次模型
+        self.pool = None
+        self.pool_workers = 1
+        self.pool_key = None
         self.processing_thread = None
         self.current_result = None  # 存储当前处理结果
+        self.transcript_tail = None
+        self.cuda_available = False
+        self.tail_timer = QTimer(self)
+        self.tail_timer.setInterval(1000)
+        self.tail_timer.timeout.connect(self.tail_transcript)
         self.init_ui()
+        # 首帧绘制后在后台检测CUDA（需要导入torch），不阻塞窗口显示
+        self.cuda_probe = CudaProbeThread(self)
+        self.cuda_probe.probed.connect(self.cuda_detected)
+        QTimer.singleShot(0, self.cuda_probe.start)
+        QApplication.instance().aboutToQuit.connect(self.shutdown_pool)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -67,17 +96,21 @@ class VideoTab(QWidget):
         model_layout.addWidget(self.model_combo)
         options_layout.addLayout(model_layout)
         
+        # Inference Profile Selection
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("推理配置:"))
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItem("标准精度", "default")
+        self.profile_combo.addItem("CPU快速（int8量化）", "fast_cpu")
+        self.profile_combo.setToolTip("CPU快速模式对模型线性层做int8量化并使用贪心解码，速度更快但准确率略有下降")
+        profile_layout.addWidget(self.profile_combo)
+        options_layout.addLayout(profile_layout)
+        
         # CUDA Acceleration Option
         cuda_layout = QHBoxLayout()
         self.use_cuda = QCheckBox("使用CUDA加速")
-        # 检查CUDA是否可用
-        cuda_available = VideoProcessor.is_cuda_available()
-        self.use_cuda.setEnabled(cuda_available)
-        if not cuda_available:
-            self.use_cuda.setToolTip("当前系统不支持CUDA加速")
-        else:
-            self.use_cuda.setToolTip("使用GPU加速处理（推荐）")
-            self.use_cuda.setChecked(True)  # 如果CUDA可用，默认启用
+        self.use_cuda.setEnabled(False)
+        self.use_cuda.setToolTip("正在检测CUDA...")
         cuda_layout.addWidget(self.use_cuda)
         options_layout.addLayout(cuda_layout)
         
@@ -136,6 +169,51 @@ class VideoTab(QWidget):
         
         self.setLayout(layout)
     
+    def cuda_detected(self, available: bool):
+        """Update the CUDA option once the background probe has finished"""
+        self.cuda_available = available
+        self.use_cuda.setEnabled(self.cuda_available and self.start_button.isEnabled())
+        if not self.cuda_available:
+            self.use_cuda.setToolTip("当前系统不支持CUDA加速")
+        else:
+            self.use_cuda.setToolTip("使用GPU加速处理（推荐）")
+            self.use_cuda.setChecked(True)  # 如果CUDA可用，默认启用
+
+    def create_processor(self) -> "VideoProcessor":
+        """Create a processor configured from the current UI options"""
+        from video_processing.processor import VideoProcessor
+
+        processor = VideoProcessor(use_cuda=self.use_cuda.isChecked())
+        processor.config['models']['whisper']['model_size'] = self.model_combo.currentText()
+        processor.config['video_processing']['whisper']['profile'] = self.profile_combo.currentData()
+        processor.config['video_processing']['whisper']['confidence_threshold'] = self.confidence_threshold.value() / 100
+        return processor
+
+    def prepare_pool(self, processor: "VideoProcessor"):
+        """Attach the persistent pool to processor, rebuilding it only when the options changed"""
+        from video_processing.parallel import resolve_pool_size, create_pool
+
+        workers, threads_per_worker = resolve_pool_size(processor.config, processor.use_cuda)
+        if workers <= 1:
+            return
+        # 进程池在首次转写时才创建，避免启动即为每个进程加载一份模型；
+        # 工作进程按创建时的配置加载模型，配置（如模型、推理配置）变化后才重建
+        key = json.dumps(processor.config, sort_keys=True, default=str)
+        if key != self.pool_key:
+            self.shutdown_pool()
+            self.logger.info(f"启动常驻转写进程池：{workers}个进程，每进程{threads_per_worker}个线程")
+            self.pool = create_pool(processor.config, workers, threads_per_worker)
+            self.pool_workers = workers
+            self.pool_key = key
+        processor.open_pool(self.pool, self.pool_workers)
+
+    def shutdown_pool(self):
+        """Shut down the persistent pool without waiting for workers still loading"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = None
+        self.pool_key = None
+
     def browse_video(self):
         file_name, _ = QFileDialog.getOpenFileName(
             self,
@@ -156,12 +234,11 @@ class VideoTab(QWidget):
             QMessageBox.warning(self, "错误", "所选视频文件不存在")
             return
 
-        # 创建处理器实例，传入CUDA选项
-        self.processor = VideoProcessor(use_cuda=self.use_cuda.isChecked())
-        
-        # Update processor configuration based on UI settings
-        self.processor.config['models']['whisper']['model_size'] = self.model_combo.currentText()
-        self.processor.config['video_processing']['whisper']['confidence_threshold'] = self.confidence_threshold.value() / 100
+        from video_processing.writers import TranscriptTail
+
+        # 创建处理器实例（CUDA与模型选项取自界面），并复用常驻进程池
+        self.processor = self.create_processor()
+        self.prepare_pool(self.processor)
 
         # Disable UI elements
         self.start_button.setEnabled(False)
@@ -169,10 +246,16 @@ class VideoTab(QWidget):
         self.video_path.setEnabled(False)
         self.browse_button.setEnabled(False)
         self.model_combo.setEnabled(False)
+        self.profile_combo.setEnabled(False)
         self.confidence_threshold.setEnabled(False)
         self.auto_split.setEnabled(False)
         self.use_cuda.setEnabled(False)
 
+        # 实时显示已写出的转写文本
+        self.transcription_text.clear()
+        self.transcript_tail = TranscriptTail(self.processor.output_paths(video_path)[1])
+        self.tail_timer.start()
+
         # Start processing in a separate thread
         self.processing_thread = VideoProcessingThread(self.processor, video_path)
         self.processing_thread.progress_updated.connect(self.update_progress)
@@ -186,6 +269,20 @@ class VideoTab(QWidget):
             self.cancel_button.setEnabled(False)
             self.status_label.setText("正在取消...")
 
+    def tail_transcript(self):
+        """Append text written to the transcript file since the last poll"""
+        if self.transcript_tail is None:
+            return
+        text = self.transcript_tail.read_new()
+        if text:
+            self.transcription_text.moveCursor(QTextCursor.MoveOperation.End)
+            self.transcription_text.insertPlainText(text)
+
+    def stop_tailing(self):
+        """Stop polling the transcript file"""
+        self.tail_timer.stop()
+        self.transcript_tail = None
+
     def update_progress(self, progress: float, status: str):
         self.progress_bar.setValue(int(progress * 100))
         self.status_label.setText(status)
@@ -193,6 +290,7 @@ class VideoTab(QWidget):
     def processing_complete(self, result):
         # Save the result
         self.current_result = result
+        self.stop_tailing()
         
         # Re-enable UI elements
         self.start_button.setEnabled(True)
@@ -200,9 +298,10 @@ class VideoTab(QWidget):
         self.video_path.setEnabled(True)
         self.browse_button.setEnabled(True)
         self.model_combo.setEnabled(True)
+        self.profile_combo.setEnabled(True)
         self.confidence_threshold.setEnabled(True)
         self.auto_split.setEnabled(True)
-        self.use_cuda.setEnabled(VideoProcessor.is_cuda_available())
+        self.use_cuda.setEnabled(self.cuda_available)
 
         # Display results
         self.transcription_text.setText(result.get_full_text())
@@ -226,6 +325,7 @@ class VideoTab(QWidget):
     def processing_error(self, error_msg: str):
         # Clear current result
         self.current_result = None
+        self.stop_tailing()
         
         # Re-enable UI elements
         self.start_button.setEnabled(True)
@@ -233,9 +333,10 @@ class VideoTab(QWidget):
         self.video_path.setEnabled(True)
         self.browse_button.setEnabled(True)
         self.model_combo.setEnabled(True)
+        self.profile_combo.setEnabled(True)
         self.confidence_threshold.setEnabled(True)
         self.auto_split.setEnabled(True)
-        self.use_cuda.setEnabled(VideoProcessor.is_cuda_available())
+        self.use_cuda.setEnabled(self.cuda_available)
 
         # Reset progress
         self.progress_bar.setValue(0)
@@ -0,0 +1,81 @@
+from video_processing.hallucination import HallucinationFilter
+from video_processing.models import SegmentStore, TranscriptionSegment
+
+def _store(*texts, compression_ratio=1.5, no_speech_prob=0.1, avg_logprob=-0.3):
+    return SegmentStore.from_segments(
+        TranscriptionSegment(start=float(i), end=float(i) + 1.0, text=text, avg_logprob=avg_logprob,
+                             no_speech_prob=no_speech_prob, compression_ratio=compression_ratio)
+        for i, text in enumerate(texts)
+    )
+
+def test_compression_ratio_above_threshold_is_dropped():
+    store = _store("looping text", "normal text")
+    store.compression_ratio[0] = 2.5
+    hallucination_filter = HallucinationFilter(compression_ratio_threshold=2.4)
+    assert hallucination_filter.apply(store).texts == ["normal text"]
+    assert hallucination_filter.report.reasons == {"compression_ratio": 1}
+
+def test_no_speech_needs_low_logprob_too():
+    store = _store("thanks for watching", "quiet but real", "clear speech")
+    store.no_speech_prob[:2] = 0.9
+    store.avg_logprob[0] = -1.5
+    assert HallucinationFilter().apply(store).texts == ["quiet but real", "clear speech"]
+
+def test_repeated_ngrams_within_a_segment():
+    looping = "we will be right back " * 6
+    varied = "the quick brown fox jumps over the lazy dog near the river bank today"
+    short = "yes yes yes yes yes"  # 少于 min_ngrams 个 n 元组，不做判断
+    hallucination_filter = HallucinationFilter(ngram=3, min_ngrams=8, max_repeat_ratio=0.5)
+    assert hallucination_filter.apply(_store(looping, varied, short)).texts == [varied, short]
+    assert hallucination_filter.report.reasons == {"repeated_ngrams": 1}
+
+def test_ngrams_are_counted_per_segment():
+    # 只统计同一段内的重复，与前一段相同的 n 元组不算
+    half = "one two three four five six seven eight nine ten"
+    assert HallucinationFilter(min_ngrams=8).apply(_store(half, half + " eleven")).texts == [
+        half, half + " eleven"
+    ]
+
+def test_repeated_ngrams_in_character_languages():
+    looping = "谢谢观看" * 5
+    hallucination_filter = HallucinationFilter(language="zh", min_ngrams=8)
+    assert hallucination_filter.apply(_store(looping, "今天天气很好我们出去散步吧")).texts == [
+        "今天天气很好我们出去散步吧"
+    ]
+
+def test_consecutive_repeats_beyond_the_limit_are_dropped():
+    store = _store("Thank you.", "thank you", "Thank you!", "Thank you.", "Next line", "Thank you.")
+    hallucination_filter = HallucinationFilter(max_consecutive=2)
+    assert hallucination_filter.apply(store).texts == ["Thank you.", "thank you", "Next line", "Thank you."]
+    assert hallucination_filter.report.reasons == {"repeated_segments": 2}
+
+def test_consecutive_repeats_carry_across_batches():
+    hallucination_filter = HallucinationFilter(max_consecutive=2)
+    assert hallucination_filter.apply(_store("again", "again")).texts == ["again", "again"]
+    assert hallucination_filter.apply(_store("again", "new")).texts == ["new"]
+    assert hallucination_filter.apply(_store("new", "other")).texts == ["new", "other"]
+
+def test_empty_segments_are_not_repeats():
+    assert HallucinationFilter(max_consecutive=1).apply(_store("", "", "")).texts == ["", "", ""]
+
+def test_report_counts_each_segment_once():
+    store = _store("we will be right back " * 6, "fine")
+    store.compression_ratio[0] = 3.0
+    hallucination_filter = HallucinationFilter()
+    hallucination_filter.apply(store)
+    report = hallucination_filter.report.to_dict()
+    assert report['segments'] == 1
+    assert report['characters'] == len("we will be right back " * 6)
+    assert report['reasons'] == {"compression_ratio": 1}
+
+def test_from_config():
+    config = {'video_processing': {'whisper': {
+        'language': 'zh', 'no_speech_threshold': 0.7,
+        'hallucination': {'max_consecutive': 3}
+    }}}
+    hallucination_filter = HallucinationFilter.from_config(config)
+    assert hallucination_filter.by_character
+    assert hallucination_filter.no_speech_threshold == 0.7
+    assert hallucination_filter.max_consecutive == 3
+    config['video_processing']['whisper']['hallucination']['enabled'] = False
+    assert HallucinationFilter.from_config(config) is None
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from video_processing.models import ProcessingResult, SegmentStore, TranscriptionSegment
+
+def _segments(count=40):
+    rng = np.random.default_rng(0)
+    segments = []
+    start = 3590.0  # 跨越一小时，覆盖时、分、秒、毫秒各位
+    for index in range(count):
+        length = float(rng.uniform(0.5, 4.0))
+        segments.append(TranscriptionSegment(
+            start=start, end=start + length,
+            text="" if index == 7 else f"第{index}句 segment {index}",
+            avg_logprob=float(rng.uniform(-1.5, 0.0)),
+            no_speech_prob=float(rng.uniform(0.0, 1.0)),
+            compression_ratio=float(rng.uniform(1.0, 3.0)),
+            needs_review=index % 5 == 0
+        ))
+        start += length + float(rng.uniform(0.0, 0.999))
+    return segments
+
+def _legacy_srt(segments):
+    # 改为列式存储之前 ProcessingResult.get_srt_content 的实现
+    srt_content = []
+    for i, segment in enumerate(segments, 1):
+        start = ProcessingResult._format_time(segment.start)
+        end = ProcessingResult._format_time(segment.end)
+        srt_content.extend([str(i), f"{start} --> {end}", segment.text, ""])
+    return "\n".join(srt_content)
+
+def test_segments_round_trip():
+    segments = _segments()
+    store = SegmentStore.from_segments(segments)
+    assert len(store) == len(segments)
+    assert list(store) == segments
+    assert store[-1] == segments[-1]
+    assert list(SegmentStore.from_records(store.to_records())) == segments
+    with pytest.raises(IndexError):
+        store[len(segments)]
+
+def test_append_and_extend_grow_past_capacity():
+    segments = _segments(100)
+    store = SegmentStore()
+    for segment in segments[:30]:
+        store.append(segment)
+    store.extend(SegmentStore.from_segments(segments[30:60]))
+    store.extend(segments[60:])
+    assert list(store) == segments
+    assert store.texts == [segment.text for segment in segments]
+
+def test_slices_and_masks_return_stores():
+    segments = _segments()
+    store = SegmentStore.from_segments(segments)
+    assert list(store[5:15]) == segments[5:15]
+    assert list(store[[3, 1, 2]]) == [segments[3], segments[1], segments[2]]
+    mask = store.confidence > 0.5
+    assert list(store.filter(mask)) == [s for s in segments if s.confidence > 0.5]
+    assert list(store[mask]) == list(store.filter(mask))
+    np.testing.assert_allclose(store.confidence, [s.confidence for s in segments])
+    with pytest.raises(ValueError):
+        store.filter(mask[:-1])
+
+def test_srt_matches_the_previous_serialiser():
+    segments = _segments()
+    result = ProcessingResult(video_path="video.mp4", segments=segments)
+    # 唯一的差别是末尾多一个空行，与流式写出的 SRT 保持一致
+    assert result.get_srt_content() == _legacy_srt(segments) + "\n"
+    assert result.get_full_text() == "\n".join(segment.text for segment in segments)
+
+def test_srt_numbering_and_empty_store():
+    segments = _segments(3)
+    store = SegmentStore.from_segments(segments)
+    assert store.to_srt(first_index=11).startswith("11\n")
+    assert SegmentStore().to_srt() == ""
+    assert SegmentStore().to_text() == ""
+    assert ProcessingResult(video_path="video.mp4", segments=[]).get_srt_content() == _legacy_srt([])
@@ -0,0 +1,43 @@
+import re
+from text_summarization.splitter import pack_units, split_text
+from utils.text import estimate_tokens
+
+def _content(chunks):
+    return re.sub(r"\s", "", "".join(chunks))
+
+def test_short_text_is_one_chunk():
+    assert split_text("第一句\n\nsecond line\n", 100) == ["第一句\nsecond line"]
+    assert split_text("", 100) == []
+
+def test_lines_are_packed_in_order_within_budget():
+    lines = [f"第{i}段转写内容，包含一些中文和 some English words {i}" for i in range(200)]
+    chunks = split_text("\n".join(lines), 120)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 120 for chunk in chunks)
+    # 未超出预算的行保持完整，不被拆到两个块中
+    assert [line for chunk in chunks for line in chunk.split("\n")] == lines
+
+def test_oversized_line_is_split_on_sentences():
+    # 英文句点后需有空白才断句，避免切开 3.5 这样的数字
+    sentences = ["今天我们讨论第一个问题。", "然后是第二个问题！", "This costs 3.5 dollars. ", "最后总结？"]
+    chunks = split_text("".join(sentences), 12)
+    assert all(estimate_tokens(chunk) <= 12 for chunk in chunks)
+    pieces = [piece for chunk in chunks for piece in chunk.split("\n")]
+    assert pieces == [sentence.strip() for sentence in sentences]
+
+def test_unpunctuated_text_is_cut_by_characters():
+    cjk = "没有标点的长句" * 20
+    chunks = split_text(cjk, 10)
+    assert all(estimate_tokens(chunk) <= 10 for chunk in chunks)
+    assert _content(chunks) == cjk
+
+    latin = "x" * 400
+    chunks = split_text(latin, 10)
+    assert all(estimate_tokens(chunk) <= 10 for chunk in chunks)
+    assert _content(chunks) == latin
+
+def test_pack_units_uses_the_separator():
+    partials = ["摘要一" * 10, "摘要二" * 10, "摘要三" * 10]
+    groups = pack_units(partials, 65, "\n\n")
+    assert groups == [partials[0] + "\n\n" + partials[1], partials[2]]
+    assert pack_units(["  ", ""], 10) == []
@@ -0,0 +1,67 @@
+from video_processing.models import AudioChunk, TranscriptionSegment
+from video_processing.stitching import TranscriptStitcher, stitch_chunks
+
+def _segment(start, end, text, avg_logprob=-0.2):
+    return TranscriptionSegment(start=start, end=end, text=text, avg_logprob=avg_logprob,
+                                no_speech_prob=0.0, compression_ratio=1.2)
+
+def _chunks(overlap=2.0):
+    # 两块在 30 秒处相接，各自向对方多解码 overlap 秒
+    return [AudioChunk(index=0, start=0.0, end=30.0, tail=overlap),
+            AudioChunk(index=1, start=30.0, end=60.0, lead=overlap)]
+
+def test_repeated_words_at_the_seam_are_merged():
+    left = [_segment(0.0, 10.0, "hello there"),
+            _segment(26.0, 31.5, "we are going to the park today", avg_logprob=-0.3)]
+    right = [_segment(28.5, 33.0, "going to the park today and then", avg_logprob=-0.5),
+             _segment(33.0, 40.0, "home again")]
+    segments = stitch_chunks(_chunks(), [left, right], language="en")
+    assert [s.text for s in segments] == [
+        "hello there", "we are going to the park today and then", "home again"
+    ]
+    merged = segments[1]
+    assert (merged.start, merged.end, merged.avg_logprob) == (26.0, 33.0, -0.5)
+
+def test_alignment_ignores_case_and_punctuation():
+    left = [_segment(27.0, 31.0, "So we went to the")]
+    right = [_segment(29.0, 34.0, "We went to the market.")]
+    segments = stitch_chunks(_chunks(), [left, right], language="en")
+    assert [s.text for s in segments] == ["So we went to the market."]
+
+def test_character_languages_align_by_character():
+    left = [_segment(27.0, 31.0, "今天我们去公园玩")]
+    right = [_segment(29.0, 34.0, "我们去公园玩然后回家")]
+    segments = stitch_chunks(_chunks(), [left, right], language="zh")
+    assert [s.text for s in segments] == ["今天我们去公园玩然后回家"]
+
+def test_segments_beyond_the_seam_are_dropped():
+    left = [_segment(20.0, 29.0, "first"), _segment(30.5, 31.8, "echo")]
+    right = [_segment(28.2, 29.5, "tail"), _segment(31.0, 38.0, "second")]
+    segments = stitch_chunks(_chunks(), [left, right], language="en")
+    assert [s.text for s in segments] == ["first", "second"]
+
+def test_unaligned_straddling_segments_keep_their_side_of_the_seam():
+    # 文本无法对齐：按中点判断，中点落在接缝另一侧的段被丢弃
+    left = [_segment(29.0, 32.0, "alpha beta")]
+    right = [_segment(29.5, 34.0, "gamma delta")]
+    segments = stitch_chunks(_chunks(), [left, right], language="en")
+    assert [s.text for s in segments] == ["gamma delta"]
+
+    left = [_segment(27.0, 31.0, "alpha beta")]
+    right = [_segment(28.0, 31.5, "gamma delta")]
+    segments = stitch_chunks(_chunks(), [left, right], language="en")
+    assert [s.text for s in segments] == ["alpha beta"]
+
+def test_chunks_without_overlap_pass_through():
+    left = [_segment(25.0, 31.0, "one two three")]
+    right = [_segment(30.0, 33.0, "one two three")]
+    segments = stitch_chunks(_chunks(overlap=0.0), [left, right], language="en")
+    assert [s.text for s in segments] == ["one two three", "one two three"]
+
+def test_push_holds_back_the_latest_chunk():
+    chunks = _chunks()
+    stitcher = TranscriptStitcher("en")
+    assert stitcher.push(chunks[0], [_segment(0.0, 5.0, "a")]) == []
+    assert [s.text for s in stitcher.push(chunks[1], [_segment(40.0, 45.0, "b")])] == ["a"]
+    assert [s.text for s in stitcher.finish()] == ["b"]
+    assert stitcher.finish() == []
@@ -0,0 +1,49 @@
+import threading
+from video_processing.storage import TempStorage
+
+def _config(temp_dir, max_size_mb=1, wait_timeout=5):
+    return {
+        'video_processing': {
+            'temp_dir': str(temp_dir),
+            'temp_storage': {'max_size_mb': max_size_mb, 'wait_timeout': wait_timeout}
+        }
+    }
+
+def test_processors_share_one_storage_per_root(tmp_path):
+    first = TempStorage.from_config(_config(tmp_path))
+    second = TempStorage.from_config(_config(tmp_path / "." , max_size_mb=2))
+    assert first is second
+    assert first.max_bytes == 2 * 1024 * 1024
+    assert TempStorage.from_config(_config(tmp_path / "other")) is not first
+
+def test_concurrent_jobs_do_not_evict_each_other(tmp_path):
+    # 两个处理器各自从配置获取存储管理器，模拟 --jobs 下的并发任务
+    storage_a = TempStorage.from_config(_config(tmp_path))
+    storage_b = TempStorage.from_config(_config(tmp_path))
+    (tmp_path / "leftover").mkdir()
+    (tmp_path / "leftover" / "segment_000.mka").write_bytes(b"\0" * 300 * 1024)
+
+    job_a = storage_a.open_job("video_a")
+    job_a.dir.mkdir()
+    segment_a = job_a.dir / "segment_000.mka"
+    segment_a.write_bytes(b"\0" * 600 * 1024)
+
+    job_b = storage_b.open_job("video_b")
+    reserved = threading.Event()
+
+    def reserve_b():
+        with job_b.reserve(500 * 1024):
+            reserved.set()
+
+    thread = threading.Thread(target=reserve_b)
+    thread.start()
+    try:
+        # 遗留目录被淘汰后空间仍不足，B 必须等待 A 结束而不是删除 A 的目录
+        assert not reserved.wait(1.0)
+        assert not (tmp_path / "leftover").exists()
+        assert segment_a.exists()
+    finally:
+        job_a.cleanup()
+        thread.join(5)
+    assert reserved.is_set()
+    job_b.cleanup()
@@ -0,0 +1,73 @@
+import numpy as np
+from video_processing.audio import SAMPLE_RATE
+from video_processing.chunking import plan_chunks
+from video_processing.silence import SilenceMap
+from video_processing.streaming import StreamingChunkPlanner
+
+TARGET, MAX, SKIP, PAUSE = 30.0, 45.0, 2.0, 0.3
+
+def _audio(pattern, repeat):
+    """Noise bursts and digital silence: pattern is a list of (is_speech, seconds)"""
+    rng = np.random.default_rng(0)
+    parts = []
+    for is_speech, seconds in pattern * repeat:
+        samples = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            parts.append(rng.uniform(-0.3, 0.3, samples).astype(np.float32))
+        else:
+            parts.append(np.zeros(samples, dtype=np.float32))
+    return np.concatenate(parts)
+
+def _streamed(audio, feed_seconds=5.0, overlap=0.0):
+    planner = StreamingChunkPlanner(TARGET, MAX, SKIP, min_pause=PAUSE, overlap=overlap)
+    step = int(feed_seconds * SAMPLE_RATE)
+    chunks = []
+    for position in range(0, len(audio), step):
+        chunks.extend(planner.feed(audio[position:position + step]))
+    chunks.extend(planner.finish())
+    return chunks
+
+def _batch(audio):
+    silence_map = SilenceMap.from_audio(audio, SAMPLE_RATE, min_duration=PAUSE)
+    return plan_chunks(silence_map, TARGET, MAX, SKIP)
+
+def _ranges(chunks):
+    return [(round(chunk.start, 3), round(chunk.end, 3)) for chunk in chunks]
+
+def _rounded(ranges):
+    return [(round(start, 3), round(end, 3)) for start, end in ranges]
+
+def test_short_audio_matches_plan_chunks():
+    # 不足一个规划窗口的音频只在 finish() 时整体规划一次
+    audio = _audio([(True, 4.5), (False, 0.5)], 15)
+    assert _ranges(_streamed(audio)) == _rounded(_batch(audio))
+
+def test_ranges_ending_inside_windows_match_plan_chunks():
+    # 每段语音都在窗口内结束，跨窗口的语音段被整体推迟到下一窗口规划
+    audio = _audio([(True, 4.5), (False, 0.5), (True, 4.5), (False, 0.5), (True, 9.0), (False, 3.0)], 30)
+    streamed = _streamed(audio)
+    assert _ranges(streamed) == _rounded(_batch(audio))
+    assert [chunk.index for chunk in streamed] == list(range(len(streamed)))
+
+def test_continuous_speech_differs_by_at_most_one_chunk():
+    # 连续语音的总长度在解码结束前未知，流式规划按目标时长切分而不是均分，
+    # 因此与 plan_chunks 的块数最多相差一块
+    audio = _audio([(True, 4.5), (False, 0.5)], 120)
+    streamed = _streamed(audio)
+    batch = _batch(audio)
+    assert abs(len(streamed) - len(batch)) <= 1
+    assert streamed[0].start == batch[0][0]
+    assert abs(streamed[-1].end - batch[-1][1]) < 1e-6
+    assert all(chunk.duration <= MAX for chunk in streamed)
+    assert all(a.end == b.start for a, b in zip(streamed, streamed[1:]))
+
+def test_plan_does_not_depend_on_feed_size():
+    audio = _audio([(True, 4.5), (False, 0.5), (True, 9.0), (False, 3.0)], 40)
+    assert _ranges(_streamed(audio, feed_seconds=1.0)) == _ranges(_streamed(audio, feed_seconds=7.0))
+
+def test_chunk_audio_includes_overlap():
+    audio = _audio([(True, 4.5), (False, 0.5)], 60)
+    for chunk in _streamed(audio, overlap=1.0):
+        start = int(round(chunk.audio_start * SAMPLE_RATE))
+        assert len(chunk.audio) == int(round((chunk.audio_end - chunk.audio_start) * SAMPLE_RATE))
+        np.testing.assert_array_equal(chunk.audio, audio[start:start + len(chunk.audio)])
@@ -0,0 +1,76 @@
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from utils.json_store import JsonFileStore
+from utils.logger.setup import get_logger
+
+class ResponseCache:
+    """Persistent cache of LLM responses keyed by model, prompt and options
+
+    One JSON file per entry. Entries older than ttl seconds count as
+    misses and are deleted; when the directory exceeds max_bytes the least
+    recently used entries are removed.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, ttl: Optional[float] = None):
+        self.logger = get_logger("summary.cache")
+        self.store = JsonFileStore(cache_dir, max_bytes, self.logger)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional['ResponseCache']:
+        """Create the cache from the text_summarization.cache section, or None if disabled"""
+        cache_config = config.get('text_summarization', {}).get('cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        ttl_hours = cache_config.get('ttl_hours', 168)
+        return cls(
+            cache_config.get('dir', 'cache/llm_responses'),
+            int(cache_config.get('max_size_mb', 64)) * 1024 * 1024,
+            float(ttl_hours) * 3600 if ttl_hours else None
+        )
+
+    @staticmethod
+    def make_key(model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Hash the model, prompt and generation options into a cache key"""
+        payload = json.dumps({'model': model, 'prompt': prompt, 'options': options or {}},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for the key, or None on a miss"""
+        entry_path = self.store.entry_path(key)
+        data = self.store.read(entry_path)
+        if data is not None and self.ttl is not None and time.time() - data.get('created', 0) > self.ttl:
+            entry_path.unlink(missing_ok=True)
+            self.logger.debug(f"模型响应缓存已过期：{key[:12]}")
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            self.logger.debug(f"模型响应缓存未命中：{key[:12]}")
+            return None
+
+        self.store.touch(entry_path)
+        self.logger.info(f"模型响应缓存命中：{key[:12]}")
+        return data['response']
+
+    def put(self, key: str, response: str):
+        """Store a response for the key and enforce the size budget"""
+        self.store.write(self.store.entry_path(key), {'created': time.time(), 'response': response})
+        self.logger.debug(f"写入模型响应缓存：{key[:12]}")
+        for path in self.store.evict():
+            self.logger.debug(f"淘汰模型响应缓存：{path.name}")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counts since the cache was created"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,223 @@
+import json
+import random
+import asyncio
+import aiohttp
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .exceptions import OllamaError
+from .models import SummaryStyle
+from .cache import ResponseCache
+from utils.logger.setup import get_logger
+
+# 这些状态码通常表示 Ollama 暂时繁忙或正在加载模型，可以重试
+_TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+class OllamaClient:
+    """Long-lived Ollama API client with one keep-alive connection pool
+
+    Requests share one aiohttp session, and at most max_concurrent are in
+    flight at a time; further callers wait for a free slot. Connection
+    errors, timeouts and 408/429/5xx responses are retried with jittered
+    exponential backoff. The session and the limit belong to the event loop
+    that first used them; a client used from a new loop opens a new session.
+    A streamed request is only retried until its first chunk is delivered.
+    With a ResponseCache, complete responses are stored and served again
+    for the same model, prompt and options unless use_cache is False.
+    """
+
+    def __init__(self, base_url: str, model: str = "deepseek-r1:8b", timeout: float = 300,
+                 keep_alive: Optional[str] = "30m", max_concurrent: int = 2,
+                 max_connections: int = 4, retries: int = 3, backoff: float = 1.0,
+                 max_backoff: float = 30.0, style_models: Optional[Dict[str, str]] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.logger = get_logger("summary.ollama")
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_connections = max(self.max_concurrent, max_connections)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.style_models = dict(style_models or {})
+        self.cache = cache
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_config(cls, ollama_config: dict, cache: Optional[ResponseCache] = None) -> 'OllamaClient':
+        """Build the client from the models.ollama section"""
+        return cls(
+            base_url=ollama_config['base_url'],
+            model=ollama_config.get('model', 'deepseek-r1:8b'),
+            timeout=float(ollama_config.get('timeout', 300)),
+            keep_alive=ollama_config.get('keep_alive', '30m'),
+            max_concurrent=int(ollama_config.get('max_concurrent', 2)),
+            max_connections=int(ollama_config.get('max_connections', 4)),
+            retries=int(ollama_config.get('retries', 3)),
+            backoff=float(ollama_config.get('backoff', 1.0)),
+            max_backoff=float(ollama_config.get('max_backoff', 30)),
+            style_models=ollama_config.get('style_models'),
+            cache=cache
+        )
+
+    def resolve_model(self, style: Optional[SummaryStyle] = None, model: Optional[str] = None) -> str:
+        """Model for a request: an explicit name, else the style's model, else the default"""
+        if model:
+            return model
+        if style is not None:
+            return self.style_models.get(style.name, self.model)
+        return self.model
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+        if self._session is not None and not self._session.closed:
+            # 旧会话属于另一个事件循环，无法在当前循环中关闭，只释放引用
+            self.logger.debug("事件循环已变化，重新创建Ollama连接池")
+            self._session.detach()
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._loop = loop
+        return self._session
+
+    def _delay(self, attempt: int) -> float:
+        # 全抖动退避，避免多个请求同时重试
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def _status_error(self, response: aiohttp.ClientResponse) -> OllamaError:
+        """Error for a failed response; raised at once unless the status is transient"""
+        error_text = await response.text()
+        error = OllamaError(f"Ollama API error ({response.status}): {error_text}")
+        if response.status not in _TRANSIENT_STATUS:
+            raise error
+        return error
+
+    async def _backoff(self, attempt: int, error: Exception):
+        """Sleep before retry number attempt + 1, or raise once retries are used up"""
+        if attempt >= self.retries:
+            raise OllamaError(f"Ollama request failed after {attempt + 1} attempts: {str(error)}")
+        delay = self._delay(attempt)
+        self.logger.warning(
+            f"Ollama请求失败，{delay:.1f}秒后重试 ({attempt + 1}/{self.retries})：{str(error) or type(error).__name__}"
+        )
+        await asyncio.sleep(delay)
+
+    def _payload(self, prompt: str, model: Optional[str], options: Optional[Dict[str, Any]],
+                 stream: bool) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            'model': model or self.model,
+            'prompt': prompt,
+            'stream': stream
+        }
+        if self.keep_alive is not None:
+            payload['keep_alive'] = self.keep_alive
+        if options:
+            payload['options'] = options
+        self.logger.debug(f"调用Ollama模型：{payload['model']}")
+        return payload
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._get_session()
+        url = f"{self.base_url}{path}"
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    async with session.post(url, json=payload) as response:
+                        if response.status == 200:
+                            return await response.json()
+                        error: Exception = await self._status_error(response)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                error = e
+            await self._backoff(attempt, error)
+            attempt += 1
+
+    def _cache_key(self, payload: Dict[str, Any], use_cache: bool) -> Optional[str]:
+        if not use_cache or self.cache is None:
+            return None
+        return ResponseCache.make_key(payload['model'], payload['prompt'], payload.get('options'))
+
+    async def generate(self, prompt: str, model: Optional[str] = None,
+                       options: Optional[Dict[str, Any]] = None, use_cache: bool = True) -> str:
+        """Generate a completion for prompt and return the response text"""
+        payload = self._payload(prompt, model, options, stream=False)
+        key = self._cache_key(payload, use_cache)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        result = await self._post('/api/generate', payload)
+        if key is not None:
+            self.cache.put(key, result['response'])
+        return result['response']
+
+    async def stream(self, prompt: str, model: Optional[str] = None,
+                     options: Optional[Dict[str, Any]] = None, use_cache: bool = True) -> AsyncIterator[str]:
+        """Generate a completion for prompt, yielding text chunks as Ollama produces them
+
+        The request keeps its in-flight slot until the iterator is exhausted
+        or closed, so callers that stop early should call aclose(). A cached
+        response is yielded as a single chunk.
+        """
+        session = self._get_session()
+        url = f"{self.base_url}/api/generate"
+        payload = self._payload(prompt, model, options, stream=True)
+        key = self._cache_key(payload, use_cache)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        parts = []
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self._semaphore:
+                    async with session.post(url, json=payload) as response:
+                        if response.status != 200:
+                            error: Exception = await self._status_error(response)
+                        else:
+                            # Ollama 每行返回一个 JSON 对象，最后一行带 done 标记
+                            async for line in response.content:
+                                if not line.strip():
+                                    continue
+                                data = json.loads(line)
+                                if 'error' in data:
+                                    raise OllamaError(f"Ollama API error: {data['error']}")
+                                if data.get('response'):
+                                    started = True
+                                    parts.append(data['response'])
+                                    yield data['response']
+                                if data.get('done'):
+                                    # 只缓存完整生成的结果
+                                    if key is not None:
+                                        self.cache.put(key, "".join(parts))
+                                    return
+                            error = OllamaError("Ollama stream ended before completion")
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                error = e
+            if started:
+                # 已输出的部分无法撤回，不再重试
+                raise OllamaError(f"Ollama stream interrupted: {str(error) or type(error).__name__}")
+            await self._backoff(attempt, error)
+            attempt += 1
+
+    async def unload(self, model: Optional[str] = None):
+        """Ask Ollama to unload a model now instead of after keep_alive"""
+        await self._post('/api/generate', {'model': model or self.model, 'keep_alive': 0})
+
+    async def close(self):
+        """Close the connection pool; the next request opens a new one"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+        self._loop = None
@@ -26,6 +26,8 @@ class SummaryConfig:
     max_length: int
     min_info_retention: float = 0.85  # 最低信息保留率要求
     custom_params: Dict = field(default_factory=dict)  # 自定义参数
+    model: Optional[str] = None  # 指定Ollama模型，为空时按配置选择
+    use_cache: bool = True  # 是否使用模型响应缓存，需要重新随机生成时关闭
 
 @dataclass
 class QualityMetrics:
@@ -45,6 +47,11 @@ class QualityMetrics:
             self.coherence_score >= 0.7
         )
 
+    @property
+    def score(self) -> float:
+        """Overall quality (0-1) used to rank candidate summaries"""
+        return (self.info_retention + (1 - self.redundancy_score) + self.coherence_score) / 3
+
 @dataclass
 class SummaryResult:
     """Result of text summarization"""
@@ -53,6 +60,7 @@ class SummaryResult:
     style: SummaryStyle
     metrics: QualityMetrics
     source_file: Optional[Path] = None  # 原始文件路径（如果有）
+    timings: Dict[str, float] = field(default_factory=dict)  # 各阶段耗时（秒）
     word_count: int = field(init=False)
     
     def __post_init__(self):
@@ -76,5 +84,6 @@ class SummaryResult:
                 "coherence_score": self.metrics.coherence_score,
                 "key_points": self.metrics.key_points_coverage,
                 "warnings": self.metrics.warnings
-            }
+            },
+            "timings": dict(self.timings)
         }
\ No newline at end of file
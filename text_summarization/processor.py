@@ -1,19 +1,33 @@
-import os
-import json
+import re
+import time
 import asyncio
-import aiohttp
-from typing import Optional, Callable, Dict, Any
-from pathlib import Path
+from typing import Optional, Callable, Dict, Any, AsyncIterator, Tuple
 
 from .exceptions import (
     TextSummarizationError, OllamaError,
     ContentLengthError, EmptyContentError
 )
-from .models import SummaryConfig, SummaryResult, SummaryStyle
+from .models import SummaryConfig, SummaryResult, SummaryStyle, QualityMetrics
 from .templates import TemplateManager
 from .quality import QualityChecker
+from .client import OllamaClient
+from .cache import ResponseCache
+from .splitter import split_text, pack_units
+from utils.text import estimate_tokens
 from utils.logger.setup import get_logger
 
+# 分段摘要与合并摘要使用的提示词；最后一轮仍使用风格模板
+_MAP_PROMPT = (
+    "以下是一段长文本的第{index}/{total}部分。请概括这一部分的关键信息，"
+    "保留重要的事实、数据和专业术语，不超过{length}字，只输出概括内容：\n\n{text}"
+)
+_REDUCE_PROMPT = (
+    "以下是同一长文本中连续几部分的概括（第{index}/{total}组）。请将它们合并为一份连贯的概括，"
+    "去除重复内容，保留关键信息，不超过{length}字，只输出概括内容：\n\n{text}"
+)
+# 推理模型会先输出思考过程，中间摘要只保留结论部分
+_THINK = re.compile(r"<think>.*?</think>", re.DOTALL)
+
 class SummaryProcessor:
     """Process text summarization requests"""
     
@@ -33,6 +47,17 @@ class SummaryProcessor:
                 config = yaml.safe_load(f)
             
             self.ollama_config = config['models']['ollama']
+            self.client = OllamaClient.from_config(self.ollama_config, ResponseCache.from_config(config))
+            
+            map_reduce = config.get('text_summarization', {}).get('map_reduce', {})
+            self.map_reduce_enabled = map_reduce.get('enabled', True)
+            self.chunk_tokens = int(map_reduce.get('chunk_tokens', 3000))
+            self.partial_length = int(map_reduce.get('partial_length', 400))
+            self.max_levels = int(map_reduce.get('max_levels', 4))
+            
+            candidates = config.get('text_summarization', {}).get('candidates', {})
+            self.candidate_mode = candidates.get('mode', 'sequential')
+            self.candidate_temperatures = [float(t) for t in candidates.get('temperatures', [0.4, 0.8, 1.1])]
             self.logger.info("配置加载成功")
             
         except Exception as e:
@@ -49,60 +74,184 @@ class SummaryProcessor:
             self._progress_callback(progress, status)
         self.logger.debug(f"进度更新：{progress:.1%} - {status}")
     
-    async def _call_ollama(self, prompt: str) -> str:
-        """Call Ollama API to generate summary"""
+    async def _call_ollama(self, prompt: str, model: Optional[str] = None,
+                           on_token: Optional[Callable[[str], None]] = None,
+                           timings: Optional[Dict[str, float]] = None, use_cache: bool = True,
+                           options: Optional[Dict[str, Any]] = None) -> str:
+        """Call Ollama API to generate summary, streaming chunks to on_token if given"""
+        started = time.perf_counter()
         try:
-            url = f"{self.ollama_config['base_url']}/api/generate"
-            headers = {'Content-Type': 'application/json'}
-            data = {
-                'model': 'deepseek-r1:8b',  # 使用默认模型，后续可配置
-                'prompt': prompt,
-                'stream': False
-            }
-            
-            timeout = aiohttp.ClientTimeout(total=self.ollama_config['timeout'])
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise OllamaError(f"Ollama API error: {error_text}")
-                    
-                    result = await response.json()
-                    return result['response']
-                    
+            if on_token is None:
+                summary = await self.client.generate(prompt, model=model, options=options, use_cache=use_cache)
+            else:
+                summary = await self._stream_ollama(prompt, model, on_token, timings, started, use_cache)
+        except TextSummarizationError as e:
+            self.logger.error(f"调用Ollama API失败：{str(e)}")
+            raise
         except Exception as e:
             self.logger.error(f"调用Ollama API失败：{str(e)}")
             raise OllamaError(f"Failed to call Ollama: {str(e)}")
+        if timings is not None:
+            timings['generate'] = timings.get('generate', 0.0) + time.perf_counter() - started
+        return summary
+    
+    async def _stream_ollama(self, prompt: str, model: Optional[str],
+                             on_token: Callable[[str], None],
+                             timings: Optional[Dict[str, float]], started: float, use_cache: bool) -> str:
+        parts = []
+        stream = self.client.stream(prompt, model=model, use_cache=use_cache)
+        try:
+            async for chunk in stream:
+                if not parts:
+                    first_token = time.perf_counter() - started
+                    self.logger.info(f"首个词元耗时{first_token:.2f}秒")
+                    if timings is not None:
+                        timings.setdefault('first_token', first_token)
+                parts.append(chunk)
+                on_token(chunk)
+                if not self.processing:
+                    raise TextSummarizationError("Summary generation cancelled")
+        finally:
+            # 提前退出时关闭流，释放连接与并发名额
+            await stream.aclose()
+        return "".join(parts)
     
-    async def generate_summary(self, text: str, config: SummaryConfig) -> SummaryResult:
-        """Generate summary for given text"""
+    async def close(self):
+        """Close the Ollama connection pool"""
+        await self.client.close()
+    
+    def _validate(self, text: str, config: SummaryConfig):
         if not text.strip():
             raise EmptyContentError("Input text is empty")
         
-        if len(text) > config.max_length:
+        # 启用分段摘要时，超长文本先压缩再总结
+        if not self.map_reduce_enabled and len(text) > config.max_length:
             raise ContentLengthError(len(text), config.max_length)
+    
+    async def _condense(self, text: str, model: str, timings: Dict[str, float], use_cache: bool = True) -> str:
+        """Map-reduce text that does not fit one prompt into partial summaries that do
+        
+        The text is split into chunks of at most chunk_tokens, which are
+        summarised concurrently; the partial summaries are then merged in
+        groups that fit the budget, level by level, until they fit one prompt
+        or max_levels is reached. Returns the text for the final pass.
+        """
+        if not self.map_reduce_enabled or estimate_tokens(text) <= self.chunk_tokens:
+            return text
+        
+        chunks = split_text(text, self.chunk_tokens)
+        self.logger.info(f"文本约{estimate_tokens(text)}词元，超出单次提示上限，分为{len(chunks)}段摘要")
+        started = time.perf_counter()
+        partials = await self._summarise_parts(chunks, _MAP_PROMPT, model, 1, use_cache)
+        timings['map'] = time.perf_counter() - started
+        
+        level = 1
+        source = "\n\n".join(partials)
+        while estimate_tokens(source) > self.chunk_tokens:
+            if level >= self.max_levels:
+                self.logger.warning(f"合并{level}轮后摘要仍超出单次提示上限，直接进行最终总结")
+                break
+            groups = pack_units(partials, self.chunk_tokens, "\n\n")
+            self.logger.info(f"第{level}轮合并：{len(partials)}份摘要分为{len(groups)}组")
+            started = time.perf_counter()
+            partials = await self._summarise_parts(groups, _REDUCE_PROMPT, model, level + 1, use_cache)
+            timings[f'reduce_{level}'] = time.perf_counter() - started
+            source = "\n\n".join(partials)
+            level += 1
+        return source
+    
+    async def _summarise_parts(self, parts: list, template: str, model: str, level: int,
+                               use_cache: bool = True) -> list:
+        """Summarise parts concurrently; the client bounds how many requests run at once"""
+        done = 0
+        
+        async def summarise(index: int, part: str) -> str:
+            nonlocal done
+            if not self.processing:
+                raise TextSummarizationError("Summary generation cancelled")
+            prompt = template.format(index=index + 1, total=len(parts), length=self.partial_length, text=part)
+            summary = _THINK.sub("", await self._call_ollama(prompt, model, use_cache=use_cache)).strip()
+            done += 1
+            self._update_progress(0.1 + 0.2 * done / len(parts), f"分段摘要 第{level}轮 ({done}/{len(parts)})...")
+            return summary
+        
+        tasks = [asyncio.ensure_future(summarise(index, part)) for index, part in enumerate(parts)]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            # 任一段失败或被取消时，停止其余请求
+            for task in tasks:
+                task.cancel()
+            raise
+    
+    def _render_prompt(self, text: str, config: SummaryConfig) -> str:
+        return self.template_manager.render_prompt(
+            config.style,
+            text,
+            max_length=config.max_length,
+            **config.custom_params
+        )
+    
+    async def stream_summary(self, text: str, config: SummaryConfig) -> AsyncIterator[str]:
+        """Yield the summary text chunk by chunk as it is generated (no quality retries)"""
+        self._validate(text, config)
+        self.processing = True
+        model = self.client.resolve_model(config.style, config.model)
+        try:
+            source = await self._condense(text, model, {}, config.use_cache)
+            stream = self.client.stream(self._render_prompt(source, config), model=model, use_cache=config.use_cache)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+        finally:
+            self.processing = False
+    
+    async def generate_summary(self, text: str, config: SummaryConfig,
+                               on_token: Optional[Callable[[int, str], None]] = None) -> SummaryResult:
+        """Generate summary for given text
+        
+        With on_token, the summary is streamed: on_token(attempt, chunk) is
+        called for every chunk, and attempt increases when a quality retry
+        starts over.
+        """
+        self._validate(text, config)
         
         self.processing = True
+        model = self.client.resolve_model(config.style, config.model)
+        timings: Dict[str, float] = {}
         try:
             self._update_progress(0.1, "准备提示词模板...")
-            prompt = self.template_manager.render_prompt(
-                config.style,
-                text,
-                max_length=config.max_length,
-                **config.custom_params
-            )
+            source = await self._condense(text, model, timings, config.use_cache)
+            prompt = self._render_prompt(source, config)
             
             self._update_progress(0.3, "生成摘要...")
-            summary = await self._call_ollama(prompt)
+            summary = await self._call_ollama(
+                prompt, model, self._attempt_callback(on_token, 0), timings, config.use_cache
+            )
             
             self._update_progress(0.6, "检查质量...")
-            metrics = self.quality_checker.check_quality(text, summary)
+            metrics = self.quality_checker.check_quality(source, summary)
+            
+            if (not metrics.passed_threshold and self.processing and
+                    self.candidate_mode == 'parallel'):
+                # 并行生成多个候选，取代逐次重试
+                prompt = self._adjust_prompt_for_quality(prompt, metrics, config.style)
+                started = time.perf_counter()
+                candidate = await self._generate_candidates(prompt, source, model, config.use_cache)
+                timings['candidates'] = time.perf_counter() - started
+                if candidate is not None and candidate[1].score > metrics.score:
+                    summary, metrics = candidate
+                    if on_token is not None:
+                        on_token(1, summary)
             
             # 如果质量不达标，尝试重新生成
             attempts = 1
             while (not metrics.passed_threshold and 
                    attempts < 3 and 
-                   self.processing):
+                   self.processing and
+                   self.candidate_mode != 'parallel'):
                 self.logger.warning(f"质量检查未通过，尝试重新生成 (尝试 {attempts}/3)")
                 self._update_progress(0.7, f"重新生成 (尝试 {attempts}/3)...")
                 
@@ -110,8 +259,10 @@ class SummaryProcessor:
                 prompt = self._adjust_prompt_for_quality(
                     prompt, metrics, config.style
                 )
-                summary = await self._call_ollama(prompt)
-                metrics = self.quality_checker.check_quality(text, summary)
+                summary = await self._call_ollama(
+                    prompt, model, self._attempt_callback(on_token, attempts), timings, config.use_cache
+                )
+                metrics = self.quality_checker.check_quality(source, summary)
                 attempts += 1
             
             self._update_progress(0.9, "生成结果...")
@@ -119,9 +270,14 @@ class SummaryProcessor:
                 original_text=text,
                 summary=summary,
                 style=config.style,
-                metrics=metrics
+                metrics=metrics,
+                timings=timings
             )
             
+            if self.client.cache is not None:
+                stats = self.client.cache.stats()
+                self.logger.info(f"模型响应缓存：命中{stats['hits']}次，未命中{stats['misses']}次")
+            
             self._update_progress(1.0, "完成")
             return result
             
@@ -131,6 +287,59 @@ class SummaryProcessor:
         finally:
             self.processing = False
     
+    async def _generate_candidates(self, prompt: str, source: str, model: str,
+                                   use_cache: bool) -> Optional[Tuple[str, QualityMetrics]]:
+        """Generate one candidate per configured temperature concurrently
+        
+        Candidates are checked as they arrive; the first that passes is
+        returned and the others are cancelled. Otherwise the best-scoring
+        candidate is returned, or None if every request failed.
+        """
+        temperatures = self.candidate_temperatures
+        self.logger.warning(f"质量检查未通过，并行生成{len(temperatures)}个候选摘要")
+        self._update_progress(0.7, f"并行生成{len(temperatures)}个候选摘要...")
+        
+        async def generate(temperature: float) -> Tuple[str, QualityMetrics]:
+            summary = await self._call_ollama(
+                prompt, model, use_cache=use_cache, options={'temperature': temperature}
+            )
+            return summary, self.quality_checker.check_quality(source, summary)
+        
+        tasks = [asyncio.ensure_future(generate(temperature)) for temperature in temperatures]
+        best = None
+        finished = 0
+        try:
+            for future in asyncio.as_completed(tasks):
+                try:
+                    candidate = await future
+                except OllamaError as e:
+                    self.logger.warning(f"候选摘要生成失败：{str(e)}")
+                    continue
+                finally:
+                    finished += 1
+                    self._update_progress(0.7 + 0.2 * finished / len(tasks),
+                                          f"检查候选摘要 ({finished}/{len(tasks)})...")
+                if best is None or candidate[1].score > best[1].score:
+                    best = candidate
+                if candidate[1].passed_threshold:
+                    self.logger.info(f"候选摘要通过质量检查（已完成{finished}/{len(tasks)}个）")
+                    break
+                if not self.processing:
+                    break
+        finally:
+            # 取消其余仍在生成的候选，并等待其释放连接
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return best
+    
+    @staticmethod
+    def _attempt_callback(on_token: Optional[Callable[[int, str], None]],
+                          attempt: int) -> Optional[Callable[[str], None]]:
+        if on_token is None:
+            return None
+        return lambda chunk: on_token(attempt, chunk)
+    
     def _adjust_prompt_for_quality(
         self, original_prompt: str,
         metrics: QualityChecker,
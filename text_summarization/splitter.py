@@ -0,0 +1,51 @@
+import re
+from typing import List
+
+from utils.text import estimate_tokens
+
+# 句末标点之后断句，中英文均适用
+_SENTENCE_END = re.compile(r"(?<=[。！？!?；;…])|(?<=\.)\s+")
+
+def _split_oversized(unit: str, max_tokens: int) -> List[str]:
+    """Break a unit over the budget into sentences, and sentences into fixed-size pieces"""
+    pieces = []
+    for sentence in _SENTENCE_END.split(unit):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        # 没有标点的超长句按字符硬切分；每个字符至多一个词元，因此每片不会超出预算
+        pieces.extend(sentence[start:start + max_tokens] for start in range(0, len(sentence), max_tokens))
+    return pieces
+
+def pack_units(units: List[str], max_tokens: int, separator: str = "\n") -> List[str]:
+    """Greedily join consecutive units into chunks of at most max_tokens estimated tokens
+
+    Units over the budget are split on sentence boundaries first, so every
+    chunk fits unless max_tokens is smaller than a single character.
+    """
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit = unit.strip()
+        if not unit:
+            continue
+        tokens = estimate_tokens(unit)
+        pieces = [unit] if tokens <= max_tokens else _split_oversized(unit, max_tokens)
+        for piece in pieces:
+            piece_tokens = tokens if len(pieces) == 1 else estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(separator.join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Split a transcript into token-budgeted chunks on line (segment) and sentence boundaries"""
+    return pack_units(text.splitlines(), max_tokens)
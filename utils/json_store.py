@@ -0,0 +1,75 @@
+import os
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+class JsonFileStore:
+    """A directory of JSON files with atomic writes and LRU eviction by modification time
+
+    Each entry is <directory>/<key>.json. Callers mark an entry as used with
+    touch(); evict() removes the least recently used entries until the
+    directory fits max_bytes. Files named in exclude are never evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, logger: logging.Logger,
+                 exclude: Iterable[str] = ()):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.logger = logger
+        self.exclude = set(exclude)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def read(self, path: Path) -> Optional[Dict]:
+        """Load a JSON file, or None if it is missing or unreadable"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            self.logger.warning(f"读取缓存文件失败：{path} - {str(e)}")
+            return None
+
+    def write(self, path: Path, data: Dict):
+        """Write a JSON file atomically"""
+        # 先写临时文件再原子替换，避免并发任务读到半截文件
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def touch(self, path: Path):
+        """Record an access to an entry for LRU eviction"""
+        # 更新修改时间作为LRU的访问记录
+        os.utime(path)
+
+    def evict(self) -> List[Path]:
+        """Remove least recently used entries until the store fits max_bytes; returns the removed paths"""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            if path.name in self.exclude:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed.append(path)
+        return removed
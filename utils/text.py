@@ -0,0 +1,10 @@
+import re
+
+# 中日韩文字（含全角标点）大致一个字符对应一个提示词元
+_CJK = re.compile(r"[　-〿぀-ヿ㐀-䶿一-鿿가-힯＀-￯]")
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM prompt token count: one per CJK character, one per four other characters"""
+    cjk = len(_CJK.findall(text))
+    other = len(re.sub(r"\s", "", text)) - cjk
+    return cjk + (other + 3) // 4
@@ -0,0 +1,96 @@
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+from .models import AudioChunk
+from .cancellation import CancellationToken
+from .ffmpeg import ffmpeg_runner
+
+# Whisper 期望的输入格式：16 kHz 单声道 float32
+SAMPLE_RATE = 16000
+
+def build_decode_command(video_path: str, sample_rate: int = SAMPLE_RATE,
+                         start: Optional[float] = None, duration: Optional[float] = None) -> List[str]:
+    """Build the FFmpeg command that decodes the audio track to raw 16-bit PCM on stdout"""
+    # 放在 -i 之前的 -ss 为输入端定位，只解码所需的时间段
+    window = []
+    if start is not None:
+        window += ["-ss", f"{start:.3f}"]
+    if duration is not None:
+        window += ["-t", f"{duration:.3f}"]
+    return [
+        "ffmpeg", "-nostdin",
+        "-threads", "0",
+        *window,
+        "-i", video_path,
+        "-vn",
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "-"
+    ]
+
+def decode_audio(video_path: str, sample_rate: int = SAMPLE_RATE,
+                 start: Optional[float] = None, duration: Optional[float] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 on_progress: Optional[Callable[[float], None]] = None) -> np.ndarray:
+    """Decode the audio track of a media file (or a time range of it) into mono float32 PCM"""
+    command = build_decode_command(video_path, sample_rate, start, duration)
+    result = ffmpeg_runner.run(command, cancel=cancel, duration=duration, on_progress=on_progress)
+    return pcm_to_float(result.stdout)
+
+def pcm_to_float(data: bytes) -> np.ndarray:
+    """Convert raw signed 16-bit PCM bytes to float32 samples in [-1, 1)"""
+    return np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+def split_audio(audio: np.ndarray, segment_length: float,
+                sample_rate: int = SAMPLE_RATE, overlap: float = 0.0) -> List[AudioChunk]:
+    """Slice decoded audio into fixed-length chunks (views, no copies)"""
+    samples_per_segment = max(1, int(segment_length * sample_rate))
+    ranges = [
+        (offset / sample_rate, min(len(audio), offset + samples_per_segment) / sample_rate)
+        for offset in range(0, len(audio), samples_per_segment)
+    ]
+    return slice_audio(audio, ranges, sample_rate, overlap)
+
+def slice_audio(audio: np.ndarray, ranges: List[Tuple[float, float]],
+                sample_rate: int = SAMPLE_RATE, overlap: float = 0.0,
+                offset: float = 0.0) -> List[AudioChunk]:
+    """Turn planned (start, end) ranges into chunks backed by views of the audio
+
+    Each chunk also covers up to overlap seconds on either side, so words
+    cut at a boundary are heard whole by one of the neighbouring chunks.
+    offset is the source time of audio[0] when audio is only a window.
+    """
+    duration = len(audio) / sample_rate
+    chunks = []
+    for index, (start, end) in enumerate(ranges):
+        lead = min(overlap, start)
+        tail = min(overlap, max(0.0, duration - end))
+        chunks.append(AudioChunk(
+            index=index,
+            start=start + offset,
+            end=end + offset,
+            audio=audio[int((start - lead) * sample_rate):int((end + tail) * sample_rate)],
+            lead=lead,
+            tail=tail
+        ))
+    return chunks
+
+def frame_energy_db(audio: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                    frame_length: float = 0.02) -> np.ndarray:
+    """Compute per-frame RMS energy in dBFS"""
+    frame_size = max(1, int(sample_rate * frame_length))
+    frame_count = len(audio) // frame_size
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float32)
+
+    frames = audio[:frame_count * frame_size].reshape(frame_count, frame_size)
+    # einsum 避免为整段音频创建平方后的临时数组
+    mean_square = np.einsum('ij,ij->i', frames, frames) / frame_size
+    return 10.0 * np.log10(np.maximum(mean_square, 1e-10))
+
+def silent_runs(silent: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return start/end frame indices of consecutive True runs in a boolean mask"""
+    padded = np.concatenate(([0], silent.astype(np.int8), [0]))
+    edges = np.diff(padded)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
@@ -0,0 +1,131 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+from .models import SegmentStore
+from utils.json_store import JsonFileStore
+from utils.logger.setup import get_logger
+
+class TranscriptionCache:
+    """Persistent, content-addressed cache of transcription segments with LRU eviction
+
+    fingerprints.json maps file fingerprints to content hashes ('files') and
+    cache keys to the content hash they were built from ('entries'), so the
+    fingerprints of evicted entries can be pruned with them. Concurrent jobs
+    of one process update the index under a shared lock; separate processes
+    writing the same cache directory may still lose each other's index
+    updates, which only costs a re-hash.
+    """
+
+    FINGERPRINT_FILE = "fingerprints.json"
+    # 批处理的并发任务各自创建缓存实例，索引的读改写需要进程内共享的锁
+    _index_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.logger = get_logger("video.cache")
+        self.store = JsonFileStore(cache_dir, max_bytes, self.logger, exclude=[self.FINGERPRINT_FILE])
+        self.fingerprint_path = self.store.directory / self.FINGERPRINT_FILE
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["TranscriptionCache"]:
+        """Create the cache from the video_processing.cache section, or None if disabled"""
+        cache_config = config['video_processing'].get('cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        return cls(
+            cache_config.get('dir', 'cache/transcriptions'),
+            int(cache_config.get('max_size_mb', 512)) * 1024 * 1024
+        )
+
+    @staticmethod
+    def hash_file(path: str, block_size: int = 1 << 20) -> str:
+        """Compute the SHA-256 of a file's content"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def content_hash(self, path: str) -> str:
+        """Return the content hash of a file, memoised by (path, size, mtime)"""
+        stat = os.stat(path)
+        fingerprint = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        with self._index_lock:
+            content_hash = self._read_index()['files'].get(fingerprint)
+        if content_hash is not None:
+            return content_hash
+
+        # 计算哈希耗时较长，不持有锁；写入前重新读取索引，保留其他任务的更新
+        content_hash = self.hash_file(path)
+        with self._index_lock:
+            index = self._read_index()
+            index['files'][fingerprint] = content_hash
+            self.store.write(self.fingerprint_path, index)
+        return content_hash
+
+    def _read_index(self) -> Dict[str, Dict[str, str]]:
+        index = self.store.read(self.fingerprint_path) or {}
+        if 'files' not in index:
+            # 旧格式只记录文件指纹到内容哈希的映射
+            index = {'files': index, 'entries': {}}
+        return index
+
+    @staticmethod
+    def make_key(content_hash: str, options: Dict) -> str:
+        """Combine the content hash with the transcription options into a cache key"""
+        payload = json.dumps({'content': content_hash, 'options': options}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[SegmentStore, List[str]]]:
+        """Return cached (segments, warnings) for the key, or None on a miss"""
+        entry_path = self.store.entry_path(key)
+        data = self.store.read(entry_path)
+        if data is None:
+            self.logger.debug(f"转写缓存未命中：{key[:12]}")
+            return None
+
+        self.store.touch(entry_path)
+        segments = SegmentStore.from_records(data['segments'])
+        self.logger.info(f"转写缓存命中：{key[:12]}，共{len(segments)}个文本段")
+        return segments, data.get('warnings', [])
+
+    def put(self, key: str, segments: SegmentStore, warnings: List[str],
+            content_hash: Optional[str] = None):
+        """Store segments and warnings for the key and enforce the size budget
+
+        Pass the content hash the key was made from so that its fingerprint
+        is pruned once no cached entry refers to it any more.
+        """
+        self.store.write(self.store.entry_path(key), {
+            'segments': segments.to_records(),
+            'warnings': list(warnings)
+        })
+        self.logger.info(f"写入转写缓存：{key[:12]}")
+        with self._index_lock:
+            if content_hash is not None:
+                index = self._read_index()
+                index['entries'][key] = content_hash
+                self.store.write(self.fingerprint_path, index)
+
+            evicted = self.store.evict()
+            for path in evicted:
+                self.logger.debug(f"淘汰转写缓存：{path.name}")
+            if evicted:
+                self._prune_index([path.stem for path in evicted])
+
+    def _prune_index(self, evicted_keys: List[str]):
+        """Drop evicted keys and the fingerprints no remaining entry refers to; needs _index_lock"""
+        index = self._read_index()
+        for key in evicted_keys:
+            index['entries'].pop(key, None)
+        referenced = set(index['entries'].values())
+        files = {
+            fingerprint: content_hash for fingerprint, content_hash in index['files'].items()
+            if content_hash in referenced
+        }
+        pruned = len(index['files']) - len(files)
+        index['files'] = files
+        self.store.write(self.fingerprint_path, index)
+        if pruned:
+            self.logger.debug(f"清理文件指纹：{pruned}条")
@@ -0,0 +1,120 @@
+import time
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+from .exceptions import ProcessingCancelled
+
+class CancellationToken:
+    """Cancel flag shared by everything one processing run starts
+
+    cancel() sets the flag, kills the subprocesses registered with the token
+    and runs the registered callbacks, so blocking work (FFmpeg pipes, pool
+    futures) ends at once instead of at the next flag check. Engines only
+    need is_set() and wait(), so a multiprocessing.Event can stand in for
+    a token inside pool workers.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes: List[subprocess.Popen] = []
+        self._callbacks: List[Callable[[], None]] = []
+        self.requested_at: Optional[float] = None
+
+    def reset(self):
+        """Clear the flag before a new run"""
+        with self._lock:
+            self._event.clear()
+            self.requested_at = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep up to timeout seconds; True if cancelled meanwhile"""
+        return self._event.wait(timeout)
+
+    def cancel(self):
+        """Request cancellation; safe to call from any thread and more than once"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.requested_at = time.perf_counter()
+            self._event.set()
+            processes = list(self._processes)
+            callbacks = list(self._callbacks)
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        for callback in callbacks:
+            callback()
+
+    def watch(self, event, interval: float = 0.1):
+        """Cancel whenever an external event (e.g. a pool's multiprocessing.Event) is set
+
+        A daemon thread mirrors each set of the event into cancel(), so
+        subprocesses registered here are killed even though the event lives
+        in another process. The thread never resets the token; the owner
+        does that when it starts new work with the event clear.
+        """
+        def mirror():
+            while True:
+                event.wait()
+                self.cancel()
+                # 等待主进程为下一次运行清除事件；令牌被重置说明新运行已开始
+                while event.is_set() and self.cancelled:
+                    time.sleep(interval)
+
+        threading.Thread(target=mirror, name="cancel-watch", daemon=True).start()
+
+    def raise_if_cancelled(self):
+        """Raise ProcessingCancelled once cancel() has been called"""
+        if self._event.is_set():
+            raise ProcessingCancelled()
+
+    def register(self, process: subprocess.Popen):
+        """Kill the process on cancel (immediately if already cancelled)"""
+        with self._lock:
+            self._processes.append(process)
+            cancelled = self._event.is_set()
+        if cancelled and process.poll() is None:
+            process.kill()
+
+    def unregister(self, process: subprocess.Popen):
+        with self._lock:
+            if process in self._processes:
+                self._processes.remove(process)
+
+    @contextmanager
+    def track(self, process: subprocess.Popen):
+        """Register the process for the duration of the block"""
+        self.register(process)
+        try:
+            yield process
+        finally:
+            self.unregister(process)
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], None]):
+        """Run callback on cancel while the block is active"""
+        with self._lock:
+            self._callbacks.append(callback)
+            cancelled = self._event.is_set()
+        if cancelled:
+            callback()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._callbacks.remove(callback)
+
+    def elapsed(self) -> Optional[float]:
+        """Seconds since cancel() was called, None if it was not"""
+        if self.requested_at is None:
+            return None
+        return time.perf_counter() - self.requested_at
@@ -0,0 +1,232 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .models import TranscriptionSegment, AudioChunk
+from .audio import SAMPLE_RATE
+from .silence import SilenceMap
+from utils.logger.setup import get_logger
+
+class JobCheckpoint:
+    """Persists the chunk plan and per-chunk results so an interrupted job can resume
+
+    The plan is either saved at once with the whole decoded audio
+    (save_plan), or, when decoding is streamed, appended batch by batch with
+    each chunk's audio and the planner state needed to continue decoding
+    (append_plan), and marked complete once decoding ends (finish_plan).
+    """
+
+    MANIFEST_FILE = "manifest.json"
+    AUDIO_FILE = "audio.npy"
+
+    def __init__(self, job_dir: Path, video_path: str, options: Dict):
+        self.logger = get_logger("video.checkpoint")
+        self.job_dir = Path(job_dir)
+        self.checkpoint_dir = self.job_dir / "checkpoint"
+        self.fingerprint = self._fingerprint(video_path, options)
+        self.manifest: Optional[Dict] = None
+        self._load_manifest()
+
+    @staticmethod
+    def _fingerprint(video_path: str, options: Dict) -> str:
+        """Identify the job by source file identity and transcription options"""
+        stat = os.stat(video_path)
+        payload = json.dumps({
+            'video': os.path.abspath(video_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'options': options
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _load_manifest(self):
+        manifest_path = self.checkpoint_dir / self.MANIFEST_FILE
+        if not manifest_path.exists():
+            return
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError) as e:
+            self.logger.warning(f"检查点清单损坏，将重新处理：{str(e)}")
+            self.clear()
+            return
+
+        if manifest.get('fingerprint') != self.fingerprint:
+            self.logger.info("检查点与当前视频或参数不匹配，丢弃旧检查点")
+            self.clear()
+            return
+        self.manifest = manifest
+        self.logger.info(
+            f"发现检查点：{len(self.completed_indices())}/{len(manifest['chunks'])}个块已完成"
+        )
+
+    @property
+    def has_plan(self) -> bool:
+        """Whether a chunk plan from a previous run can be reused"""
+        return self.manifest is not None
+
+    @property
+    def plan_complete(self) -> bool:
+        """Whether the saved plan covers the whole source, rather than a streamed prefix"""
+        return self.manifest is not None and self.manifest.get('complete', True)
+
+    @property
+    def stream_state(self) -> Optional[Dict]:
+        """Planner state saved with the last appended batch of a streamed plan"""
+        return self.manifest.get('stream') if self.manifest is not None else None
+
+    def save_plan(self, chunks: List[AudioChunk], warnings: List[str],
+                  audio: Optional[np.ndarray] = None):
+        """Persist the chunk plan, preparation warnings and the decoded audio"""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        if audio is not None:
+            np.save(self.checkpoint_dir / self.AUDIO_FILE, audio)
+
+        self.manifest = {
+            'fingerprint': self.fingerprint,
+            'has_audio': audio is not None,
+            'warnings': list(warnings),
+            'chunks': [self._chunk_entry(chunk) for chunk in chunks]
+        }
+        self._write_json(self.checkpoint_dir / self.MANIFEST_FILE, self.manifest)
+        self.logger.debug(f"保存检查点清单：{len(chunks)}个块")
+
+    def append_plan(self, chunks: List[AudioChunk], state: Dict):
+        """Append a batch of streamed chunks with their audio and the planner state after it"""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        for chunk in chunks:
+            np.save(self._chunk_audio_path(chunk.index), chunk.audio)
+
+        if self.manifest is None:
+            self.manifest = {
+                'fingerprint': self.fingerprint,
+                'has_audio': False,
+                'chunk_audio': True,
+                'complete': False,
+                'warnings': [],
+                'chunks': []
+            }
+        self.manifest['chunks'].extend(self._chunk_entry(chunk) for chunk in chunks)
+        self.manifest['stream'] = state
+        # 清单最后写入：进程在中途被杀时，已登记的块的音频一定已在磁盘上
+        self._write_json(self.checkpoint_dir / self.MANIFEST_FILE, self.manifest)
+        self.logger.debug(f"追加检查点分块：{len(chunks)}个，共{len(self.manifest['chunks'])}个")
+
+    def finish_plan(self, warnings: List[str]):
+        """Mark a streamed plan complete once decoding has ended"""
+        if self.manifest is None:
+            return
+        self.manifest['complete'] = True
+        self.manifest['warnings'] = list(warnings)
+        self.manifest.pop('stream', None)
+        self._write_json(self.checkpoint_dir / self.MANIFEST_FILE, self.manifest)
+
+    @staticmethod
+    def _chunk_entry(chunk: AudioChunk) -> Dict:
+        return {
+            'index': chunk.index,
+            'start': chunk.start,
+            'end': chunk.end,
+            'path': chunk.path,
+            'lead': chunk.lead,
+            'tail': chunk.tail,
+            'source': chunk.source,
+            'silence': None if chunk.silence is None else {
+                'starts': chunk.silence.starts.tolist(),
+                'ends': chunk.silence.ends.tolist(),
+                'duration': chunk.silence.duration
+            }
+        }
+
+    def load_plan(self) -> Tuple[List[AudioChunk], List[str]]:
+        """Rebuild the chunks and preparation warnings of the saved plan"""
+        audio = None
+        if self.manifest['has_audio']:
+            # 以内存映射方式读取，避免重新解码或一次性载入整段音频
+            audio = np.load(self.checkpoint_dir / self.AUDIO_FILE, mmap_mode='r')
+
+        chunks = []
+        for entry in self.manifest['chunks']:
+            silence = None
+            if entry['silence'] is not None:
+                silence = SilenceMap(
+                    np.asarray(entry['silence']['starts'], dtype=np.float64),
+                    np.asarray(entry['silence']['ends'], dtype=np.float64),
+                    entry['silence']['duration']
+                )
+            chunk = AudioChunk(
+                index=entry['index'],
+                start=entry['start'],
+                end=entry['end'],
+                path=entry['path'],
+                silence=silence,
+                lead=entry.get('lead', 0.0),
+                tail=entry.get('tail', 0.0),
+                source=entry.get('source')
+            )
+            if audio is not None:
+                chunk.audio = audio[int(chunk.audio_start * SAMPLE_RATE):int(chunk.audio_end * SAMPLE_RATE)]
+            elif self.manifest.get('chunk_audio', False):
+                chunk.audio = np.load(self._chunk_audio_path(chunk.index), mmap_mode='r')
+            chunks.append(chunk)
+        return chunks, list(self.manifest['warnings'])
+
+    def plan_is_intact(self) -> bool:
+        """Check that the files the saved plan depends on still exist"""
+        if self.manifest['has_audio'] and not (self.checkpoint_dir / self.AUDIO_FILE).exists():
+            return False
+        if self.manifest.get('chunk_audio', False) and not all(
+            self._chunk_audio_path(entry['index']).exists() for entry in self.manifest['chunks']
+        ):
+            return False
+        return all(
+            entry['path'] is None or Path(entry['path']).exists()
+            for entry in self.manifest['chunks']
+        )
+
+    def save_chunk(self, index: int, segments: List[TranscriptionSegment], warnings: List[str]):
+        """Persist the result of one finished chunk"""
+        self._write_json(self._chunk_path(index), {
+            'segments': [asdict(segment) for segment in segments],
+            'warnings': list(warnings)
+        })
+
+    def completed_indices(self) -> List[int]:
+        """Indices of chunks whose results are on disk"""
+        return sorted(
+            int(path.stem.split('_')[1])
+            for path in self.checkpoint_dir.glob("chunk_*.json")
+        )
+
+    def load_chunk(self, index: int) -> Tuple[List[TranscriptionSegment], List[str]]:
+        """Load the saved result of a finished chunk"""
+        data = json.loads(self._chunk_path(index).read_text(encoding='utf-8'))
+        segments = [TranscriptionSegment(**segment) for segment in data['segments']]
+        return segments, data['warnings']
+
+    def clear(self):
+        """Remove all checkpoint data of the job"""
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+        self.manifest = None
+
+    def _chunk_path(self, index: int) -> Path:
+        return self.checkpoint_dir / f"chunk_{index:04d}.json"
+
+    def _chunk_audio_path(self, index: int) -> Path:
+        return self.checkpoint_dir / f"audio_{index:04d}.npy"
+
+    def _write_json(self, path: Path, data: Dict):
+        # 原子写入，进程在写入中途被杀也不会留下损坏的检查点
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.checkpoint_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
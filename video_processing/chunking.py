@@ -0,0 +1,60 @@
+import math
+import numpy as np
+from typing import List, Optional, Tuple
+from .silence import SilenceMap
+
+def pick_boundary(pause_mids: np.ndarray, low: float, high: float, ideal: float) -> Optional[float]:
+    """Pick the pause midpoint in [low, high] closest to the ideal cut time"""
+    left = np.searchsorted(pause_mids, low, side='left')
+    right = np.searchsorted(pause_mids, high, side='right')
+    if right <= left:
+        return None
+    candidates = pause_mids[left:right]
+    return float(candidates[np.argmin(np.abs(candidates - ideal))])
+
+def split_range(start: float, end: float, pause_mids: np.ndarray,
+                target_duration: float, max_duration: float,
+                open_end: bool = False) -> List[Tuple[float, float]]:
+    """Split one speech range into roughly equal chunks cut inside pauses
+
+    With open_end the range continues past end, so its known length says
+    nothing about how to divide it; chunks are cut every target_duration.
+    """
+    chunks = []
+    position = start
+    while end - position > max_duration:
+        remaining = end - position
+        if open_end:
+            step = target_duration
+            high = position + max_duration
+        else:
+            # 按剩余长度均分，使各块时长尽量接近，便于并行负载均衡
+            step = remaining / math.ceil(remaining / target_duration)
+            high = min(position + max_duration, end - step * 0.5)
+        ideal = position + step
+        low = position + step * 0.5
+        boundary = pick_boundary(pause_mids, low, high, ideal)
+        if boundary is None:
+            # 窗口内没有停顿，只能硬切
+            boundary = ideal
+        chunks.append((position, boundary))
+        position = boundary
+    if end > position:
+        chunks.append((position, end))
+    return chunks
+
+def plan_chunks(silence_map: SilenceMap, target_duration: float, max_duration: float,
+                skip_silence: float, open_end: bool = False) -> List[Tuple[float, float]]:
+    """Plan transcription chunks with boundaries inside pauses, leaving out long silences
+
+    open_end marks a map that ends mid-stream: speech reaching its end goes
+    on, so that range is cut every target_duration instead of divided evenly.
+    """
+    max_duration = max(max_duration, target_duration)
+    pause_mids = (silence_map.starts + silence_map.ends) / 2.0
+
+    chunks = []
+    for start, end in silence_map.speech_ranges(skip_silence):
+        chunks.extend(split_range(start, end, pause_mids, target_duration, max_duration,
+                                  open_end and end >= silence_map.duration))
+    return chunks
@@ -0,0 +1,193 @@
+import time
+import zlib
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+from .models import TranscriptionSegment
+from .audio import SAMPLE_RATE
+from .profiles import InferenceProfile
+from .registry import model_registry
+from .exceptions import ProcessingCancelled
+from utils.logger.setup import get_whisper_logger
+
+class TranscriptionEngine(ABC):
+    """Speech-to-text backend: 16 kHz mono float32 audio in, segments out
+
+    Segment times are relative to the start of the audio passed in; the
+    processor maps them onto the source timeline and applies the
+    confidence checks. When cancel_event (anything with is_set() and
+    wait(), e.g. a CancellationToken or multiprocessing.Event) is set,
+    transcribe raises ProcessingCancelled as soon as it can.
+    """
+    name = "engine"
+
+    def __init__(self, config: dict, device: str = "cpu"):
+        self.config = config
+        self.device = device
+        self.logger = get_whisper_logger()
+        self.cancel_event = None
+
+    def set_num_threads(self, threads: int):
+        """Limit the intra-op threads used for inference (no-op by default)"""
+
+    def load(self):
+        """Load model weights; called once before the first transcribe"""
+
+    def release(self):
+        """Release model weights taken by load"""
+
+    @property
+    def is_loaded(self) -> bool:
+        return True
+
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray, language: str, task: str,
+                   temperature: Optional[Sequence[float]] = None) -> List[TranscriptionSegment]:
+        """Transcribe one audio array into segments; temperature overrides the decode schedule"""
+
+class WhisperEngine(TranscriptionEngine):
+    """openai-whisper backend using models shared through the model registry"""
+    name = "whisper"
+
+    def __init__(self, config: dict, device: str = "cpu"):
+        super().__init__(config, device)
+        self.model = None
+        self._model_key = None
+
+    def set_num_threads(self, threads: int):
+        import torch
+
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+
+    def load(self):
+        if self.model is not None:
+            return
+        profile = InferenceProfile.from_config(self.config)
+        if profile.quantize and self.device != "cpu":
+            self.logger.warning(f"推理配置 {profile.name} 的int8量化仅支持CPU，CUDA模式下忽略")
+        self._model_key = (self.config['models']['whisper']['model_size'], self.device, profile.quantize)
+        self.model = model_registry.acquire(*self._model_key)
+
+    def release(self):
+        if self.model is None:
+            return
+        model_registry.release(*self._model_key)
+        self.model = None
+        self._model_key = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    def transcribe(self, audio: np.ndarray, language: str, task: str,
+                   temperature: Optional[Sequence[float]] = None) -> List[TranscriptionSegment]:
+        self.logger.debug("调用Whisper模型")
+        options = InferenceProfile.from_config(self.config).decode_options()
+        if temperature is not None:
+            options['temperature'] = tuple(temperature)
+        hooks = self._install_cancel_hooks()
+        try:
+            result = self.model.transcribe(
+                audio,
+                language=language,
+                task=task,
+                fp16=self.device != "cpu",
+                **options
+            )
+        finally:
+            for hook in hooks:
+                hook.remove()
+        return [
+            TranscriptionSegment(
+                start=segment['start'],
+                end=segment['end'],
+                text=segment.get('text', '').strip(),
+                avg_logprob=segment.get('avg_logprob', float('-inf')),
+                no_speech_prob=segment.get('no_speech_prob', 1.0),
+                compression_ratio=segment.get('compression_ratio', 0.0)
+            )
+            for segment in result['segments']
+        ]
+
+    def _install_cancel_hooks(self) -> list:
+        """Make model.transcribe raise ProcessingCancelled once cancel_event is set"""
+        cancel_event = self.cancel_event
+        if cancel_event is None:
+            return []
+
+        def check_cancelled(module, inputs):
+            if cancel_event.is_set():
+                raise ProcessingCancelled()
+
+        # whisper 的解码循环没有回调：编码器每个30秒窗口运行一次，解码器每生成一个词元运行一次，
+        # 在二者前检查取消标志，取消可在一个解码步内生效
+        return [
+            self.model.encoder.register_forward_pre_hook(check_cancelled),
+            self.model.decoder.register_forward_pre_hook(check_cancelled)
+        ]
+
+class FakeEngine(TranscriptionEngine):
+    """Deterministic stand-in for benchmarking the pipeline without a model
+
+    Emits one segment per segment_duration seconds of audio, with text
+    derived from a checksum of the samples, and sleeps for
+    latency + realtime_factor * audio seconds to mimic inference cost.
+    A low_confidence_ratio share of segments (chosen by checksum) comes out
+    with a low log probability unless a temperature override is given, so
+    the retry path can be exercised too.
+    """
+    name = "fake"
+
+    def __init__(self, config: dict, device: str = "cpu"):
+        super().__init__(config, device)
+        fake_config = config['video_processing'].get('engine', {}).get('fake', {})
+        self.latency = float(fake_config.get('latency', 0.0))
+        self.realtime_factor = float(fake_config.get('realtime_factor', 0.0))
+        self.segment_duration = float(fake_config.get('segment_duration', 5.0))
+        self.low_confidence_ratio = float(fake_config.get('low_confidence_ratio', 0.0))
+
+    def transcribe(self, audio: np.ndarray, language: str, task: str,
+                   temperature: Optional[Sequence[float]] = None) -> List[TranscriptionSegment]:
+        duration = len(audio) / SAMPLE_RATE
+        delay = self.latency + self.realtime_factor * duration
+        if self.cancel_event is not None:
+            if self.cancel_event.wait(delay):
+                raise ProcessingCancelled()
+        elif delay > 0:
+            time.sleep(delay)
+
+        segments = []
+        bounds = np.arange(0.0, duration, self.segment_duration)
+        for start in bounds:
+            end = min(duration, start + self.segment_duration)
+            window = np.ascontiguousarray(
+                audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)], dtype=np.float32
+            )
+            checksum = zlib.crc32(window.tobytes())
+            low_confidence = temperature is None and (checksum % 1000) < self.low_confidence_ratio * 1000
+            segments.append(TranscriptionSegment(
+                start=float(start),
+                end=float(end),
+                text=f"[{language}] {checksum:08x}",
+                avg_logprob=-2.0 if low_confidence else -0.1,
+                no_speech_prob=0.0,
+                compression_ratio=1.0
+            ))
+        return segments
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    FakeEngine.name: FakeEngine
+}
+
+def engine_name(config: dict) -> str:
+    """Name of the backend selected by video_processing.engine.backend"""
+    return config['video_processing'].get('engine', {}).get('backend', WhisperEngine.name)
+
+def create_engine(config: dict, device: str = "cpu", name: Optional[str] = None) -> TranscriptionEngine:
+    """Instantiate the configured transcription engine"""
+    name = name or engine_name(config)
+    if name not in ENGINES:
+        raise ValueError(f"Unknown transcription engine: {name}")
+    return ENGINES[name](config, device)
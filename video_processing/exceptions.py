@@ -19,4 +19,17 @@ class ConfidenceThresholdError(VideoProcessingError):
     def __init__(self, confidence: float, threshold: float):
         self.confidence = confidence
         self.threshold = threshold
-        super().__init__(f"Transcription confidence {confidence} is below threshold {threshold}")
\ No newline at end of file
+        super().__init__(f"Transcription confidence {confidence} is below threshold {threshold}")
+
+    def __reduce__(self):
+        # 保证异常可以从工作进程序列化回主进程
+        return (self.__class__, (self.confidence, self.threshold))
+
+class ProcessingCancelled(VideoProcessingError):
+    """Raised when processing stops because the user cancelled it"""
+    def __init__(self, message: str = "Processing cancelled"):
+        super().__init__(message)
+
+class StorageBudgetError(VideoProcessingError):
+    """Raised when intermediate files do not fit in the temp storage budget"""
+    pass
@@ -0,0 +1,231 @@
+import re
+import threading
+import subprocess
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+from .exceptions import FFmpegError
+from .cancellation import CancellationToken
+from utils.logger.setup import get_ffmpeg_logger
+
+_DURATION = re.compile(r"Duration: (\d+):(\d+):([\d.]+)")
+_PROGRESS = re.compile(r"^(\w+)=(\S*)$")
+
+@dataclass
+class FFmpegResult:
+    """Output of a finished FFmpeg command"""
+    stdout: bytes
+    stderr: str  # Full stderr when keep_stderr was set, otherwise the last lines
+
+class FFmpegProcess:
+    """One FFmpeg command started by FFmpegRunner.open
+
+    stderr is drained by a background thread: -progress key=value lines
+    update progress, all other lines go into a ring buffer (or, with
+    keep_stderr, a full transcript) instead of the log. The process holds
+    one runner slot until close().
+    """
+
+    def __init__(self, runner: 'FFmpegRunner', command: Sequence[str], timeout: Optional[float],
+                 cancel: Optional[CancellationToken], duration: Optional[float],
+                 on_progress: Optional[Callable[[float], None]], keep_stderr: bool):
+        self.runner = runner
+        # -progress 写到 stderr，stdout 留给 PCM 等输出数据
+        self.command = [command[0], "-progress", "pipe:2", *command[1:]]
+        self.timeout = timeout
+        self.cancel = cancel
+        self.duration = duration
+        self.on_progress = on_progress
+        self.progress: Optional[float] = None
+        self.timed_out = False
+        self._tail: deque = deque(maxlen=runner.stderr_lines)
+        self._stderr: Optional[List[str]] = [] if keep_stderr else None
+        self._process: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+
+    def start(self):
+        self.runner._acquire(self.cancel)
+        try:
+            self.runner.logger.debug(f"执行FFmpeg命令：{' '.join(self.command)}")
+            self._process = subprocess.Popen(self.command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except Exception:
+            self.runner._release()
+            self._closed = True
+            raise
+        if self.cancel is not None:
+            self.cancel.register(self._process)
+        self._reader = threading.Thread(target=self._read_stderr, name="ffmpeg-stderr", daemon=True)
+        self._reader.start()
+        if self.timeout:
+            self._timer = threading.Timer(self.timeout, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @property
+    def stdout(self):
+        return self._process.stdout
+
+    @property
+    def stderr_tail(self) -> str:
+        """The last stderr lines (excluding progress reports)"""
+        return "\n".join(self._tail)
+
+    def wait(self) -> int:
+        """Wait for FFmpeg to exit and for its stderr to be drained"""
+        returncode = self._process.wait()
+        self._reader.join()
+        return returncode
+
+    def kill(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+
+    def check(self):
+        """Raise if the command was cancelled, timed out or failed"""
+        if self.cancel is not None:
+            self.cancel.raise_if_cancelled()
+        if self.timed_out:
+            raise FFmpegError(f"FFmpeg timed out after {self.timeout:g}s: {self.stderr_tail}")
+        if self._process.returncode != 0:
+            raise FFmpegError(f"FFmpeg exited with code {self._process.returncode}: {self.stderr_tail}")
+
+    def stderr_text(self) -> str:
+        """Full stderr if keep_stderr was set, otherwise the ring buffer"""
+        return "\n".join(self._stderr) if self._stderr is not None else self.stderr_tail
+
+    def close(self):
+        """Kill FFmpeg if still running and give the slot back; safe to call more than once"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.kill()
+            self._process.wait()
+            self._reader.join()
+            self._process.stdout.close()
+        finally:
+            if self._timer is not None:
+                self._timer.cancel()
+            if self.cancel is not None:
+                self.cancel.unregister(self._process)
+            self.runner._release()
+
+    def _expire(self):
+        if self._process.poll() is None:
+            self.timed_out = True
+            self.runner.logger.error(f"FFmpeg运行超过{self.timeout:g}秒，强制结束")
+            self._process.kill()
+
+    def _read_stderr(self):
+        for raw in self._process.stderr:
+            line = raw.decode('utf-8', errors='replace').rstrip()
+            match = _PROGRESS.match(line)
+            if match:
+                self._handle_progress(match.group(1), match.group(2))
+                continue
+            self._tail.append(line)
+            if self._stderr is not None:
+                self._stderr.append(line)
+            if self.duration is None:
+                duration = _DURATION.search(line)
+                if duration:
+                    self.duration = (int(duration.group(1)) * 3600 + int(duration.group(2)) * 60
+                                     + float(duration.group(3)))
+        self._process.stderr.close()
+
+    def _handle_progress(self, key: str, value: str):
+        # out_time_us 与 out_time_ms 都以微秒为单位
+        if key in ("out_time_us", "out_time_ms") and value.isdigit() and self.duration:
+            self.progress = min(1.0, int(value) / 1e6 / self.duration)
+        elif key == "progress" and value == "end":
+            self.progress = 1.0
+        else:
+            return
+        if self.on_progress is not None:
+            self.on_progress(self.progress)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class FFmpegRunner:
+    """Runs FFmpeg commands with a shared concurrency limit, timeouts and progress
+
+    The limit applies to the FFmpeg processes of this Python process; pool
+    workers each have their own runner.
+    """
+
+    def __init__(self, max_concurrent: int = 2, timeout: Optional[float] = None, stderr_lines: int = 50):
+        self.logger = get_ffmpeg_logger()
+        self.max_concurrent = max(1, max_concurrent)
+        self.timeout = timeout
+        self.stderr_lines = stderr_lines
+        self._active = 0
+        self._condition = threading.Condition()
+
+    def configure(self, max_concurrent: int, timeout: Optional[float], stderr_lines: int):
+        """Change the limits; running commands keep their slots"""
+        with self._condition:
+            self.max_concurrent = max(1, max_concurrent)
+            self.timeout = timeout
+            self.stderr_lines = stderr_lines
+            self._condition.notify_all()
+
+    def _acquire(self, cancel: Optional[CancellationToken]):
+        with self._condition:
+            if self._active >= self.max_concurrent:
+                self.logger.debug(f"FFmpeg并发数已达上限{self.max_concurrent}，等待空闲")
+            # 等待空闲名额时定期检查取消标志
+            while self._active >= self.max_concurrent:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                self._condition.wait(0.1)
+            self._active += 1
+
+    def _release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    def open(self, command: Sequence[str], timeout: Optional[float] = -1,
+             cancel: Optional[CancellationToken] = None, duration: Optional[float] = None,
+             on_progress: Optional[Callable[[float], None]] = None,
+             keep_stderr: bool = False) -> FFmpegProcess:
+        """Start a command once a slot is free; the caller reads stdout and must close() it
+
+        timeout defaults to the runner's; pass None for commands that may
+        legitimately run as long as their consumer (e.g. a backpressured pipe).
+        duration (seconds of output) overrides the input duration for progress.
+        """
+        process = FFmpegProcess(
+            self, command, self.timeout if timeout == -1 else timeout,
+            cancel, duration, on_progress, keep_stderr
+        )
+        process.start()
+        return process
+
+    def run(self, command: Sequence[str], **kwargs) -> FFmpegResult:
+        """Run a command to completion and return its stdout; raises FFmpegError on failure"""
+        with self.open(command, **kwargs) as process:
+            stdout = process.stdout.read()
+            process.wait()
+            process.check()
+            return FFmpegResult(stdout, process.stderr_text())
+
+# 进程内共享的FFmpeg运行器
+ffmpeg_runner = FFmpegRunner()
+
+def configure_ffmpeg(config: dict):
+    """Apply the video_processing.ffmpeg.runner settings to the shared runner"""
+    runner_config = config['video_processing']['ffmpeg'].get('runner', {})
+    timeout = runner_config.get('timeout', 3600)
+    ffmpeg_runner.configure(
+        max_concurrent=int(runner_config.get('max_concurrent', 2)),
+        timeout=float(timeout) if timeout else None,
+        stderr_lines=int(runner_config.get('stderr_lines', 50))
+    )
@@ -0,0 +1,160 @@
+import re
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from .models import SegmentStore
+from .stitching import CHARACTER_LANGUAGES
+from utils.text import estimate_tokens
+from utils.logger.setup import get_whisper_logger
+
+_NGRAM_BASE = np.uint64(1000003)
+
+@dataclass
+class FilterReport:
+    """What the hallucination filter removed during one run"""
+    segments: int = 0
+    characters: int = 0
+    tokens: int = 0
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, reason: str, text: str):
+        self.segments += 1
+        self.characters += len(text)
+        self.tokens += estimate_tokens(text)
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def to_dict(self) -> Dict:
+        return {
+            'segments': self.segments,
+            'characters': self.characters,
+            'tokens': self.tokens,
+            'reasons': dict(self.reasons)
+        }
+
+    def summary(self) -> str:
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.reasons.items()))
+        return (f"Dropped {self.segments} hallucinated segments "
+                f"({self.characters} characters, ~{self.tokens} prompt tokens; {reasons})")
+
+class HallucinationFilter:
+    """Removes segments that look like Whisper hallucinations, a batch at a time
+
+    All checks run over whole SegmentStore columns: a compression ratio above
+    the threshold (repetitive output), a high no-speech probability together
+    with a low log probability (text invented over silence), a high share of
+    repeated n-grams inside one segment, and more than max_consecutive
+    identical segments in a row. The last check carries its state across
+    batches, so batches must be passed in timeline order.
+    """
+
+    def __init__(self, compression_ratio_threshold: float = 2.4, no_speech_threshold: float = 0.6,
+                 no_speech_logprob: float = -1.0, ngram: int = 3, min_ngrams: int = 8,
+                 max_repeat_ratio: float = 0.5, max_consecutive: int = 2,
+                 language: Optional[str] = None):
+        self.compression_ratio_threshold = compression_ratio_threshold
+        self.no_speech_threshold = no_speech_threshold
+        self.no_speech_logprob = no_speech_logprob
+        self.ngram = max(1, ngram)
+        self.min_ngrams = min_ngrams
+        self.max_repeat_ratio = max_repeat_ratio
+        self.max_consecutive = max(1, max_consecutive)
+        self.by_character = language in CHARACTER_LANGUAGES
+        self.logger = get_whisper_logger()
+        self.report = FilterReport()
+        self._token_ids: Dict[str, int] = {}
+        self._last_text: Optional[str] = None
+        self._last_run = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional['HallucinationFilter']:
+        """Build the filter from video_processing.whisper.hallucination; None if disabled"""
+        whisper_config = config['video_processing']['whisper']
+        filter_config = whisper_config.get('hallucination', {})
+        if not filter_config.get('enabled', True):
+            return None
+        return cls(
+            compression_ratio_threshold=filter_config.get('compression_ratio_threshold', 2.4),
+            no_speech_threshold=whisper_config.get('no_speech_threshold', 0.6),
+            no_speech_logprob=filter_config.get('no_speech_logprob', -1.0),
+            ngram=filter_config.get('ngram', 3),
+            min_ngrams=filter_config.get('min_ngrams', 8),
+            max_repeat_ratio=filter_config.get('max_repeat_ratio', 0.5),
+            max_consecutive=filter_config.get('max_consecutive', 2),
+            language=whisper_config.get('language')
+        )
+
+    def apply(self, segments: SegmentStore) -> SegmentStore:
+        """Return the segments that pass, recording the dropped ones in self.report"""
+        if not len(segments):
+            return segments
+        texts = segments.texts
+        checks = [
+            ("compression_ratio", segments.compression_ratio > self.compression_ratio_threshold),
+            ("no_speech", (segments.no_speech_prob > self.no_speech_threshold)
+             & (segments.avg_logprob < self.no_speech_logprob)),
+            ("repeated_ngrams", self._repeat_ratio(texts) > self.max_repeat_ratio),
+            ("repeated_segments", self._consecutive_repeats(texts))
+        ]
+
+        dropped = np.zeros(len(segments), dtype=bool)
+        for reason, mask in checks:
+            # 每段只按第一个命中的原因计数
+            for index in np.flatnonzero(mask & ~dropped).tolist():
+                self.report.add(reason, texts[index])
+                self.logger.debug(
+                    f"过滤疑似幻觉片段（{reason}）：{segments.start[index]:.1f}s "
+                    f"{texts[index][:40]}"
+                )
+            dropped |= mask
+        return segments.filter(~dropped) if dropped.any() else segments
+
+    def _tokens(self, text: str) -> List[str]:
+        if self.by_character:
+            return re.findall(r"\w", text)
+        return re.findall(r"\w+", text.lower())
+
+    def _repeat_ratio(self, texts: List[str]) -> np.ndarray:
+        """Share of each text's n-grams that repeat an earlier n-gram of the same text"""
+        tokens = [self._tokens(text) for text in texts]
+        lengths = np.array([len(t) for t in tokens], dtype=np.int64)
+        ids = np.fromiter(
+            (self._token_ids.setdefault(token, len(self._token_ids)) for group in tokens for token in group),
+            dtype=np.uint64, count=int(lengths.sum())
+        )
+        owner = np.repeat(np.arange(len(texts), dtype=np.uint64), lengths)
+
+        count = len(ids) - self.ngram + 1
+        ratio = np.zeros(len(texts), dtype=np.float64)
+        if count <= 0:
+            return ratio
+        # 以多项式哈希编码每个 n 元组，并混入所属段号，一次 unique 即可得到各段的去重数量
+        keys = np.zeros(count, dtype=np.uint64)
+        for offset in range(self.ngram):
+            keys = keys * _NGRAM_BASE + ids[offset:offset + count]
+        valid = owner[:count] == owner[self.ngram - 1:]
+        keys, starts = keys[valid], owner[:count][valid]
+        totals = np.bincount(starts.astype(np.int64), minlength=len(texts))
+        _, first = np.unique(keys * _NGRAM_BASE + starts, return_index=True)
+        uniques = np.bincount(starts[first].astype(np.int64), minlength=len(texts))
+
+        checked = totals >= self.min_ngrams
+        ratio[checked] = 1.0 - uniques[checked] / totals[checked]
+        return ratio
+
+    def _consecutive_repeats(self, texts: List[str]) -> np.ndarray:
+        """Mask of segments beyond the first max_consecutive of a run of identical texts"""
+        normalised = ["".join(self._tokens(text)) for text in texts]
+        keys = np.array(normalised, dtype=object)
+        same = np.empty(len(texts), dtype=bool)
+        same[0] = normalised[0] == self._last_text and normalised[0] != ""
+        same[1:] = (keys[1:] == keys[:-1]) & (keys[1:] != "")
+
+        # 每个位置在相同文本连续段中的序号，连续段可延续自上一批
+        run_start = np.maximum.accumulate(np.where(same, 0, np.arange(len(texts))))
+        position = np.arange(len(texts)) - run_start
+        carried = run_start == 0
+        if same[0]:
+            position[carried] += self._last_run
+        self._last_text = normalised[-1]
+        self._last_run = int(position[-1]) + 1
+        return position >= self.max_consecutive
@@ -1,6 +1,10 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Union, TYPE_CHECKING
 from pathlib import Path
+import numpy as np
+
+if TYPE_CHECKING:
+    from .silence import SilenceMap
 
 @dataclass
 class TranscriptionSegment:
@@ -11,24 +15,287 @@ class TranscriptionSegment:
     avg_logprob: float   # Average log probability
     no_speech_prob: float # Probability of no speech
     compression_ratio: float  # Audio compression ratio
+    needs_review: bool = False  # Low confidence even after re-decoding
     
     @property
     def confidence(self) -> float:
         """Convert log probability to confidence score (0-1)"""
         return min(1.0, max(0.0, float(np.exp(self.avg_logprob))))
 
+_FLOAT_COLUMNS = ("start", "end", "avg_logprob", "no_speech_prob", "compression_ratio")
+
+def _format_times(seconds: np.ndarray) -> List[str]:
+    """Vectorised ProcessingResult._format_time"""
+    hours = (seconds // 3600).astype(np.int64)
+    minutes = ((seconds % 3600) // 60).astype(np.int64)
+    remainder = seconds % 60
+    milliseconds = ((remainder % 1) * 1000).astype(np.int64)
+    return [
+        f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+        for h, m, s, ms in zip(hours.tolist(), minutes.tolist(),
+                               remainder.astype(np.int64).tolist(), milliseconds.tolist())
+    ]
+
+def _column(name: str, doc: str) -> property:
+    return property(lambda self: self._columns[name][:self._size], doc=doc)
+
+class SegmentStore:
+    """Array-backed, append-only collection of transcription segments
+
+    Numeric fields are kept in NumPy columns and all texts in one shared
+    string addressed by end offsets, so a segment costs a few dozen bytes
+    plus its characters instead of a dataclass instance with seven boxed
+    fields. Indexing with an int returns a TranscriptionSegment copy;
+    slices, index arrays and boolean masks return a new store.
+    """
+
+    def __init__(self, capacity: int = 0):
+        capacity = max(16, capacity)
+        self._size = 0
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.empty(capacity, dtype=np.float64) for name in _FLOAT_COLUMNS
+        }
+        self._columns['needs_review'] = np.zeros(capacity, dtype=bool)
+        self._text_ends = np.empty(capacity, dtype=np.int64)
+        self._text = ""
+        self._text_parts: List[str] = []  # 追加的文本先暂存，读取时再合并进文本池
+        self._text_length = 0
+
+    start = _column('start', "Start times in seconds")
+    end = _column('end', "End times in seconds")
+    avg_logprob = _column('avg_logprob', "Average log probabilities")
+    no_speech_prob = _column('no_speech_prob', "No-speech probabilities")
+    compression_ratio = _column('compression_ratio', "Compression ratios")
+    needs_review = _column('needs_review', "Flags of segments still low-confidence after re-decoding")
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[TranscriptionSegment]) -> 'SegmentStore':
+        """Build a store from TranscriptionSegment objects"""
+        segments = list(segments)
+        store = cls(len(segments))
+        count = len(segments)
+        for name in _FLOAT_COLUMNS:
+            store._columns[name][:count] = [getattr(segment, name) for segment in segments]
+        store._columns['needs_review'][:count] = [segment.needs_review for segment in segments]
+        store._set_texts([segment.text for segment in segments])
+        store._size = count
+        return store
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> 'SegmentStore':
+        """Build a store from dicts with the TranscriptionSegment fields"""
+        store = cls(len(records))
+        count = len(records)
+        for name in _FLOAT_COLUMNS:
+            store._columns[name][:count] = [record[name] for record in records]
+        store._columns['needs_review'][:count] = [record.get('needs_review', False) for record in records]
+        store._set_texts([record['text'] for record in records])
+        store._size = count
+        return store
+
+    def to_records(self) -> List[Dict]:
+        """The segments as dicts with the TranscriptionSegment fields"""
+        columns = [self._columns[name][:self._size].tolist() for name in _FLOAT_COLUMNS]
+        needs_review = self.needs_review.tolist()
+        return [
+            dict(zip(_FLOAT_COLUMNS, values), text=text, needs_review=flag)
+            for *values, text, flag in zip(*columns, self.texts, needs_review)
+        ]
+
+    def _set_texts(self, texts: List[str]):
+        self._text = "".join(texts)
+        self._text_parts = []
+        self._text_length = len(self._text)
+        self._text_ends[:len(texts)] = np.cumsum([len(text) for text in texts], dtype=np.int64)
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self._text_ends):
+            return
+        # 容量按倍数增长，追加的均摊开销为常数
+        capacity = max(capacity, 2 * len(self._text_ends))
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        grown = np.empty(capacity, dtype=np.int64)
+        grown[:self._size] = self._text_ends[:self._size]
+        self._text_ends = grown
+
+    def _pool(self) -> str:
+        if self._text_parts:
+            self._text = "".join([self._text, *self._text_parts])
+            self._text_parts = []
+        return self._text
+
+    def append(self, segment: TranscriptionSegment):
+        """Add one segment at the end"""
+        self.extend((segment,))
+
+    def extend(self, segments: Union['SegmentStore', Iterable[TranscriptionSegment]]):
+        """Add segments at the end"""
+        if not isinstance(segments, SegmentStore):
+            segments = SegmentStore.from_segments(segments)
+        count = len(segments)
+        if not count:
+            return
+        self._reserve(self._size + count)
+        for name, column in self._columns.items():
+            column[self._size:self._size + count] = segments._columns[name][:count]
+        self._text_ends[self._size:self._size + count] = segments._text_ends[:count] + self._text_length
+        text = segments._pool()[:segments._text_ends[count - 1]]
+        self._text_parts.append(text)
+        self._text_length += len(text)
+        self._size += count
+
+    @property
+    def texts(self) -> List[str]:
+        """Texts of all segments"""
+        pool = self._pool()
+        ends = self._text_ends[:self._size].tolist()
+        return [pool[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+    @property
+    def confidence(self) -> np.ndarray:
+        """Confidence scores (0-1) of all segments, see TranscriptionSegment.confidence"""
+        return np.clip(np.exp(self.avg_logprob), 0.0, 1.0)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and the text pool"""
+        columns = sum(column.nbytes for column in self._columns.values()) + self._text_ends.nbytes
+        return columns + self._text_length
+
+    def filter(self, mask: np.ndarray) -> 'SegmentStore':
+        """Segments where the boolean mask is true, e.g. store.filter(store.confidence > 0.5)"""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self._size,):
+            raise ValueError(f"Mask of shape {mask.shape} does not match {self._size} segments")
+        return self._take(np.flatnonzero(mask))
+
+    def _take(self, indices: np.ndarray) -> 'SegmentStore':
+        store = SegmentStore(len(indices))
+        for name, column in self._columns.items():
+            store._columns[name][:len(indices)] = column[:self._size][indices]
+        pool = self._pool()
+        ends = self._text_ends[:self._size]
+        starts = np.concatenate(([0], ends[:-1]))
+        store._set_texts([pool[a:b] for a, b in zip(starts[indices].tolist(), ends[indices].tolist())])
+        store._size = len(indices)
+        return store
+
+    def to_srt(self, first_index: int = 1) -> str:
+        """SRT entries for all segments, numbered from first_index"""
+        if not self._size:
+            return ""
+        starts = _format_times(self.start)
+        ends = _format_times(self.end)
+        return "".join(
+            f"{number}\n{start} --> {end}\n{text}\n\n"
+            for number, start, end, text in zip(range(first_index, first_index + self._size),
+                                                starts, ends, self.texts)
+        )
+
+    def to_text(self) -> str:
+        """Texts of all segments, one per line"""
+        return "\n".join(self.texts)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[TranscriptionSegment]:
+        for index in range(self._size):
+            yield self[index]
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            index = int(key) + self._size if key < 0 else int(key)
+            if not 0 <= index < self._size:
+                raise IndexError("Segment index out of range")
+            text_start = int(self._text_ends[index - 1]) if index else 0
+            return TranscriptionSegment(
+                start=float(self._columns['start'][index]),
+                end=float(self._columns['end'][index]),
+                text=self._pool()[text_start:int(self._text_ends[index])],
+                avg_logprob=float(self._columns['avg_logprob'][index]),
+                no_speech_prob=float(self._columns['no_speech_prob'][index]),
+                compression_ratio=float(self._columns['compression_ratio'][index]),
+                needs_review=bool(self._columns['needs_review'][index])
+            )
+        key = np.asarray(key) if not isinstance(key, slice) else key
+        if isinstance(key, np.ndarray) and key.dtype == bool:
+            return self.filter(key)
+        return self._take(np.arange(self._size)[key])
+
+    def __repr__(self) -> str:
+        return f"SegmentStore({self._size} segments)"
+
+@dataclass
+class AudioChunk:
+    """A unit of transcription work: a segment file or a slice of decoded audio"""
+    index: int                        # Position of the chunk in the source
+    start: float                      # Start time in the source, in seconds
+    end: float                        # End time in the source, in seconds
+    audio: Optional[np.ndarray] = None  # 16 kHz mono float32 samples incl. overlap (audio mode)
+    path: Optional[str] = None        # Segment file path (segment mode)
+    silence: Optional["SilenceMap"] = None  # Silent intervals of the audio, relative to audio_start
+    lead: float = 0.0                 # Overlap decoded before start, in seconds
+    tail: float = 0.0                 # Overlap decoded after end, in seconds
+    source: Optional[str] = None      # Source media to decode overlap from (segment mode)
+
+    @property
+    def duration(self) -> float:
+        """Chunk duration in seconds"""
+        return self.end - self.start
+
+    @property
+    def audio_start(self) -> float:
+        """Source time of the first transcribed sample, including the leading overlap"""
+        return self.start - self.lead
+
+    @property
+    def audio_end(self) -> float:
+        """Source time of the last transcribed sample, including the trailing overlap"""
+        return self.end + self.tail
+
+    @property
+    def label(self) -> str:
+        """Human readable identifier used in logs and warnings"""
+        if self.path:
+            return self.path
+        return f"#{self.index + 1} [{self.start:.1f}s-{self.end:.1f}s]"
+
 @dataclass
 class ProcessingResult:
     """Represents the result of video processing"""
     video_path: Path
-    segments: List[TranscriptionSegment]
+    segments: SegmentStore  # Lists of TranscriptionSegment are converted on assignment
     srt_path: Optional[Path] = None
     text_path: Optional[Path] = None
     warnings: List[str] = None
+    timings: Dict[str, float] = None  # Wall time per processing stage, in seconds
+    audio_duration: float = 0.0  # Duration of the source audio, in seconds
+    filtered: Dict = None  # Segments, characters and prompt tokens dropped as hallucinations
+
+    def __setattr__(self, name, value):
+        # 文本段统一以列式存储保存，仍可直接赋值列表
+        if name == 'segments' and not isinstance(value, SegmentStore):
+            value = SegmentStore.from_segments(value or [])
+        super().__setattr__(name, value)
 
     def __post_init__(self):
         if self.warnings is None:
             self.warnings = []
+        if self.timings is None:
+            self.timings = {}
+        if self.filtered is None:
+            self.filtered = {}
+
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        """Total processing time divided by audio duration (lower is faster)"""
+        if not self.audio_duration or 'total' not in self.timings:
+            return None
+        return self.timings['total'] / self.audio_duration
 
     def add_warning(self, warning: str):
         """Add a warning message"""
@@ -40,23 +307,11 @@ class ProcessingResult:
 
     def get_full_text(self) -> str:
         """Get the full transcribed text"""
-        return "\n".join(segment.text for segment in self.segments)
+        return self.segments.to_text()
 
     def get_srt_content(self) -> str:
         """Generate SRT format content"""
-        srt_content = []
-        for i, segment in enumerate(self.segments, 1):
-            # Convert seconds to SRT time format (HH:MM:SS,mmm)
-            start = self._format_time(segment.start)
-            end = self._format_time(segment.end)
-            
-            srt_content.extend([
-                str(i),
-                f"{start} --> {end}",
-                segment.text,
-                ""  # Empty line between entries
-            ])
-        return "\n".join(srt_content)
+        return self.segments.to_srt()
 
     @staticmethod
     def _format_time(seconds: float) -> str:
@@ -0,0 +1,101 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+from .models import TranscriptionSegment, AudioChunk
+from .exceptions import ProcessingCancelled
+from .profiles import InferenceProfile, estimate_model_bytes
+from utils.logger.setup import get_logger
+
+# 每个工作进程持有一个独立的处理器实例（含已加载的Whisper模型）
+_worker_processor = None
+
+def resolve_pool_size(config: dict, use_cuda: bool) -> Tuple[int, int]:
+    """Resolve (workers, threads_per_worker) from the parallel config section"""
+    parallel_config = config['video_processing'].get('parallel', {})
+    workers = max(1, int(parallel_config.get('workers', 1)))
+
+    # GPU 推理保持单模型顺序执行，多进程只会争抢显存
+    if use_cuda:
+        return 1, 0
+
+    cpu_count = os.cpu_count() or 1
+    workers = min(workers, cpu_count)
+    threads_per_worker = int(parallel_config.get('threads_per_worker', 0))
+    if threads_per_worker <= 0:
+        threads_per_worker = max(1, cpu_count // workers)
+    return workers, threads_per_worker
+
+def create_pool(config: dict, workers: int, threads_per_worker: int) -> ProcessPoolExecutor:
+    """Create a process pool whose workers each load their own Whisper model
+
+    The pool carries a cancel_event shared with its workers: setting it
+    interrupts the chunks they are transcribing, see pool_cancel_event.
+    """
+    log_pool_memory(config, workers)
+    # 使用 spawn 避免在已初始化 torch/Qt 的进程中 fork
+    context = multiprocessing.get_context("spawn")
+    cancel_event = context.Event()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(config, threads_per_worker, cancel_event)
+    )
+    pool.cancel_event = cancel_event
+    return pool
+
+def log_pool_memory(config: dict, workers: int):
+    """Log the model memory a pool will take and warn when it exceeds the registry budget
+
+    Every worker loads its own model into its own registry, so
+    models.whisper.registry.memory_budget_mb cannot bound the pool's total.
+    """
+    logger = get_logger("video.parallel")
+    whisper_config = config['models']['whisper']
+    quantized = InferenceProfile.from_config(config).quantize
+    model_bytes = estimate_model_bytes(whisper_config['model_size'], quantized)
+    if model_bytes is None:
+        return
+    total = model_bytes * workers
+    logger.info(
+        f"转写进程池：{workers}个进程各自加载{whisper_config['model_size']}模型"
+        f"（{'int8' if quantized else 'fp32'}），预计占用约{total / 1024 ** 3:.1f}GB内存"
+    )
+    budget_mb = whisper_config.get('registry', {}).get('memory_budget_mb')
+    if budget_mb and total > int(budget_mb) * 1024 * 1024:
+        logger.warning(
+            f"进程池模型内存约{total / 1024 ** 2:.0f}MB，超过内存预算{budget_mb}MB；"
+            f"可减少 parallel.workers 或使用 fast_cpu 推理配置"
+        )
+
+def pool_cancel_event(pool: ProcessPoolExecutor):
+    """The cancel event shared with the workers of a pool from create_pool, if any"""
+    return getattr(pool, 'cancel_event', None)
+
+def _init_worker(config: dict, threads_per_worker: int, cancel_event=None):
+    """Initialize a worker process: partition torch threads and load the model"""
+    global _worker_processor
+    from .processor import VideoProcessor
+
+    _worker_processor = VideoProcessor(config=config)
+    _worker_processor._get_engine().set_num_threads(threads_per_worker)
+    # 主进程取消时置位，正在转写的块在下一个解码步中止
+    _worker_processor._get_engine().cancel_event = cancel_event
+    if cancel_event is not None:
+        # 让工作进程的取消令牌跟随共享事件，取消时同时终止进程内的 FFmpeg 解码
+        _worker_processor._cancel.watch(cancel_event)
+    _worker_processor.whisper_logger.info(
+        f"工作进程 {os.getpid()} 初始化，torch线程数：{threads_per_worker}"
+    )
+    _worker_processor._load_model()
+
+def transcribe_in_worker(chunk: AudioChunk) -> List[TranscriptionSegment]:
+    """Transcribe one segment inside a pool worker"""
+    cancel_event = _worker_processor._get_engine().cancel_event
+    if cancel_event is not None:
+        if cancel_event.is_set():
+            raise ProcessingCancelled()
+        # 上一次运行的取消已被主进程清除，新的块从未取消状态开始
+        _worker_processor._cancel.reset()
+    return _worker_processor._transcribe_segment(chunk)
@@ -1,30 +1,76 @@
 import os
-import subprocess
-import whisper
+import time
+import queue
+import hashlib
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import replace
 import yaml
-import torch
 import numpy as np
 from pathlib import Path
-from typing import List, Optional, Callable
-from concurrent.futures import ThreadPoolExecutor
-from .exceptions import FFmpegError, WhisperError, SilenceDetectionError, ConfidenceThresholdError
-from .models import TranscriptionSegment, ProcessingResult
+from typing import Dict, List, Optional, Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from .exceptions import (FFmpegError, WhisperError, SilenceDetectionError, ConfidenceThresholdError,
+                         ProcessingCancelled, StorageBudgetError)
+from .models import TranscriptionSegment, ProcessingResult, AudioChunk
+from .audio import SAMPLE_RATE, decode_audio, split_audio, slice_audio
+from .silence import SilenceMap, SpeechLayout
+from .chunking import plan_chunks
+from .cache import TranscriptionCache
+from .registry import configure_registry
+from .profiles import InferenceProfile
+from .engines import TranscriptionEngine, create_engine, engine_name
+from .recovery import SegmentRecovery
+from .checkpoint import JobCheckpoint
+from .writers import StreamingTranscriptWriter
+from .hallucination import HallucinationFilter
+from .streaming import StreamingChunkPlanner, PcmChunkStream
+from .parallel import resolve_pool_size, create_pool, pool_cancel_event, transcribe_in_worker
+from .cancellation import CancellationToken
+from .ffmpeg import ffmpeg_runner, configure_ffmpeg
+from .storage import TempStorage, TempJob
 from utils.logger.setup import get_logger, get_ffmpeg_logger, get_whisper_logger
 
 class VideoProcessor:
-    def __init__(self, config_path: str = "config/settings.yaml", use_cuda: bool = False):
+    # 取消请求到处理停止的目标耗时（秒），超出时记录警告
+    CANCEL_LATENCY_BUDGET = 1.0
+
+    def __init__(self, config_path: str = "config/settings.yaml", use_cuda: bool = False,
+                 config: Optional[dict] = None):
         self.logger = get_logger("video.processor")
         self.ffmpeg_logger = get_ffmpeg_logger()
         self.whisper_logger = get_whisper_logger()
         
-        self.config = self._load_config(config_path)
-        self.model = None
+        self.config = config if config is not None else self._load_config(config_path)
+        self.engine: Optional[TranscriptionEngine] = None
+        self._recovery: Optional[SegmentRecovery] = None
         self.processing = False
+        self._cancel = CancellationToken()
+        self.last_cancel_latency: Optional[float] = None
+        self.storage = TempStorage.from_config(self.config)
+        self._temp_job: Optional[TempJob] = None
         self._progress_callback = None
-        self.use_cuda = use_cuda and torch.cuda.is_available()
+        self._output_name: Optional[str] = None
+        self._checkpoint = None
+        self._writer = None
+        self._pool = None
+        self._pool_workers = 1
+        self._owns_pool = False
+        # 仅在需要CUDA时才导入torch，避免拖慢界面启动
+        self.use_cuda = use_cuda and self.is_cuda_available()
         self._ensure_directories()
+        self.cache = TranscriptionCache.from_config(self.config)
+        configure_registry(self.config)
+        configure_ffmpeg(self.config)
         
-        self.logger.info(f"初始化视频处理器，CUDA加速：{'启用' if self.use_cuda else '禁用'}")
+        self.logger.info(
+            f"初始化视频处理器，CUDA加速：{'启用' if self.use_cuda else '禁用'}，推理配置：{self.profile.name}"
+        )
+
+    @property
+    def profile(self) -> InferenceProfile:
+        """Inference profile currently selected in the configuration"""
+        return InferenceProfile.from_config(self.config)
 
     def _load_config(self, config_path: str) -> dict:
         """Load configuration from YAML file"""
@@ -51,175 +97,646 @@ class VideoProcessor:
         """Set callback for progress updates"""
         self._progress_callback = callback
 
+    def _stage_progress(self, start: float, end: float, status: str) -> Callable[[float], None]:
+        """Map an FFmpeg completion fraction onto the [start, end] part of the progress bar"""
+        return lambda fraction: self._update_progress(
+            start + (end - start) * fraction, f"{status} {fraction:.0%}..."
+        )
+
     def _update_progress(self, progress: float, status: str):
         """Update progress through callback if set"""
         if self._progress_callback:
             self._progress_callback(progress, status)
         self.logger.debug(f"进度更新：{progress:.1%} - {status}")
 
-    def _split_video(self, video_path: str) -> List[str]:
+    def _split_video(self, video_path: str) -> List[AudioChunk]:
         """Split video into segments using FFmpeg"""
         self.ffmpeg_logger.info(f"开始分割视频：{video_path}")
         
-        temp_dir = Path(self.config['video_processing']['temp_dir'])
         segment_length = self.config['video_processing']['ffmpeg']['segment_length']
         
-        # Create unique directory for this video's segments
-        video_id = Path(video_path).stem
-        segments_dir = temp_dir / video_id
-        segments_dir.mkdir(exist_ok=True)
+        # 分段只复制音轨，源文件大小是其占用空间的上限；空间足够时放在内存盘上
+        expected_bytes = os.path.getsize(video_path)
+        segments_dir = self._temp_job.chunk_dir(expected_bytes)
         
-        # Split video into segments
-        segment_pattern = str(segments_dir / f"segment_%03d.mp4")
+        # Split the audio track into segments
+        segment_pattern = str(segments_dir / f"segment_%03d.mka")
+        segment_list = segments_dir / "segments.csv"
         command = [
-            "ffmpeg", "-i", video_path,
+            "ffmpeg", "-y", "-i", video_path,
+            "-map", "0:a:0",
             "-f", "segment",
             "-segment_time", str(segment_length),
+            "-segment_list", str(segment_list),
+            "-segment_list_type", "csv",
             "-reset_timestamps", "1",
             "-c", "copy",
             segment_pattern
         ]
         
         try:
-            self.ffmpeg_logger.debug(f"执行FFmpeg命令：{' '.join(command)}")
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # 实时记录FFmpeg输出
-            while True:
-                output = process.stderr.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    self.ffmpeg_logger.debug(output.strip())
-            
-            if process.returncode != 0:
-                raise FFmpegError(f"FFmpeg返回错误代码：{process.returncode}")
+            with self._temp_job.reserve(expected_bytes, segments_dir == self._temp_job.dir, self._cancel):
+                ffmpeg_runner.run(
+                    command, cancel=self._cancel,
+                    on_progress=self._stage_progress(0.15, 0.18, "分割视频")
+                )
             
-            # Return sorted list of segment paths
-            segments = sorted(str(p) for p in segments_dir.glob("segment_*.mp4"))
-            self.ffmpeg_logger.info(f"视频分割完成，共{len(segments)}个片段")
-            return segments
+            # Segment list rows are "<file>,<start>,<end>" with exact cut times
+            overlap = self.config['video_processing'].get('chunking', {}).get('overlap', 0.0)
+            chunks = []
+            for index, line in enumerate(segment_list.read_text(encoding='utf-8').splitlines()):
+                if not line.strip():
+                    continue
+                name, start, end = line.rsplit(',', 2)
+                # 固定时长切分会切断词语，转写时从源文件补解码两侧的重叠部分
+                chunks.append(AudioChunk(
+                    index=index,
+                    start=float(start),
+                    end=float(end),
+                    path=str(segments_dir / name),
+                    lead=min(overlap, float(start)),
+                    tail=overlap,
+                    source=video_path
+                ))
+            if chunks:
+                chunks[-1].tail = 0.0
+            self.ffmpeg_logger.info(f"视频分割完成，共{len(chunks)}个片段")
+            return chunks
             
+        except (ProcessingCancelled, StorageBudgetError):
+            raise
         except Exception as e:
             self.ffmpeg_logger.error(f"视频分割失败：{str(e)}")
             raise FFmpegError(f"Failed to split video: {str(e)}")
 
-    def _detect_silence(self, segment_path: str) -> bool:
-        """Detect if segment contains silence longer than threshold"""
-        self.ffmpeg_logger.debug(f"检测静音：{segment_path}")
-        silence_threshold = self.config['video_processing']['ffmpeg']['silence_threshold']
+    def _extract_audio(self, video_path: str) -> np.ndarray:
+        """Decode the audio track once into 16 kHz mono PCM"""
+        self.ffmpeg_logger.info(f"开始提取音频：{video_path}")
         
-        command = [
-            "ffmpeg", "-i", segment_path,
-            "-af", f"silencedetect=n=-50dB:d={silence_threshold}",
-            "-f", "null", "-"
-        ]
+        try:
+            audio = decode_audio(video_path, SAMPLE_RATE, cancel=self._cancel,
+                                 on_progress=self._stage_progress(0.15, 0.2, "提取音频"))
+        except ProcessingCancelled:
+            raise
+        except Exception as e:
+            self.ffmpeg_logger.error(f"音频提取失败：{str(e)}")
+            raise FFmpegError(f"Failed to extract audio: {str(e)}")
         
+        self.ffmpeg_logger.info(f"音频提取完成，时长{len(audio) / SAMPLE_RATE:.1f}秒")
+        return audio
+
+    def _prepare_chunks(self, video_path: str, result: ProcessingResult) -> List[AudioChunk]:
+        """Split or decode the video, build the silence map and plan transcription chunks"""
+        audio = None
+        if self.config['video_processing']['ffmpeg'].get('mode', 'segment') == 'audio':
+            audio = self._extract_audio(video_path)
+            result.audio_duration = len(audio) / SAMPLE_RATE
+            segments = None
+        else:
+            segments = self._split_video(video_path)
+
+        # Build the silence map once for the whole recording
         try:
-            self.ffmpeg_logger.debug(f"执行静音检测命令：{' '.join(command)}")
-            result = subprocess.run(command, check=True, capture_output=True, text=True)
-            
-            # Parse FFmpeg output to find silence duration
-            for line in result.stderr.split('\n'):
-                if "silence_duration" in line:
-                    duration = float(line.split("silence_duration: ")[1])
-                    if duration >= silence_threshold:
-                        self.ffmpeg_logger.warning(f"检测到静音段：{duration}秒")
-                        return True
-            return False
-            
-        except subprocess.CalledProcessError as e:
-            self.ffmpeg_logger.error(f"静音检测失败：{e.stderr}")
-            raise SilenceDetectionError(f"Failed to detect silence: {e.stderr}")
+            silence_map = self._build_silence_map(video_path, audio)
+        except SilenceDetectionError as e:
+            self.logger.warning(f"静音检测失败，将转写完整片段：{str(e)}")
+            result.add_warning(str(e))
+            silence_map = None
+
+        if audio is not None:
+            if silence_map is not None:
+                segments = self._plan_audio_chunks(audio, silence_map)
+            else:
+                segments = split_audio(
+                    audio, self.config['video_processing']['ffmpeg']['segment_length'], SAMPLE_RATE,
+                    overlap=self.config['video_processing'].get('chunking', {}).get('overlap', 0.0)
+                )
+
+        if silence_map is not None:
+            silence_threshold = self.config['video_processing']['ffmpeg']['silence_threshold']
+            for start, end in silence_map.long_silences(silence_threshold):
+                # 长时间静音需要人工检查
+                result.add_warning(f"Long silence detected: {start:.1f}s-{end:.1f}s")
+            for chunk in segments:
+                chunk.silence = silence_map.window(chunk.audio_start, chunk.audio_end)
+
+        if self._checkpoint is not None:
+            self._save_plan(segments, result.warnings, audio)
+        return segments
+
+    def _open_checkpoint(self, video_path: str) -> Optional[JobCheckpoint]:
+        """Open the job checkpoint under temp_dir/<job name> if checkpointing is enabled"""
+        if not self.config['video_processing'].get('checkpoint', {}).get('enabled', False):
+            return None
+
+        checkpoint = JobCheckpoint(self._temp_job.dir, video_path, self._cache_options())
+        if checkpoint.has_plan and not checkpoint.plan_is_intact():
+            self.logger.warning("检查点依赖的中间文件已丢失，重新处理")
+            checkpoint.clear()
+        return checkpoint
+
+    def _plan_audio_chunks(self, audio: np.ndarray, silence_map: SilenceMap) -> List[AudioChunk]:
+        """Cut decoded audio into evenly sized chunks at pauses, leaving out silent regions"""
+        chunking_config = self.config['video_processing'].get('chunking', {})
+        target_duration = chunking_config.get('target_duration', 120)
+        max_duration = chunking_config.get('max_duration', target_duration * 1.5)
+        skip_silence = self.config['video_processing']['ffmpeg'].get('min_skip_silence', 2.0)
+
+        ranges = plan_chunks(silence_map, target_duration, max_duration, skip_silence)
+        chunks = slice_audio(audio, ranges, SAMPLE_RATE, overlap=chunking_config.get('overlap', 0.0))
+        speech_time = sum(end - start for start, end in ranges)
+        self.logger.info(
+            f"分块规划完成：{len(chunks)}个块，转写时长{speech_time:.1f}/{silence_map.duration:.1f}秒"
+        )
+        return chunks
 
-    def _transcribe_segment(self, segment_path: str) -> List[TranscriptionSegment]:
-        """Transcribe a video segment using Whisper"""
+    def _build_silence_map(self, video_path: str, audio: Optional[np.ndarray] = None) -> SilenceMap:
+        """Compute the silence map of the whole recording in a single pass"""
+        ffmpeg_config = self.config['video_processing']['ffmpeg']
+        noise_db = ffmpeg_config.get('silence_noise_db', -50)
+        # 记录短停顿以便分块时在停顿处切分
+        min_duration = self.config['video_processing'].get('chunking', {}).get('min_pause', 0.3)
+
+        # 音频模式直接在已解码的PCM上计算能量，无需再次解码
+        if audio is not None:
+            silence_map = SilenceMap.from_audio(
+                audio, SAMPLE_RATE, noise_db=noise_db, min_duration=min_duration
+            )
+        else:
+            command = [
+                "ffmpeg", "-nostdin", "-i", video_path,
+                "-vn",
+                "-af", f"silencedetect=n={noise_db}dB:d={min_duration}",
+                "-f", "null", "-"
+            ]
+            try:
+                result = ffmpeg_runner.run(
+                    command, cancel=self._cancel, keep_stderr=True,
+                    on_progress=self._stage_progress(0.18, 0.2, "静音检测")
+                )
+                silence_map = SilenceMap.from_silencedetect(result.stderr)
+            except FFmpegError as e:
+                self.ffmpeg_logger.error(f"静音检测失败：{str(e)}")
+                raise SilenceDetectionError(f"Failed to detect silence: {str(e)}")
+
+        self.ffmpeg_logger.info(
+            f"静音检测完成：{len(silence_map.starts)}个静音区间，"
+            f"共{silence_map.total():.1f}/{silence_map.duration:.1f}秒"
+        )
+        return silence_map
+
+    def _transcribe_segment(self, chunk: AudioChunk) -> List[TranscriptionSegment]:
+        """Transcribe a chunk with the configured engine"""
         try:
-            self.whisper_logger.info(f"开始转写片段：{segment_path}")
+            self.whisper_logger.info(f"开始转写片段：{chunk.label}")
+            audio, audio_start = self._load_chunk_audio(chunk)
+            
+            # Skip silent ranges instead of feeding dead air to Whisper
+            layout = None
+            if chunk.silence is not None:
+                min_silence = self.config['video_processing']['ffmpeg'].get('min_skip_silence', 2.0)
+                speech_ranges = chunk.silence.speech_ranges(min_silence)
+                if not speech_ranges:
+                    self.whisper_logger.info(f"片段全部为静音，跳过：{chunk.label}")
+                    return []
+                if len(chunk.silence.long_silences(min_silence)) > 0:
+                    layout = SpeechLayout(speech_ranges)
+                    audio = layout.gather(audio, SAMPLE_RATE)
+                    self.whisper_logger.debug(
+                        f"跳过静音区间：{chunk.silence.total():.1f}秒，"
+                        f"实际转写{len(audio) / SAMPLE_RATE:.1f}秒"
+                    )
             
-            # Check for long silence
-            if self._detect_silence(segment_path):
-                raise SilenceDetectionError(f"Long silence detected in segment: {segment_path}")
+            # Transcribe with the configured engine
+            language = self.config['video_processing']['whisper']['language']
+            task = self.config['video_processing']['whisper']['task']
+            raw_segments = self.engine.transcribe(audio, language=language, task=task)
             
-            # Transcribe using Whisper
-            self.whisper_logger.debug("调用Whisper模型")
-            result = self.model.transcribe(
-                segment_path,
-                language=self.config['video_processing']['whisper']['language'],
-                task=self.config['video_processing']['whisper']['task']
-            )
+            recovery = self._get_recovery()
+            if recovery.enabled:
+                # Re-decode only failing ranges and keep the good segments
+                raw_segments = recovery.recover(audio, raw_segments, language, task)
+            else:
+                for segment in raw_segments:
+                    if not segment.text:
+                        self.whisper_logger.warning("检测到空文本片段")
+                        raise ConfidenceThresholdError(0.0, 1.0)
+                    if segment.avg_logprob < recovery.logprob_threshold:
+                        self.whisper_logger.warning(
+                            f"片段对数概率低于阈值：{segment.avg_logprob:.2f} < {recovery.logprob_threshold}"
+                        )
+                        raise ConfidenceThresholdError(float(np.exp(segment.avg_logprob)),
+                            float(np.exp(recovery.logprob_threshold)))
             
-            # Convert Whisper segments to our format
+            # Map segments onto the source timeline
             segments = []
-            for segment in result['segments']:
-                text = segment.get('text', '').strip()
-                avg_logprob = segment.get('avg_logprob', float('-inf'))
-                no_speech_prob = segment.get('no_speech_prob', 1.0)
-                compression_ratio = segment.get('compression_ratio', 0.0)
+            for segment in raw_segments:
+                start, end = segment.start, segment.end
+                if layout is not None:
+                    start = layout.to_source(start)
+                    end = layout.to_source(end, is_end=True)
+                # Rebase onto the global timeline of the source video
+                start += audio_start
+                end += audio_start
                 
-                # Check for empty text
-                if not text:
-                    self.whisper_logger.warning("检测到空文本片段")
-                    raise ConfidenceThresholdError(0.0, 1.0)
-                
-                # Check log probability threshold
-                logprob_threshold = self.config['video_processing']['whisper'].get('logprob_threshold', -1.0)
-                if avg_logprob < logprob_threshold:
-                    self.whisper_logger.warning(
-                        f"片段对数概率低于阈值：{avg_logprob:.2f} < {logprob_threshold}"
-                    )
-                    raise ConfidenceThresholdError(float(np.exp(avg_logprob)),
-                        float(np.exp(logprob_threshold)))
-                
-                # Check for no speech probability
-                if no_speech_prob > 0.8:  # 高概率是非语音
-                    self.whisper_logger.warning(
-                        f"检测到可能的非语音片段：no_speech_prob = {no_speech_prob:.2f}"
-                    )
-                
-                segments.append(TranscriptionSegment(
-                    start=segment['start'],
-                    end=segment['end'],
-                    text=text,
-                    avg_logprob=avg_logprob,
-                    no_speech_prob=no_speech_prob,
-                    compression_ratio=compression_ratio
-                ))
+                segments.append(replace(segment, start=start, end=end))
                 self.whisper_logger.debug(
-                    f"转写片段：{segment['start']:.1f}-{segment['end']:.1f} "
-                    f"对数概率：{avg_logprob:.2f} "
-                    f"置信度：{float(np.exp(avg_logprob)):.2f}"
+                    f"转写片段：{start:.1f}-{end:.1f} "
+                    f"对数概率：{segment.avg_logprob:.2f} "
+                    f"置信度：{segment.confidence:.2f}"
                 )
             
             self.whisper_logger.info(f"片段转写完成，共{len(segments)}个文本段")
             return segments
             
         except Exception as e:
-            if isinstance(e, (SilenceDetectionError, ConfidenceThresholdError)):
+            if isinstance(e, (ConfidenceThresholdError, ProcessingCancelled)):
                 raise
             self.whisper_logger.error(f"转写失败：{str(e)}")
             raise WhisperError(f"Transcription failed: {str(e)}")
 
+    def _load_chunk_audio(self, chunk: AudioChunk) -> Tuple[np.ndarray, float]:
+        """Return the chunk's samples including its overlap, and their start time in the source"""
+        if chunk.audio is not None:
+            return chunk.audio, chunk.audio_start
+
+        audio = decode_audio(chunk.path, SAMPLE_RATE, cancel=self._cancel)
+        audio_start = chunk.start
+        if chunk.source is not None and chunk.lead > 0:
+            head = decode_audio(chunk.source, SAMPLE_RATE, start=chunk.start - chunk.lead, duration=chunk.lead,
+                                cancel=self._cancel)
+            audio = np.concatenate((head, audio))
+            audio_start -= len(head) / SAMPLE_RATE
+        if chunk.source is not None and chunk.tail > 0:
+            tail = decode_audio(chunk.source, SAMPLE_RATE, start=chunk.end, duration=chunk.tail,
+                                cancel=self._cancel)
+            audio = np.concatenate((audio, tail))
+        return audio, audio_start
+
+    def _get_engine(self) -> TranscriptionEngine:
+        """Create the configured transcription engine on first use"""
+        if self.engine is not None:
+            return self.engine
+
+        device = "cpu"
+        if self.use_cuda:
+            import torch
+
+            # 设置 CUDA 设备
+            cuda_device = self.config['models']['whisper'].get('cuda_device_index', 0)
+            torch.cuda.set_device(cuda_device)
+            device = f"cuda:{cuda_device}"
+            self.whisper_logger.info(f"使用 CUDA 设备 {cuda_device}")
+        
+        # 设置环境变量以禁用 Triton 警告
+        if not self.config['video_processing']['whisper'].get('use_triton', True):
+            os.environ['TRITON_DISABLE_AUTO_MIXED_PRECISION'] = '1'
+            os.environ['TRITON_DISABLE_DYNAMIC_PARALLELISM'] = '1'
+        
+        self.engine = create_engine(self.config, device)
+        self.engine.cancel_event = self._cancel
+        self.whisper_logger.info(f"转写引擎：{self.engine.name}")
+        return self.engine
+
+    def _get_recovery(self) -> SegmentRecovery:
+        """Create the low-confidence recovery helper bound to the current engine"""
+        if self._recovery is None or self._recovery.engine is not self.engine:
+            self._recovery = SegmentRecovery(self.config, self._get_engine())
+        return self._recovery
+
+    def _load_model(self):
+        """Load the engine's model (shared through the registry) if not held yet"""
+        engine = self._get_engine()
+        if not engine.is_loaded:
+            engine.load()
+
+    def _release_model(self):
+        """Release the engine's model; registry models stay cached until evicted"""
+        if self.engine is not None:
+            self.engine.release()
+        if self._recovery is not None:
+            self._recovery.release()
+
+    def _transcribe_sequential(self, segments: List[AudioChunk],
+                               result: ProcessingResult) -> Dict[int, List[TranscriptionSegment]]:
+        """Transcribe segments one by one with the in-process model"""
+        segment_results = {}
+        total_segments = len(segments)
+        for i, chunk in enumerate(segments, 1):
+            if self._cancel.cancelled:
+                self.logger.warning("处理被用户取消")
+                raise ProcessingCancelled()
+
+            progress = 0.2 + (0.7 * i / total_segments)
+            self._update_progress(progress, f"转写分段 {i}/{total_segments}...")
+            
+            try:
+                segment_results[chunk.index] = self._complete_chunk(
+                    chunk, self._transcribe_segment(chunk), [], result
+                )
+            except ConfidenceThresholdError as e:
+                self.logger.warning(f"片段处理警告：{str(e)}")
+                segment_results[chunk.index] = self._complete_chunk(chunk, [], [str(e)], result)
+        return segment_results
+
+    def _transcribe_parallel(self, segments: List[AudioChunk], result: ProcessingResult,
+                             workers: int, threads_per_worker: int) -> Dict[int, List[TranscriptionSegment]]:
+        """Transcribe segments concurrently in a process pool"""
+        total_segments = len(segments)
+        segment_results = {}
+        self._update_progress(0.2, f"并行转写 0/{total_segments}...")
+
+        # 复用 open_pool 打开的常驻进程池，否则为本次任务临时创建
+        executor = self._pool
+        if executor is None:
+            self.logger.info(f"启动并行转写：{workers}个进程，每进程{threads_per_worker}个线程")
+            executor = create_pool(self.config, workers, threads_per_worker)
+        self._arm_pool_cancel(executor)
+        futures = {
+            executor.submit(transcribe_in_worker, chunk): chunk
+            for chunk in segments
+        }
+        try:
+            with self._cancel.on_cancel(lambda: self._interrupt_pool(executor, futures)):
+                for completed, future in enumerate(as_completed(futures), 1):
+                    if self._cancel.cancelled:
+                        self.logger.warning("处理被用户取消")
+                        raise ProcessingCancelled()
+
+                    chunk = futures[future]
+                    try:
+                        segment_results[chunk.index] = self._complete_chunk(
+                            chunk, future.result(), [], result
+                        )
+                    except ConfidenceThresholdError as e:
+                        self.logger.warning(f"片段 {chunk.index + 1} 处理警告：{str(e)}")
+                        segment_results[chunk.index] = self._complete_chunk(chunk, [], [str(e)], result)
+
+                    progress = 0.2 + (0.7 * completed / total_segments)
+                    self._update_progress(progress, f"并行转写 {completed}/{total_segments}...")
+        finally:
+            if executor is self._pool:
+                for future in futures:
+                    future.cancel()
+            else:
+                # 取消时不等待仍在加载模型的工作进程，它们完成初始化后自行退出
+                executor.shutdown(wait=not self._cancel.cancelled, cancel_futures=True)
+        return segment_results
+
+    def _use_pipeline(self) -> bool:
+        """Whether decoding and transcription run as an overlapped pipeline"""
+        video_config = self.config['video_processing']
+        return (video_config['ffmpeg'].get('mode', 'segment') == 'audio' and
+                video_config.get('pipeline', {}).get('enabled', False))
+
+    def _transcribe_pipelined(self, video_path: str, result: ProcessingResult,
+                              segment_results: Dict[int, List[TranscriptionSegment]],
+                              workers: int, threads_per_worker: int) -> List[AudioChunk]:
+        """Decode, plan and transcribe concurrently; returns the chunks in plan order
+
+        With a checkpoint, every planned batch is saved before it is queued,
+        so an interrupted run resumes its saved chunks and continues decoding
+        where the saved plan ends.
+        """
+        pipeline_config = self.config['video_processing'].get('pipeline', {})
+        planner = StreamingChunkPlanner.from_config(self.config)
+        chunks: List[AudioChunk] = []
+        backlog: "deque[AudioChunk]" = deque()
+        if self._checkpoint is not None and self._checkpoint.has_plan and not self._checkpoint.plan_complete:
+            chunks, _ = self._checkpoint.load_plan()
+            planner.restore(self._checkpoint.stream_state)
+            completed = set(self._checkpoint.completed_indices())
+            for chunk in chunks:
+                if chunk.index in completed:
+                    segment_results[chunk.index], warnings = self._checkpoint.load_chunk(chunk.index)
+                    for warning in warnings:
+                        result.add_warning(warning)
+                    self._writer.submit(chunk, segment_results[chunk.index])
+                    chunk.audio = None
+                else:
+                    backlog.append(chunk)
+            self.logger.info(
+                f"从检查点恢复：跳过{len(chunks) - len(backlog)}/{len(chunks)}个已完成的块，"
+                f"从{planner.resume_offset:.1f}秒处继续解码"
+            )
+        elif self._checkpoint is not None:
+            # 没有分块计划时旧的块结果无法对应，全部丢弃
+            self._checkpoint.clear()
+
+        stream = PcmChunkStream(
+            video_path, planner,
+            queue_size=pipeline_config.get('queue_size', 4),
+            block_duration=pipeline_config.get('block_duration', 10),
+            cancel=self._cancel,
+            on_plan=self._checkpoint_streamed_plan if self._checkpoint is not None else None
+        )
+        executor = None
+        futures = {}
+        # 每个进程一个正在转写、一个排队的块，既不让进程空闲也不囤积音频
+        max_in_flight = workers * 2 if workers > 1 else 1
+        self.ffmpeg_logger.info(f"开始流式解码：{video_path}")
+        self._update_progress(0.2, "边解码边转写...")
+        stream.start()
+        try:
+            if workers > 1:
+                executor = self._pool
+                if executor is None:
+                    self.logger.info(f"启动并行转写：{workers}个进程，每进程{threads_per_worker}个线程")
+                    executor = create_pool(self.config, workers, threads_per_worker)
+                self._arm_pool_cancel(executor)
+
+            with self._cancel.on_cancel(lambda: self._interrupt_pool(executor, futures)):
+                stream_done = False
+                while not stream_done or futures:
+                    if self._cancel.cancelled:
+                        self.logger.warning("处理被用户取消")
+                        raise ProcessingCancelled()
+
+                    # 取出已规划的块；队列为空时短暂等待，避免忙等
+                    while not stream_done and len(futures) < max_in_flight:
+                        if backlog:
+                            # 先转写检查点中未完成的块
+                            chunk = backlog.popleft()
+                        else:
+                            try:
+                                chunk = stream.get(timeout=0.05 if futures else 0.5)
+                            except queue.Empty:
+                                break
+                            if chunk is None:
+                                stream_done = True
+                                self._finish_pipeline_plan(planner, chunks, result)
+                                break
+                            chunks.append(chunk)
+                        if executor is None:
+                            self._run_chunk(chunk, lambda: self._transcribe_segment(chunk), result, segment_results)
+                            self._report_pipeline_progress(stream, planner, chunk, len(segment_results))
+                        else:
+                            futures[executor.submit(transcribe_in_worker, chunk)] = chunk
+
+                    if futures:
+                        done, _ = wait(futures, timeout=0.5, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            # 取消后剩余的 future 已被撤销，不再读取结果
+                            self._cancel.raise_if_cancelled()
+                            chunk = futures.pop(future)
+                            self._run_chunk(chunk, future.result, result, segment_results)
+                            self._report_pipeline_progress(stream, planner, chunk, len(segment_results))
+        finally:
+            stream.close()
+            if executor is not None and executor is not self._pool:
+                executor.shutdown(wait=not self._cancel.cancelled, cancel_futures=True)
+            else:
+                for future in futures:
+                    future.cancel()
+        return chunks
+
+    def _arm_pool_cancel(self, executor: ProcessPoolExecutor):
+        """Clear the pool's shared cancel event before submitting the work of a new run"""
+        cancel_event = pool_cancel_event(executor)
+        if cancel_event is not None:
+            cancel_event.clear()
+
+    def _interrupt_pool(self, executor: Optional[ProcessPoolExecutor], futures: Dict):
+        """Withdraw queued chunks and make the workers abort the chunks they are transcribing"""
+        for future in list(futures):
+            future.cancel()
+        cancel_event = pool_cancel_event(executor) if executor is not None else None
+        if cancel_event is not None:
+            cancel_event.set()
+
+    def _run_chunk(self, chunk: AudioChunk, fetch: Callable[[], List[TranscriptionSegment]],
+                   result: ProcessingResult, segment_results: Dict[int, List[TranscriptionSegment]]):
+        """Obtain one chunk's segments, downgrading confidence failures to warnings"""
+        try:
+            segments = fetch()
+            segment_results[chunk.index] = self._complete_chunk(chunk, segments, [], result)
+        except ConfidenceThresholdError as e:
+            self.logger.warning(f"片段 {chunk.index + 1} 处理警告：{str(e)}")
+            segment_results[chunk.index] = self._complete_chunk(chunk, [], [str(e)], result)
+        # 转写完成后不再需要块音频，及时释放以保持流水线内存有界
+        chunk.audio = None
+
+    def _checkpoint_streamed_plan(self, chunks: List[AudioChunk], state: Dict):
+        """Save a batch of streamed chunks to the checkpoint; runs in the decoding thread"""
+        checkpoint = self._checkpoint
+        if checkpoint is None:
+            return
+        try:
+            with self._temp_job.reserve(sum(chunk.audio.nbytes for chunk in chunks), cancel=self._cancel):
+                checkpoint.append_plan(chunks, state)
+        except (StorageBudgetError, OSError) as e:
+            # 检查点只是加速手段，保存失败时放弃断点续传而不是让整个任务失败
+            self.logger.warning(f"保存检查点失败，本次不再保存：{str(e)}")
+            checkpoint.clear()
+            self._checkpoint = None
+
+    def _report_pipeline_progress(self, stream: PcmChunkStream, planner: StreamingChunkPlanner,
+                                  chunk: AudioChunk, completed: int):
+        """Report progress by the position of the transcribed audio in the source"""
+        total = stream.source_duration or planner.duration
+        fraction = min(1.0, chunk.end / total) if total else 0.0
+        self._update_progress(0.2 + 0.7 * fraction, f"流式转写 {completed} 块，{chunk.end:.0f}/{total:.0f}秒...")
+
+    def _finish_pipeline_plan(self, planner: StreamingChunkPlanner, chunks: List[AudioChunk],
+                              result: ProcessingResult):
+        """Record duration and long-silence warnings once decoding ends"""
+        result.audio_duration = planner.duration
+        silence_map = planner.silence_map
+        self.ffmpeg_logger.info(
+            f"静音检测完成：{len(silence_map.starts)}个静音区间，"
+            f"共{silence_map.total():.1f}/{silence_map.duration:.1f}秒"
+        )
+        silence_threshold = self.config['video_processing']['ffmpeg']['silence_threshold']
+        # 长时间静音需要人工检查
+        warnings = [
+            f"Long silence detected: {start:.1f}s-{end:.1f}s"
+            for start, end in silence_map.long_silences(silence_threshold)
+        ]
+        for warning in warnings:
+            result.add_warning(warning)
+        self.logger.info(f"分块规划完成：{len(chunks)}个块，音频时长{planner.duration:.1f}秒")
+        checkpoint = self._checkpoint
+        if checkpoint is not None:
+            checkpoint.finish_plan(warnings)
+
+    def _save_plan(self, chunks: List[AudioChunk], warnings: List[str], audio: Optional[np.ndarray]):
+        """Checkpoint the chunk plan, reserving temp space for the decoded audio it stores"""
+        try:
+            with self._temp_job.reserve(audio.nbytes if audio is not None else 0, cancel=self._cancel):
+                self._checkpoint.save_plan(chunks, warnings, audio)
+        except StorageBudgetError as e:
+            # 检查点只是加速手段，空间不足时放弃断点续传而不是让整个任务失败
+            self.logger.warning(f"临时空间不足，本次不保存检查点：{str(e)}")
+            self._checkpoint.clear()
+            self._checkpoint = None
+
+    def _complete_chunk(self, chunk: AudioChunk, segments: List[TranscriptionSegment],
+                        warnings: List[str], result: ProcessingResult) -> List[TranscriptionSegment]:
+        """Record a finished chunk: collect its warnings and checkpoint its result"""
+        # 重新解码后仍不可靠的区间转为警告，空文本占位段不写入结果
+        warnings = list(warnings) + [
+            f"Low confidence, needs review: {segment.start:.1f}s-{segment.end:.1f}s"
+            for segment in segments if segment.needs_review
+        ]
+        segments = [segment for segment in segments if segment.text]
+        for warning in warnings:
+            result.add_warning(warning)
+        # 流水线的解码线程在保存检查点失败时会将其置空，先取局部引用
+        checkpoint = self._checkpoint
+        if checkpoint is not None:
+            checkpoint.save_chunk(chunk.index, segments, warnings)
+        if self._writer is not None:
+            self._writer.submit(chunk, segments)
+        return segments
+
+    def _cache_options(self) -> dict:
+        """Collect every option that influences the transcription output"""
+        video_config = self.config['video_processing']
+        return {
+            'model_size': self.config['models']['whisper']['model_size'],
+            'language': video_config['whisper']['language'],
+            'task': video_config['whisper']['task'],
+            'logprob_threshold': video_config['whisper'].get('logprob_threshold', -1.0),
+            # 运行器设置（并发、超时）不影响转写结果
+            'ffmpeg': {key: value for key, value in video_config['ffmpeg'].items() if key != 'runner'},
+            'chunking': video_config.get('chunking', {}),
+            # 流式规划按解码块逐窗口切分，分块结果与一次性规划不同；队列长度只影响内存
+            'pipeline': {key: value for key, value in video_config.get('pipeline', {}).items()
+                         if key != 'queue_size'},
+            'engine': engine_name(self.config),
+            'engine_options': video_config.get('engine', {}).get(engine_name(self.config), {}),
+            'profile': self.profile.to_dict(),
+            'retry': video_config['whisper'].get('retry', {}),
+            'hallucination': video_config['whisper'].get('hallucination', {}),
+            'no_speech_threshold': video_config['whisper'].get('no_speech_threshold', 0.6),
+            'timeline': 'global'
+        }
+
+    def output_paths(self, video_path: str, output_name: Optional[str] = None) -> Tuple[Path, Path]:
+        """Return the (srt, txt) output paths for a video, named after output_name or the file stem"""
+        output_dir = Path(self.config['video_processing']['output_dir'])
+        base_name = output_name or Path(video_path).stem
+        return output_dir / f"{base_name}.srt", output_dir / f"{base_name}.txt"
+
+    @staticmethod
+    def job_name(video_path: str) -> str:
+        """Name of the temp/checkpoint directory of a video, unique per source path"""
+        # 不同目录下的同名视频不能共用临时目录和检查点
+        digest = hashlib.sha1(os.path.abspath(video_path).encode('utf-8')).hexdigest()[:8]
+        return f"{Path(video_path).stem}-{digest}"
+
     def _save_results(self, result: ProcessingResult):
         """Save transcription results to files"""
         self.logger.info("保存处理结果")
-        output_dir = Path(self.config['video_processing']['output_dir'])
-        base_name = result.video_path.stem
+        srt_path, text_path = self.output_paths(str(result.video_path), self._output_name)
         
         try:
             # Save SRT file
-            srt_path = output_dir / f"{base_name}.srt"
             srt_path.write_text(result.get_srt_content(), encoding='utf-8')
             result.srt_path = srt_path
             self.logger.debug(f"保存SRT文件：{srt_path}")
             
             # Save plain text file
-            text_path = output_dir / f"{base_name}.txt"
             text_path.write_text(result.get_full_text(), encoding='utf-8')
             result.text_path = text_path
             self.logger.debug(f"保存文本文件：{text_path}")
@@ -228,84 +745,217 @@ class VideoProcessor:
             self.logger.error(f"保存结果失败：{str(e)}")
             raise
 
-    def process_video(self, video_path: str) -> ProcessingResult:
-        """Process video file and generate transcription"""
+    @contextmanager
+    def _timed_stage(self, result: ProcessingResult, stage: str):
+        """Accumulate the wall time of a processing stage into result.timings"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            result.timings[stage] = result.timings.get(stage, 0.0) + time.perf_counter() - started
+
+    def process_video(self, video_path: str, output_name: Optional[str] = None) -> ProcessingResult:
+        """Process video file and generate transcription
+
+        Output files are named after output_name if given, else the file stem.
+        """
         self.logger.info(f"开始处理视频：{video_path}")
         
         if not os.path.exists(video_path):
             self.logger.error(f"视频文件不存在：{video_path}")
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
+        # Initialize result
+        result = ProcessingResult(
+            video_path=Path(video_path),
+            segments=[]
+        )
+
         self.processing = True
+        self._cancel.reset()
+        self._output_name = output_name
+        self._temp_job = self.storage.open_job(self.job_name(video_path))
+        started = time.perf_counter()
         try:
-            # Initialize result
-            result = ProcessingResult(
-                video_path=Path(video_path),
-                segments=[]
-            )
+            # Check the transcription cache before touching the model
+            cache_key = None
+            if self.cache is not None:
+                self._update_progress(0.05, "检查转写缓存...")
+                with self._timed_stage(result, "cache"):
+                    content_hash = self.cache.content_hash(video_path)
+                    cache_key = self.cache.make_key(content_hash, self._cache_options())
+                    cached = self.cache.get(cache_key)
+                if cached is not None:
+                    result.segments, result.warnings = cached
+                    self._update_progress(0.9, "生成输出文件...")
+                    with self._timed_stage(result, "output"):
+                        self._save_results(result)
+                    self._update_progress(1.0, "处理完成（缓存）")
+                    self.logger.info("视频处理完成（命中转写缓存）")
+                    return result
+
+            workers, threads_per_worker = resolve_pool_size(self.config, self.use_cuda)
+            if self._pool is not None:
+                workers = self._pool_workers
 
-            # Load Whisper model
+            # Load Whisper model (pool workers load their own copy)
             self._update_progress(0.1, "加载Whisper模型...")
-            if self.model is None:
-                device = "cuda" if self.use_cuda else "cpu"
-                if self.use_cuda:
-                    # 设置 CUDA 设备
-                    cuda_device = self.config['models']['whisper'].get('cuda_device_index', 0)
-                    torch.cuda.set_device(cuda_device)
-                    self.whisper_logger.info(f"使用 CUDA 设备 {cuda_device}")
-                
-                # 设置环境变量以禁用 Triton 警告
-                if not self.config['video_processing']['whisper'].get('use_triton', True):
-                    os.environ['TRITON_DISABLE_AUTO_MIXED_PRECISION'] = '1'
-                    os.environ['TRITON_DISABLE_DYNAMIC_PARALLELISM'] = '1'
-                
-                self.whisper_logger.info(f"加载Whisper模型：{self.config['models']['whisper']['model_size']} ({device})")
-                self.model = whisper.load_model(
-                    self.config['models']['whisper']['model_size'],
-                    device=device
+            if workers <= 1:
+                with self._timed_stage(result, "load_model"):
+                    self._load_model()
+
+            # Resume from a checkpoint of an interrupted run when possible
+            self._checkpoint = self._open_checkpoint(video_path)
+            segment_results = {}
+            with self._timed_stage(result, "prepare"):
+                if self._checkpoint is not None and self._checkpoint.has_plan and not self._checkpoint.plan_complete:
+                    # 解码中断的流式计划：流水线在转写阶段恢复已保存的分块并继续解码
+                    segments = None
+                elif self._checkpoint is not None and self._checkpoint.has_plan:
+                    self._update_progress(0.2, "从检查点恢复...")
+                    segments, warnings = self._checkpoint.load_plan()
+                    for warning in warnings:
+                        result.add_warning(warning)
+                    for index in self._checkpoint.completed_indices():
+                        segment_results[index], warnings = self._checkpoint.load_chunk(index)
+                        for warning in warnings:
+                            result.add_warning(warning)
+                    self.logger.info(f"从检查点恢复：跳过{len(segment_results)}/{len(segments)}个已完成的块")
+                elif self._use_pipeline():
+                    # 边解码边转写，分块在转写阶段逐个产生
+                    segments = None
+                else:
+                    # Process video segments
+                    self._update_progress(0.15, "处理视频分段...")
+                    segments = self._prepare_chunks(video_path, result)
+
+            language = self.config['video_processing']['whisper']['language']
+            # 拼接后的文本段先经过幻觉过滤再写出，避免重复循环的文本进入摘要
+            segment_filter = HallucinationFilter.from_config(self.config)
+            if segments is None:
+                self._writer = StreamingTranscriptWriter(
+                    *self.output_paths(video_path, output_name), language=language, segment_filter=segment_filter
                 )
+                with self._timed_stage(result, "transcribe"):
+                    segments = self._transcribe_pipelined(
+                        video_path, result, segment_results, workers, threads_per_worker
+                    )
+            else:
+                if segments:
+                    result.audio_duration = max(result.audio_duration, max(chunk.end for chunk in segments))
 
-            # Process video segments
-            self._update_progress(0.2, "处理视频分段...")
-            segments = self._split_video(video_path)
+                # Stream finished chunks to the output files in order
+                self._writer = StreamingTranscriptWriter(
+                    *self.output_paths(video_path, output_name), [chunk.index for chunk in segments], language,
+                    segment_filter
+                )
+                for chunk in segments:
+                    if chunk.index in segment_results:
+                        self._writer.submit(chunk, segment_results[chunk.index])
 
-            # Transcribe segments
-            total_segments = len(segments)
-            for i, segment_path in enumerate(segments, 1):
-                if not self.processing:
-                    self.logger.warning("处理被用户取消")
-                    raise InterruptedError("Processing cancelled")
+                # Transcribe segments
+                pending = [chunk for chunk in segments if chunk.index not in segment_results]
+                with self._timed_stage(result, "transcribe"):
+                    if pending and workers <= 1:
+                        segment_results.update(self._transcribe_sequential(pending, result))
+                    elif pending:
+                        segment_results.update(self._transcribe_parallel(
+                            pending, result, workers, threads_per_worker
+                        ))
 
-                progress = 0.2 + (0.7 * i / total_segments)
-                self._update_progress(progress, f"转写分段 {i}/{total_segments}...")
-                
-                try:
-                    segment_result = self._transcribe_segment(segment_path)
-                    result.segments.extend(segment_result)
-                except (SilenceDetectionError, ConfidenceThresholdError) as e:
-                    self.logger.warning(f"片段处理警告：{str(e)}")
-                    result.add_warning(str(e))
-
-            # Generate output files
+            # Output files were written incrementally; just finalise them
             self._update_progress(0.9, "生成输出文件...")
-            self._save_results(result)
+            with self._timed_stage(result, "output"):
+                self._writer.close()
+                # 写出器按块顺序拼接并去除重叠部分，结果即为全局时间轴上的最终文本段
+                result.segments = self._writer.segments
+                if segment_filter is not None and segment_filter.report.segments:
+                    result.filtered = segment_filter.report.to_dict()
+                    result.add_warning(segment_filter.report.summary())
+                    self.logger.info(
+                        f"幻觉过滤：去除{segment_filter.report.segments}个文本段，"
+                        f"{segment_filter.report.characters}个字符，约{segment_filter.report.tokens}个提示词元"
+                    )
+                if cache_key is not None:
+                    self.cache.put(cache_key, result.segments, result.warnings, content_hash)
+                result.srt_path, result.text_path = self._writer.srt_path, self._writer.text_path
+                if self._checkpoint is not None:
+                    self._checkpoint.clear()
+            self.logger.info(f"输出文件已保存：{result.srt_path}，{result.text_path}")
 
             self._update_progress(1.0, "处理完成")
             self.logger.info("视频处理完成")
             return result
 
+        except ProcessingCancelled:
+            self.logger.warning("视频处理已取消")
+            raise
         except Exception as e:
             self.logger.error(f"视频处理失败：{str(e)}", exc_info=True)
             raise
         finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._release_model()
+            # 失败或取消时若检查点仍有效，有意保留分段文件和检查点，以便下次从断点继续；
+            # 不再续传的遗留目录由临时空间预算按最久未用淘汰。成功时检查点已清除，全部清理
+            self._temp_job.cleanup(keep=self._checkpoint is not None and self._checkpoint.has_plan)
+            self._temp_job = None
+            self._output_name = None
+            self._checkpoint = None
             self.processing = False
+            result.timings['total'] = time.perf_counter() - started
+            self._record_cancel_latency(result)
+
+    def _record_cancel_latency(self, result: ProcessingResult):
+        """Log how long the run took to stop after cancel_processing"""
+        latency = self._cancel.elapsed()
+        if latency is None:
+            return
+        self.last_cancel_latency = latency
+        result.timings['cancel'] = latency
+        if latency > self.CANCEL_LATENCY_BUDGET:
+            self.logger.warning(f"取消耗时{latency:.2f}秒，超过预期的{self.CANCEL_LATENCY_BUDGET:.1f}秒")
+        else:
+            self.logger.info(f"取消完成，耗时{latency:.2f}秒")
+
+    def open_pool(self, pool: Optional[ProcessPoolExecutor] = None, workers: Optional[int] = None):
+        """Keep a transcription pool alive across process_video calls
+
+        Pass an existing pool (with its worker count) to share it between
+        processors; otherwise one is created from the parallel config.
+        """
+        if pool is None:
+            workers, threads_per_worker = resolve_pool_size(self.config, self.use_cuda)
+            pool = create_pool(self.config, workers, threads_per_worker) if workers > 1 else None
+            self._owns_pool = True
+        elif workers is None:
+            raise ValueError("workers must be given when sharing an existing pool")
+        self._pool = pool
+        self._pool_workers = workers if pool is not None else 1
+
+    def close(self):
+        """Shut down a pool opened by open_pool and release the model"""
+        if self._pool is not None and self._owns_pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        self._owns_pool = False
+        self._release_model()
 
     def cancel_processing(self):
-        """Cancel ongoing processing"""
+        """Cancel ongoing processing: stop FFmpeg, queued chunks and running decodes
+
+        The job's temp directory is kept on purpose when its checkpoint holds
+        a plan, so processing the same video again resumes where it stopped.
+        Unused leftovers are evicted by the temp storage budget.
+        """
         self.logger.info("取消处理")
         self.processing = False
+        self._cancel.cancel()
 
     @staticmethod
     def is_cuda_available() -> bool:
         """Check if CUDA is available on the system"""
+        import torch
         return torch.cuda.is_available()
\ No newline at end of file
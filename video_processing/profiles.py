@@ -0,0 +1,96 @@
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_PROFILE = "default"
+
+# 各 Whisper 模型的参数量（百万），用于在加载前估算内存占用
+WHISPER_PARAMETERS = {
+    'tiny': 39, 'base': 74, 'small': 244, 'medium': 769,
+    'large': 1550, 'large-v1': 1550, 'large-v2': 1550, 'large-v3': 1550
+}
+
+@dataclass(frozen=True)
+class InferenceProfile:
+    """Whisper inference settings: model precision and decoding options"""
+    name: str
+    quantize: bool = False
+    beam_size: Optional[int] = None
+    best_of: Optional[int] = 5
+    temperature: Tuple[float, ...] = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+    condition_on_previous_text: bool = True
+
+    @classmethod
+    def from_config(cls, config: dict, name: Optional[str] = None) -> 'InferenceProfile':
+        """Build the profile selected in video_processing.whisper (or the given name)"""
+        whisper_config = config['video_processing']['whisper']
+        name = name or whisper_config.get('profile', DEFAULT_PROFILE)
+        profiles = whisper_config.get('profiles', {})
+        if name not in profiles and name != DEFAULT_PROFILE:
+            raise ValueError(f"Unknown inference profile: {name}")
+
+        options = profiles.get(name) or {}
+        temperature = options.get('temperature', cls.temperature)
+        if isinstance(temperature, (int, float)):
+            temperature = (temperature,)
+        return cls(
+            name=name,
+            quantize=bool(options.get('quantize', False)),
+            beam_size=options.get('beam_size'),
+            best_of=options.get('best_of', cls.best_of),
+            temperature=tuple(float(t) for t in temperature),
+            condition_on_previous_text=options.get('condition_on_previous_text', True)
+        )
+
+    def decode_options(self) -> Dict[str, Any]:
+        """Keyword arguments for whisper's model.transcribe"""
+        options = {
+            'temperature': self.temperature,
+            'condition_on_previous_text': self.condition_on_previous_text
+        }
+        # beam_size 只作用于 temperature=0 的解码，best_of 只作用于回退后的采样解码
+        if self.beam_size is not None:
+            options['beam_size'] = self.beam_size
+        if self.best_of is not None:
+            options['best_of'] = self.best_of
+        return options
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable form used in cache keys"""
+        data = asdict(self)
+        data['temperature'] = list(self.temperature)
+        return data
+
+def quantize_model(model):
+    """Apply dynamic int8 quantisation to the Linear layers of a Whisper model in place"""
+    import torch
+    from torch import nn
+
+    # whisper 的 Linear 子类只在 forward 中转换权重精度，fp32 下与 nn.Linear 等价；
+    # 动态量化按精确类型匹配，因此先将其还原为 nn.Linear
+    for module in model.modules():
+        if isinstance(module, nn.Linear) and type(module) is not nn.Linear:
+            module.__class__ = nn.Linear
+
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+def estimate_model_bytes(model_size: str, quantized: bool = False) -> Optional[int]:
+    """Rough weight memory of a Whisper model before loading it, None for unknown sizes"""
+    params = WHISPER_PARAMETERS.get(model_size.replace('.en', ''))
+    if params is None:
+        return None
+    # fp32 每参数4字节；int8 量化只作用于线性层（约占参数的85%），其余仍为 fp32
+    bytes_per_param = 0.85 * 1 + 0.15 * 4 if quantized else 4
+    return int(params * 1e6 * bytes_per_param)
+
+def model_size_bytes(model) -> int:
+    """Estimate the memory held by a model's weights, including packed int8 weights"""
+    import torch
+
+    def _tensor_bytes(value) -> int:
+        if isinstance(value, torch.Tensor):
+            return value.numel() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(_tensor_bytes(item) for item in value)
+        return 0
+
+    return sum(_tensor_bytes(value) for value in model.state_dict().values())
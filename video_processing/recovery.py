@@ -0,0 +1,126 @@
+import copy
+import numpy as np
+from dataclasses import replace
+from typing import List, Optional, Tuple
+from .models import TranscriptionSegment
+from .audio import SAMPLE_RATE
+from .engines import TranscriptionEngine, create_engine
+from .exceptions import ProcessingCancelled
+from utils.logger.setup import get_whisper_logger
+
+class SegmentRecovery:
+    """Re-decodes only the low-confidence ranges of a chunk instead of discarding it
+
+    Each failing range is decoded again with a little context, first with
+    the configured retry temperatures and then, if set, with a larger
+    fallback model. The first attempt whose segments all pass replaces the
+    range; otherwise the best attempt is kept and marked needs_review.
+    """
+
+    def __init__(self, config: dict, engine: TranscriptionEngine):
+        self.config = config
+        self.engine = engine
+        self.logger = get_whisper_logger()
+        whisper_config = config['video_processing']['whisper']
+        retry_config = whisper_config.get('retry', {})
+        self.enabled = retry_config.get('enabled', False)
+        self.logprob_threshold = whisper_config.get('logprob_threshold', -1.0)
+        self.padding = float(retry_config.get('padding', 1.0))
+        self.temperatures = [float(t) for t in retry_config.get('temperatures', [0.2, 0.4, 0.6])]
+        self.fallback_model = retry_config.get('fallback_model')
+        self._fallback_engine: Optional[TranscriptionEngine] = None
+
+    def failure_reason(self, segment: TranscriptionSegment) -> Optional[str]:
+        """Why a segment fails the confidence checks, or None if it passes"""
+        if not segment.text:
+            return "empty text"
+        if segment.avg_logprob < self.logprob_threshold:
+            return f"avg_logprob {segment.avg_logprob:.2f} < {self.logprob_threshold}"
+        return None
+
+    def recover(self, audio: np.ndarray, segments: List[TranscriptionSegment],
+                language: str, task: str) -> List[TranscriptionSegment]:
+        """Replace failing runs of segments with re-decoded ones"""
+        failing = [self.failure_reason(segment) is not None for segment in segments]
+        if not any(failing):
+            return segments
+
+        recovered = []
+        position = 0
+        for first, last in self._failing_runs(failing):
+            recovered.extend(segments[position:first])
+            recovered.extend(self._retry_range(audio, segments[first:last], language, task))
+            position = last
+        recovered.extend(segments[position:])
+        return recovered
+
+    @staticmethod
+    def _failing_runs(failing: List[bool]) -> List[Tuple[int, int]]:
+        """[first, last) index ranges of consecutive failing segments"""
+        mask = np.concatenate(([0], np.asarray(failing, dtype=np.int8), [0]))
+        edges = np.diff(mask)
+        return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+    def _retry_range(self, audio: np.ndarray, failed: List[TranscriptionSegment],
+                     language: str, task: str) -> List[TranscriptionSegment]:
+        start, end = failed[0].start, failed[-1].end
+        self.logger.warning(
+            f"低置信度区间 {start:.1f}s-{end:.1f}s（{self.failure_reason(failed[0])}），重新解码该区间"
+        )
+        # 带少量上下文重新解码，只保留中点落在失败区间内的结果
+        offset = max(0.0, start - self.padding)
+        window = audio[int(offset * SAMPLE_RATE):int((end + self.padding) * SAMPLE_RATE)]
+
+        best, best_score = failed, self._score(failed)
+        for engine, temperature, label in self._attempts():
+            try:
+                candidate = [
+                    replace(segment, start=segment.start + offset, end=segment.end + offset)
+                    for segment in engine.transcribe(window, language=language, task=task,
+                                                     temperature=temperature)
+                ]
+            except ProcessingCancelled:
+                raise
+            except Exception as e:
+                self.logger.warning(f"重新解码失败（{label}）：{str(e)}")
+                continue
+            candidate = [s for s in candidate if start <= (s.start + s.end) / 2 <= end]
+            if candidate and all(self.failure_reason(s) is None for s in candidate):
+                self.logger.info(f"区间 {start:.1f}s-{end:.1f}s 重新解码成功（{label}）")
+                return candidate
+            score = self._score(candidate)
+            if score > best_score:
+                best, best_score = candidate, score
+
+        self.logger.warning(f"区间 {start:.1f}s-{end:.1f}s 重新解码后仍低于阈值，标记为需要人工检查")
+        flagged = [replace(segment, needs_review=True) for segment in best if segment.text]
+        if not flagged:
+            # 没有可用文本时保留一个空的占位段，仅用于标记需要检查的区间
+            flagged = [replace(failed[0], start=start, end=end, text="", needs_review=True)]
+        return flagged
+
+    def _attempts(self):
+        for temperature in self.temperatures:
+            yield self.engine, (temperature,), f"temperature={temperature}"
+        if self.fallback_model:
+            yield self._get_fallback_engine(), None, f"model={self.fallback_model}"
+
+    @staticmethod
+    def _score(segments: List[TranscriptionSegment]) -> float:
+        scored = [segment.avg_logprob for segment in segments if segment.text]
+        return float(np.mean(scored)) if scored else float('-inf')
+
+    def _get_fallback_engine(self) -> TranscriptionEngine:
+        if self._fallback_engine is None:
+            config = copy.deepcopy(self.config)
+            config['models']['whisper']['model_size'] = self.fallback_model
+            self._fallback_engine = create_engine(config, self.engine.device)
+            self._fallback_engine.cancel_event = self.engine.cancel_event
+        if not self._fallback_engine.is_loaded:
+            self._fallback_engine.load()
+        return self._fallback_engine
+
+    def release(self):
+        """Release the fallback model if one was loaded"""
+        if self._fallback_engine is not None:
+            self._fallback_engine.release()
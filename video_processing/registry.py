@@ -0,0 +1,196 @@
+import threading
+import time
+import yaml
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from .profiles import InferenceProfile, quantize_model, model_size_bytes
+from utils.logger.setup import get_logger, get_whisper_logger
+
+ModelKey = Tuple[str, str, bool]  # (model_size, device, quantized)
+
+@dataclass
+class _ModelEntry:
+    """A loaded model together with its bookkeeping"""
+    model: Any
+    size_bytes: int
+    refs: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+class ModelRegistry:
+    """Process-wide registry of loaded Whisper models with LRU eviction"""
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self.logger = get_logger("video.registry")
+            self.whisper_logger = get_whisper_logger()
+            self.memory_budget: Optional[int] = None
+            self._entries: "OrderedDict[ModelKey, _ModelEntry]" = OrderedDict()
+            self._lock = threading.Lock()
+            self._load_locks: Dict[ModelKey, threading.Lock] = {}
+            self._initialized = True
+
+    def set_memory_budget(self, budget_bytes: Optional[int]):
+        """Set the total memory budget for idle models (None disables eviction)"""
+        with self._lock:
+            self.memory_budget = budget_bytes
+            self._evict_locked()
+
+    @staticmethod
+    def _key(model_size: str, device: str, quantized: bool) -> ModelKey:
+        # 动态量化只支持 CPU，GPU 上始终使用原精度模型
+        return (model_size, device, quantized and device == "cpu")
+
+    def acquire(self, model_size: str, device: str, quantized: bool = False) -> Any:
+        """Return the model for (model_size, device, quantized), loading it if needed, and take a reference"""
+        key = self._key(model_size, device, quantized)
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # 同一模型只加载一次，其他线程等待加载完成
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(*key)
+
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                entry.refs += 1
+                entry.last_used = time.monotonic()
+                self._evict_locked()
+            return entry.model
+
+    def release(self, model_size: str, device: str, quantized: bool = False):
+        """Drop a reference taken by acquire; idle models stay cached until evicted"""
+        key = self._key(model_size, device, quantized)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs = max(0, entry.refs - 1)
+            entry.last_used = time.monotonic()
+            self._evict_locked()
+
+    def preload(self, model_size: str, device: Union[str, Callable[[], str]],
+                quantized: bool = False) -> threading.Thread:
+        """Warm a model in a background thread without holding a reference
+
+        device may be a callable, resolved in the background thread, so that
+        probing CUDA (and importing torch) does not block the caller. A
+        callable returning None skips the preload.
+        """
+        def _warm():
+            nonlocal device
+            try:
+                if callable(device):
+                    device = device()
+                    if device is None:
+                        return
+                self.acquire(model_size, device, quantized)
+                self.release(model_size, device, quantized)
+                self.logger.info(f"模型预热完成：{model_size} ({device})")
+            except Exception as e:
+                self.logger.warning(f"模型预热失败：{model_size} ({device}) - {str(e)}")
+
+        thread = threading.Thread(target=_warm, name=f"whisper-preload-{model_size}", daemon=True)
+        thread.start()
+        return thread
+
+    def loaded_models(self) -> Dict[ModelKey, int]:
+        """Return the reference count of every loaded model"""
+        with self._lock:
+            return {key: entry.refs for key, entry in self._entries.items()}
+
+    def clear(self):
+        """Unload every model without outstanding references"""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.refs == 0]:
+                self._unload_locked(key)
+
+    def _load(self, model_size: str, device: str, quantized: bool) -> _ModelEntry:
+        import whisper
+
+        variant = "int8" if quantized else "fp32"
+        self.whisper_logger.info(f"加载Whisper模型：{model_size} ({device}, {variant})")
+        started = time.perf_counter()
+        model = whisper.load_model(model_size, device=device)
+        if quantized:
+            model = quantize_model(model)
+        size_bytes = model_size_bytes(model)
+        self.whisper_logger.info(
+            f"模型加载完成：{model_size} ({variant})，{size_bytes / 1024 ** 2:.0f}MB，"
+            f"耗时{time.perf_counter() - started:.1f}秒"
+        )
+        return _ModelEntry(model=model, size_bytes=size_bytes)
+
+    def _evict_locked(self):
+        """Evict least recently used idle models until the budget is met"""
+        if self.memory_budget is None:
+            return
+        total = sum(entry.size_bytes for entry in self._entries.values())
+        # OrderedDict 按最近使用排序，从最久未使用的开始淘汰
+        for key in list(self._entries.keys()):
+            if total <= self.memory_budget:
+                break
+            entry = self._entries[key]
+            if entry.refs > 0:
+                continue
+            total -= entry.size_bytes
+            self._unload_locked(key)
+
+    def _unload_locked(self, key: ModelKey):
+        entry = self._entries.pop(key)
+        self.logger.info(f"卸载模型：{key[0]} ({key[1]}{', int8' if key[2] else ''})，释放{entry.size_bytes / 1024 ** 2:.0f}MB")
+        if key[1].startswith("cuda"):
+            import torch
+            del entry
+            torch.cuda.empty_cache()
+
+# 创建全局模型注册表
+model_registry = ModelRegistry()
+
+def configure_registry(config: dict):
+    """Apply the models.whisper.registry settings to the global registry"""
+    registry_config = config['models']['whisper'].get('registry', {})
+    budget_mb = registry_config.get('memory_budget_mb')
+    model_registry.set_memory_budget(int(budget_mb) * 1024 * 1024 if budget_mb else None)
+
+def preload_whisper_model(config_path: str = "config/settings.yaml") -> Optional[threading.Thread]:
+    """Warm the configured Whisper model at application startup if enabled
+
+    Only the main process's model is warmed: on CPU with several parallel
+    workers the pool workers load their own copies once the first
+    transcription starts.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    configure_registry(config)
+    whisper_config = config['models']['whisper']
+    if not whisper_config.get('registry', {}).get('preload', False):
+        return None
+
+    def _resolve_device() -> Optional[str]:
+        # 在后台线程中导入torch，不阻塞界面线程
+        if whisper_config.get('device') == "cuda":
+            import torch
+            if torch.cuda.is_available():
+                return f"cuda:{whisper_config.get('cuda_device_index', 0)}"
+        from .parallel import resolve_pool_size
+        workers, _ = resolve_pool_size(config, use_cuda=False)
+        if workers > 1:
+            model_registry.logger.info(f"CPU并行转写由{workers}个工作进程各自加载模型，跳过主进程预热")
+            return None
+        return "cpu"
+
+    profile = InferenceProfile.from_config(config)
+    return model_registry.preload(whisper_config['model_size'], _resolve_device, profile.quantize)
@@ -0,0 +1,107 @@
+import re
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Tuple
+from .audio import SAMPLE_RATE, frame_energy_db, silent_runs
+from .ffmpeg import _DURATION
+
+_SILENCE_START = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end: (-?[\d.]+)")
+
+@dataclass
+class SilenceMap:
+    """Silent intervals of a recording, stored as sorted start/end arrays in seconds"""
+    starts: np.ndarray
+    ends: np.ndarray
+    duration: float
+
+    @classmethod
+    def from_audio(cls, audio: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                   noise_db: float = -50.0, min_duration: float = 0.5,
+                   frame_length: float = 0.02) -> "SilenceMap":
+        """Build the map with a vectorised energy pass over decoded PCM"""
+        energy = frame_energy_db(audio, sample_rate, frame_length)
+        start_frames, end_frames = silent_runs(energy < noise_db)
+        starts = start_frames * frame_length
+        ends = end_frames * frame_length
+        keep = (ends - starts) >= min_duration
+        return cls(starts[keep], ends[keep], len(audio) / sample_rate)
+
+    @classmethod
+    def from_silencedetect(cls, stderr: str, duration: float = None) -> "SilenceMap":
+        """Build the map from the stderr of a single FFmpeg silencedetect pass"""
+        if duration is None:
+            match = _DURATION.search(stderr)
+            duration = (int(match.group(1)) * 3600 + int(match.group(2)) * 60
+                        + float(match.group(3))) if match else 0.0
+
+        starts = [max(0.0, float(value)) for value in _SILENCE_START.findall(stderr)]
+        ends = [float(value) for value in _SILENCE_END.findall(stderr)]
+        # 文件末尾的静音不会输出 silence_end
+        if len(ends) < len(starts):
+            ends.append(max(duration, starts[-1]))
+        return cls(np.asarray(starts, dtype=np.float64),
+                   np.asarray(ends[:len(starts)], dtype=np.float64),
+                   duration)
+
+    def window(self, start: float, end: float) -> "SilenceMap":
+        """Return the part of the map inside [start, end), rebased to start"""
+        mask = (self.ends > start) & (self.starts < end)
+        starts = np.clip(self.starts[mask], start, end) - start
+        ends = np.clip(self.ends[mask], start, end) - start
+        return SilenceMap(starts, ends, end - start)
+
+    def total(self) -> float:
+        """Total silent time in seconds"""
+        return float(np.sum(self.ends - self.starts))
+
+    def longest(self) -> float:
+        """Duration of the longest silent interval in seconds"""
+        if len(self.starts) == 0:
+            return 0.0
+        return float(np.max(self.ends - self.starts))
+
+    def long_silences(self, min_duration: float) -> List[Tuple[float, float]]:
+        """List silent intervals at least min_duration long"""
+        mask = (self.ends - self.starts) >= min_duration
+        return list(zip(self.starts[mask].tolist(), self.ends[mask].tolist()))
+
+    def speech_ranges(self, min_silence: float, padding: float = 0.2) -> List[Tuple[float, float]]:
+        """Return the non-silent ranges, treating only silences >= min_silence as gaps"""
+        mask = (self.ends - self.starts) >= min_silence
+        # 两侧各保留一小段静音，避免切掉词首词尾（窗口边界处无需保留）
+        gap_starts = self.starts[mask]
+        gap_ends = self.ends[mask]
+        gap_starts = np.where(gap_starts > 0.0, gap_starts + padding, gap_starts)
+        gap_ends = np.where(gap_ends < self.duration, gap_ends - padding, gap_ends)
+        valid = gap_ends > gap_starts
+        gap_starts, gap_ends = gap_starts[valid], gap_ends[valid]
+
+        bounds_start = np.concatenate(([0.0], gap_ends))
+        bounds_end = np.concatenate((gap_starts, [self.duration]))
+        keep = bounds_end > bounds_start
+        return list(zip(bounds_start[keep].tolist(), bounds_end[keep].tolist()))
+
+class SpeechLayout:
+    """Maps timestamps in condensed, silence-free audio back to the source timeline"""
+
+    def __init__(self, ranges: List[Tuple[float, float]]):
+        bounds = np.asarray(ranges, dtype=np.float64).reshape(-1, 2)
+        self.source_starts = bounds[:, 0]
+        self.lengths = bounds[:, 1] - bounds[:, 0]
+        self.condensed_starts = np.concatenate(([0.0], np.cumsum(self.lengths)[:-1]))
+
+    def gather(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """Concatenate the speech ranges of audio into one array"""
+        pieces = [
+            audio[int(start * sample_rate):int((start + length) * sample_rate)]
+            for start, length in zip(self.source_starts, self.lengths)
+        ]
+        return np.concatenate(pieces) if pieces else audio[:0]
+
+    def to_source(self, time: float, is_end: bool = False) -> float:
+        """Map a condensed-audio timestamp to the source timeline"""
+        side = 'left' if is_end else 'right'
+        index = max(0, int(np.searchsorted(self.condensed_starts, time, side=side)) - 1)
+        offset = min(max(0.0, time - self.condensed_starts[index]), self.lengths[index])
+        return float(self.source_starts[index] + offset)
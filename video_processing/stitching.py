@@ -0,0 +1,108 @@
+import re
+from dataclasses import replace
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+from .models import AudioChunk, TranscriptionSegment
+
+# 这些语言不以空格分词，按字符对齐
+CHARACTER_LANGUAGES = {"zh", "ja", "ko", "th"}
+
+class TranscriptStitcher:
+    """Joins per-chunk segments in chunk order and removes duplicates where chunks overlap
+
+    Chunks must be pushed in order. Where two chunks overlap, segments lying
+    wholly on the far side of the seam are dropped. When segments from both
+    chunks straddle the seam, the repeated text is trimmed by aligning the
+    tokens of the left segment's end with the right segment's start and the
+    two are merged; if they do not align, a segment whose midpoint is on
+    the wrong side of the seam is dropped.
+    """
+
+    def __init__(self, language: Optional[str] = None, min_match: Optional[int] = None,
+                 window: int = 40, slack: int = 3):
+        self.by_character = language in CHARACTER_LANGUAGES
+        self.min_match = min_match if min_match is not None else (4 if self.by_character else 2)
+        self.window = window
+        self.slack = slack
+        self._held: Optional[Tuple[AudioChunk, List[TranscriptionSegment]]] = None
+
+    def push(self, chunk: AudioChunk, segments: List[TranscriptionSegment]) -> List[TranscriptionSegment]:
+        """Add the next chunk and return the segments that can no longer change"""
+        if self._held is None:
+            self._held = (chunk, list(segments))
+            return []
+
+        previous, previous_segments = self._held
+        segments = list(segments)
+        if chunk.audio_start < previous.audio_end:
+            # 两块的音频有重叠：完全落在接缝另一侧的文本段由另一块负责
+            seam = (previous.end + chunk.start) / 2.0
+            previous_segments = [s for s in previous_segments if s.start < seam]
+            segments = [s for s in segments if s.end > seam]
+            if previous_segments and segments and previous_segments[-1].end > segments[0].start:
+                # 跨越接缝的两段按文本对齐合并；无法对齐时按中点去掉位于错误一侧的段
+                merged = self._merge_repeat(previous_segments[-1], segments[0])
+                if merged is not None:
+                    previous_segments[-1] = merged
+                    segments = segments[1:]
+                else:
+                    if (previous_segments[-1].start + previous_segments[-1].end) / 2.0 >= seam:
+                        previous_segments = previous_segments[:-1]
+                    if (segments[0].start + segments[0].end) / 2.0 < seam:
+                        segments = segments[1:]
+
+        self._held = (chunk, segments)
+        return previous_segments
+
+    def finish(self) -> List[TranscriptionSegment]:
+        """Return the segments of the last chunk"""
+        if self._held is None:
+            return []
+        segments = self._held[1]
+        self._held = None
+        return segments
+
+    def _tokens(self, text: str) -> List[re.Match]:
+        return list(re.finditer(r"\S" if self.by_character else r"\S+", text))
+
+    def _normalise(self, token: str) -> str:
+        return re.sub(r"[^\w]", "", token.lower())
+
+    def _merge_repeat(self, left: TranscriptionSegment,
+                      right: TranscriptionSegment) -> Optional[TranscriptionSegment]:
+        """Join two segments whose texts overlap at the seam; None if they do not align"""
+        left_tokens = self._tokens(left.text)[-self.window:]
+        right_tokens = self._tokens(right.text)
+        head = right_tokens[:self.window]
+        matcher = SequenceMatcher(
+            None,
+            [self._normalise(t.group()) for t in left_tokens],
+            [self._normalise(t.group()) for t in head],
+            autojunk=False
+        )
+        match = matcher.find_longest_match(0, len(left_tokens), 0, len(head))
+        # 只处理左段结尾与右段开头的重复，中间偶然相同的词语不算
+        if (match.size < self.min_match or
+                match.a + match.size < len(left_tokens) - self.slack or match.b > self.slack):
+            return None
+
+        # 左段在块末尾可能被截断，从对齐处起改用右段的文本（保留原文中的空格与标点）
+        cut_left = left_tokens[match.a + match.size - 1].end()
+        cut_right = head[match.b + match.size - 1].end()
+        return replace(
+            left,
+            end=max(left.end, right.end),
+            text=left.text[:cut_left] + right.text[cut_right:],
+            avg_logprob=min(left.avg_logprob, right.avg_logprob),
+            needs_review=left.needs_review or right.needs_review
+        )
+
+def stitch_chunks(chunks: List[AudioChunk], results: List[List[TranscriptionSegment]],
+                  language: Optional[str] = None) -> List[TranscriptionSegment]:
+    """Stitch the segments of all chunks in one pass"""
+    stitcher = TranscriptStitcher(language)
+    segments = []
+    for chunk, chunk_segments in zip(chunks, results):
+        segments.extend(stitcher.push(chunk, chunk_segments))
+    segments.extend(stitcher.finish())
+    return segments
@@ -0,0 +1,234 @@
+import os
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+from .exceptions import StorageBudgetError
+from .cancellation import CancellationToken
+from utils.logger.setup import get_logger
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of the files below path (0 if it does not exist)"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                continue  # 文件在遍历期间被删除
+    return total
+
+class TempJob:
+    """The intermediate files of one processing run
+
+    Everything lives in <temp_dir>/<name>. Intermediate audio chunks may go
+    to <fast_dir>/<name> instead. cleanup() removes both unless a
+    checkpoint still needs them.
+    """
+
+    def __init__(self, storage: 'TempStorage', name: str):
+        self.storage = storage
+        self.name = name
+        self.dir = storage.root / name
+        self.fast_dir = storage.fast_root / name if storage.fast_root is not None else None
+        self.reserved = 0
+
+    @property
+    def bytes(self) -> int:
+        """Bytes currently used by the job on disk and on the fast path"""
+        used = directory_size(self.dir)
+        if self.fast_dir is not None:
+            used += directory_size(self.fast_dir)
+        return used
+
+    def chunk_dir(self, expected_bytes: int = 0) -> Path:
+        """Directory for intermediate audio chunks: the fast path if it has room, else disk"""
+        directory = self.dir
+        if self.fast_dir is not None and self.storage.fast_has_room(expected_bytes):
+            directory = self.fast_dir
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    @contextmanager
+    def reserve(self, nbytes: int, on_disk: bool = True, cancel: Optional[CancellationToken] = None):
+        """Hold nbytes of the disk budget while the block writes them
+
+        Once the block ends the written files are counted by scanning, so the
+        reservation is dropped. Writes to the fast path need no reservation.
+        """
+        if not on_disk or nbytes <= 0:
+            yield
+            return
+        self.storage._reserve(self, nbytes, cancel)
+        try:
+            yield
+        finally:
+            self.storage._unreserve(self, nbytes)
+
+    def cleanup(self, keep: bool = False):
+        """Delete the job's files unless keep is set, and stop tracking the job"""
+        try:
+            if keep:
+                self.storage.logger.info(f"保留临时文件以便断点续传：{self.name}，{self.bytes / 1e6:.1f}MB")
+            else:
+                freed = self.bytes
+                shutil.rmtree(self.dir, ignore_errors=True)
+                if self.fast_dir is not None:
+                    shutil.rmtree(self.fast_dir, ignore_errors=True)
+                if freed:
+                    self.storage.logger.info(f"已清理临时文件：{self.name}，{freed / 1e6:.1f}MB")
+        finally:
+            self.storage._close_job(self)
+
+class TempStorage:
+    """Tracks and bounds the disk space used by intermediate files under temp_dir
+
+    Before a job writes a known amount, it reserves the bytes. When the
+    budget would be exceeded, the job directories left by earlier,
+    interrupted runs are evicted oldest first (on_full: evict). After that
+    the caller waits for other running jobs to free space, up to
+    wait_timeout. Only jobs of this Python process count as running, so
+    processors must share one instance per root through shared()/from_config.
+    """
+    _shared: Dict[Path, 'TempStorage'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None, on_full: str = "evict",
+                 wait_timeout: float = 600.0, fast_dir: Optional[str] = None,
+                 fast_min_free: int = 512 * 1024 * 1024):
+        self.logger = get_logger("video.storage")
+        self.root = Path(root)
+        self._jobs: Dict[str, TempJob] = {}
+        self._condition = threading.Condition()
+        self.configure(max_bytes, on_full, wait_timeout, fast_dir, fast_min_free)
+
+    @classmethod
+    def shared(cls, root: str, **settings) -> 'TempStorage':
+        """Return the process-wide manager of root, applying the given settings
+
+        Every job writing below one root must be known to the same manager,
+        otherwise eviction takes another manager's running job for a leftover.
+        """
+        key = Path(root).resolve()
+        with cls._shared_lock:
+            storage = cls._shared.get(key)
+            if storage is None:
+                storage = cls._shared[key] = cls(root, **settings)
+            else:
+                storage.configure(**settings)
+            return storage
+
+    def configure(self, max_bytes: Optional[int] = None, on_full: str = "evict",
+                  wait_timeout: float = 600.0, fast_dir: Optional[str] = None,
+                  fast_min_free: int = 512 * 1024 * 1024):
+        """Apply new budget settings; running jobs and reservations are kept"""
+        if on_full not in ("evict", "block"):
+            raise ValueError(f"Unknown temp storage policy: {on_full}")
+        with self._condition:
+            self.max_bytes = max_bytes
+            self.on_full = on_full
+            self.wait_timeout = wait_timeout
+            self.fast_root = Path(fast_dir) if fast_dir else None
+            self.fast_min_free = fast_min_free
+            self._condition.notify_all()
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'TempStorage':
+        """Return the shared manager for video_processing.temp_dir with the temp_storage settings"""
+        video_config = config['video_processing']
+        storage_config = video_config.get('temp_storage', {})
+        max_mb = storage_config.get('max_size_mb')
+        return cls.shared(
+            root=video_config['temp_dir'],
+            max_bytes=int(max_mb) * 1024 * 1024 if max_mb else None,
+            on_full=storage_config.get('on_full', 'evict'),
+            wait_timeout=float(storage_config.get('wait_timeout', 600)),
+            fast_dir=storage_config.get('fast_dir'),
+            fast_min_free=int(storage_config.get('fast_min_free_mb', 512)) * 1024 * 1024
+        )
+
+    def open_job(self, name: str) -> TempJob:
+        """Start tracking the temp files of a run"""
+        with self._condition:
+            job = TempJob(self, name)
+            self._jobs[name] = job
+            return job
+
+    def usage(self) -> int:
+        """Bytes used below temp_dir"""
+        return directory_size(self.root)
+
+    def fast_has_room(self, nbytes: int) -> bool:
+        """Whether the fast path can take nbytes and keep fast_min_free bytes free"""
+        try:
+            self.fast_root.mkdir(parents=True, exist_ok=True)
+            free = shutil.disk_usage(self.fast_root).free
+        except OSError as e:
+            self.logger.warning(f"内存盘路径不可用，改用磁盘：{str(e)}")
+            return False
+        if free - nbytes < self.fast_min_free:
+            self.logger.info(f"内存盘剩余空间不足（{free / 1e6:.0f}MB），分段音频改存磁盘")
+            return False
+        return True
+
+    def _reserve(self, job: TempJob, nbytes: int, cancel: Optional[CancellationToken]):
+        if self.max_bytes is None:
+            return
+        if nbytes > self.max_bytes:
+            raise StorageBudgetError(
+                f"Temp storage budget of {self.max_bytes / 1e6:.0f}MB cannot hold {nbytes / 1e6:.0f}MB"
+            )
+
+        deadline = time.monotonic() + self.wait_timeout
+        evicted = False
+        with self._condition:
+            while True:
+                reserved = sum(other.reserved for other in self._jobs.values())
+                if self.usage() + reserved + nbytes <= self.max_bytes:
+                    job.reserved += nbytes
+                    return
+                if self.on_full == "evict" and not evicted:
+                    # 先淘汰遗留的任务目录，只做一次，之后等待运行中的任务释放空间
+                    evicted = True
+                    self._evict(self.usage() + reserved + nbytes - self.max_bytes)
+                    continue
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                if time.monotonic() >= deadline:
+                    raise StorageBudgetError(
+                        f"Temp storage budget of {self.max_bytes / 1e6:.0f}MB still full after "
+                        f"waiting {self.wait_timeout:.0f}s for {nbytes / 1e6:.0f}MB"
+                    )
+                self.logger.debug(f"临时空间不足，等待其他任务释放：需要{nbytes / 1e6:.0f}MB")
+                self._condition.wait(0.5)
+
+    def _unreserve(self, job: TempJob, nbytes: int):
+        with self._condition:
+            job.reserved -= nbytes
+            self._condition.notify_all()
+
+    def _close_job(self, job: TempJob):
+        with self._condition:
+            if self._jobs.get(job.name) is job:
+                del self._jobs[job.name]
+            self._condition.notify_all()
+
+    def _evict(self, needed: int):
+        """Delete job directories not used by a running job, least recently modified first"""
+        candidates: List[Path] = []
+        if self.root.is_dir():
+            candidates = [path for path in self.root.iterdir() if path.is_dir() and path.name not in self._jobs]
+        candidates.sort(key=lambda path: path.stat().st_mtime)
+
+        freed = 0
+        for path in candidates:
+            if freed >= needed:
+                break
+            size = directory_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+            if self.fast_root is not None:
+                shutil.rmtree(self.fast_root / path.name, ignore_errors=True)
+            freed += size
+            self.logger.info(f"临时空间超出预算，淘汰遗留任务目录：{path}（{size / 1e6:.1f}MB）")
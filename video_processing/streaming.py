@@ -0,0 +1,279 @@
+import queue
+import threading
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from .exceptions import FFmpegError, ProcessingCancelled
+from .cancellation import CancellationToken
+from .ffmpeg import FFmpegProcess, ffmpeg_runner
+from .models import AudioChunk
+from .audio import SAMPLE_RATE, build_decode_command, pcm_to_float, slice_audio
+from .silence import SilenceMap
+from .chunking import plan_chunks
+from utils.logger.setup import get_ffmpeg_logger
+
+class StreamingChunkPlanner:
+    """Plans transcription chunks incrementally while PCM is still being decoded
+
+    Undecided audio is kept in a pending window. Once the window holds two
+    maximum chunk lengths it is planned with plan_chunks; every chunk except
+    a possibly unfinished last one is committed, and planning resumes from
+    the end of the committed audio, keeping the overlap before it as context.
+
+    Speech running into the end of a window is cut every target_duration,
+    since its full length is not known yet; plan_chunks divides a finished
+    range evenly instead. Plans therefore match plan_chunks wherever speech
+    ranges end inside a window and differ by at most a chunk otherwise.
+    """
+
+    def __init__(self, target_duration: float, max_duration: float, skip_silence: float,
+                 noise_db: float = -50.0, min_pause: float = 0.3, overlap: float = 0.0,
+                 sample_rate: int = SAMPLE_RATE):
+        self.target_duration = target_duration
+        self.max_duration = max(max_duration, target_duration)
+        self.skip_silence = skip_silence
+        self.noise_db = noise_db
+        self.min_pause = min_pause
+        self.overlap = overlap
+        self.sample_rate = sample_rate
+        self._pending = np.empty(0, dtype=np.float32)
+        self._pending_offset = 0  # 待规划窗口起点（样本数）
+        self._context = 0  # 窗口开头已规划、仅作为重叠上下文保留的样本数
+        self._total_samples = 0
+        self._silence_starts: List[float] = []
+        self._silence_ends: List[float] = []
+        self._next_index = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'StreamingChunkPlanner':
+        """Build a planner from the chunking and ffmpeg config sections"""
+        video_config = config['video_processing']
+        chunking_config = video_config.get('chunking', {})
+        target_duration = chunking_config.get('target_duration', 120)
+        return cls(
+            target_duration=target_duration,
+            max_duration=chunking_config.get('max_duration', target_duration * 1.5),
+            skip_silence=video_config['ffmpeg'].get('min_skip_silence', 2.0),
+            noise_db=video_config['ffmpeg'].get('silence_noise_db', -50),
+            min_pause=chunking_config.get('min_pause', 0.3),
+            overlap=chunking_config.get('overlap', 0.0)
+        )
+
+    def feed(self, samples: np.ndarray) -> List[AudioChunk]:
+        """Append decoded samples and return the chunks that became final"""
+        self._total_samples += len(samples)
+        self._pending = np.concatenate((self._pending, samples))
+        if len(self._pending) - self._context < 2 * self.max_duration * self.sample_rate:
+            return []
+        return self._plan(final=False)
+
+    def finish(self) -> List[AudioChunk]:
+        """Plan the remaining audio once decoding has ended"""
+        if len(self._pending) <= self._context:
+            return []
+        return self._plan(final=True)
+
+    def _plan(self, final: bool) -> List[AudioChunk]:
+        window = self._pending
+        offset = self._pending_offset / self.sample_rate
+        context = self._context / self.sample_rate
+        silence_map = SilenceMap.from_audio(
+            window, self.sample_rate, noise_db=self.noise_db, min_duration=self.min_pause
+        )
+        duration = silence_map.duration
+        # 只规划上下文之后的新音频，上下文仅用于块首的重叠
+        ranges = [
+            (start + context, end + context)
+            for start, end in plan_chunks(silence_map.window(context, duration), self.target_duration,
+                                          self.max_duration, self.skip_silence, open_end=not final)
+        ]
+
+        if final:
+            horizon = duration
+        elif not ranges:
+            # 整个窗口都是静音：保留末尾一段，以便识别延续到下一窗口的长静音
+            horizon = max(context, duration - self.skip_silence)
+        elif ranges[-1][1] < duration:
+            # 最后一段语音之后是长静音，所有块都已完整
+            horizon = ranges[-1][1]
+        else:
+            # 最后一块可能延续到尚未解码的音频中，留待下次规划
+            horizon = ranges[-1][0]
+            ranges = ranges[:-1]
+
+        chunks = slice_audio(window, ranges, self.sample_rate, self.overlap, offset)
+        for chunk in chunks:
+            chunk.index = self._next_index
+            chunk.silence = silence_map.window(chunk.audio_start - offset, chunk.audio_end - offset)
+            self._next_index += 1
+
+        # 只记录已确定部分的静音区间，其余部分在下一窗口中重新检测
+        committed = silence_map.window(context, horizon)
+        self._silence_starts.extend((committed.starts + context + offset).tolist())
+        self._silence_ends.extend((committed.ends + context + offset).tolist())
+
+        horizon_samples = int(horizon * self.sample_rate)
+        keep_from = max(0, horizon_samples - int(self.overlap * self.sample_rate))
+        self._pending = window[keep_from:].copy()
+        self._pending_offset += keep_from
+        self._context = horizon_samples - keep_from
+        return chunks
+
+    def state(self) -> Dict:
+        """Planning state after the last committed chunk, enough to continue with restore()"""
+        return {
+            'pending_offset': self._pending_offset,
+            'context': self._context,
+            'next_index': self._next_index,
+            'silence_starts': list(self._silence_starts),
+            'silence_ends': list(self._silence_ends)
+        }
+
+    def restore(self, state: Dict):
+        """Continue planning from a saved state; feed audio decoded from resume_offset on"""
+        # 未规划的音频没有保存，从待规划窗口起点重新解码
+        self._pending = np.empty(0, dtype=np.float32)
+        self._pending_offset = int(state['pending_offset'])
+        self._context = int(state['context'])
+        self._total_samples = self._pending_offset
+        self._next_index = int(state['next_index'])
+        self._silence_starts = list(state['silence_starts'])
+        self._silence_ends = list(state['silence_ends'])
+
+    @property
+    def resume_offset(self) -> float:
+        """Source time of the first sample the planner expects to be fed"""
+        return self._total_samples / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio decoded so far"""
+        return self._total_samples / self.sample_rate
+
+    @property
+    def silence_map(self) -> SilenceMap:
+        """Silence map of the committed audio, merged across planning windows"""
+        starts = np.asarray(self._silence_starts, dtype=np.float64)
+        ends = np.asarray(self._silence_ends, dtype=np.float64)
+        if len(starts) > 1:
+            # 合并在窗口边界处被截断的相邻静音区间
+            run_starts = np.flatnonzero(np.concatenate(([True], starts[1:] > ends[:-1] + 1e-3)))
+            ends = np.maximum.reduceat(ends, run_starts)
+            starts = starts[run_starts]
+        return SilenceMap(starts, ends, self.duration)
+
+class PcmChunkStream:
+    """Decodes a media file with FFmpeg in a background thread and hands out chunks as they are planned
+
+    Chunks pass through a bounded queue: when transcription falls behind,
+    the producer blocks, stops reading FFmpeg's stdout, and the pipe in
+    turn pauses FFmpeg, so buffered audio stays bounded. Decoding starts at
+    the planner's resume_offset. on_plan, if given, is called in the
+    producer thread with each batch of new chunks and the planner state
+    after it, before the chunks are queued.
+    """
+
+    _DONE = object()
+
+    def __init__(self, video_path: str, planner: StreamingChunkPlanner,
+                 queue_size: int = 4, block_duration: float = 10.0,
+                 cancel: Optional[CancellationToken] = None,
+                 on_plan: Optional[Callable[[List[AudioChunk], Dict], None]] = None):
+        self.video_path = video_path
+        self.planner = planner
+        self.cancel = cancel
+        self.on_plan = on_plan
+        self.block_bytes = max(2, int(block_duration * planner.sample_rate)) * 2
+        self.logger = get_ffmpeg_logger()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._process: Optional[FFmpegProcess] = None
+        self._skip_bytes = 0
+        self._thread = threading.Thread(target=self._produce, name="pcm-chunk-stream", daemon=True)
+
+    def start(self):
+        """Start FFmpeg and the producer thread"""
+        # 反压时 FFmpeg 会随转写进度暂停，总时长不可预估，因此不设超时；
+        # 取消时运行器立即结束 FFmpeg，生产线程随即读到 EOF 退出
+        # -ss 只精确到毫秒：从续传点之前的整毫秒处解码，再丢弃多出的样本，保证样本对齐
+        sample_rate = self.planner.sample_rate
+        resume_sample = int(round(self.planner.resume_offset * sample_rate))
+        start_ms = resume_sample * 1000 // sample_rate
+        self._skip_bytes = (resume_sample - start_ms * sample_rate // 1000) * 2
+        command = build_decode_command(self.video_path, sample_rate, start=start_ms / 1000 or None)
+        self._process = ffmpeg_runner.open(command, timeout=None, cancel=self.cancel)
+        self._thread.start()
+
+    @property
+    def source_duration(self) -> Optional[float]:
+        """Duration of the source reported by FFmpeg, once known"""
+        return self._process.duration if self._process is not None else None
+
+    def get(self, timeout: Optional[float] = None) -> Optional[AudioChunk]:
+        """Return the next chunk, None once the stream is exhausted
+
+        Raises queue.Empty when no chunk arrives within timeout, and
+        re-raises any error of the producer thread.
+        """
+        item = self._queue.get(timeout=timeout)
+        if item is self._DONE:
+            # 放回结束标记，重复调用时仍返回 None
+            self._queue.put(item)
+            return None
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def close(self):
+        """Stop the producer and FFmpeg; safe to call more than once"""
+        self._stop.set()
+        if self._process is not None:
+            self._process.kill()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self._process is not None:
+            self._process.close()
+
+    def _put(self, item) -> bool:
+        # 队列已满时阻塞（反压），但定期检查是否已被取消
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _emit(self, chunks: List[AudioChunk]) -> bool:
+        if chunks and self.on_plan is not None:
+            self.on_plan(chunks, self.planner.state())
+        for chunk in chunks:
+            if not self._put(chunk):
+                return False
+        return True
+
+    def _produce(self):
+        try:
+            stdout = self._process.stdout
+            if self._skip_bytes:
+                stdout.read(self._skip_bytes)
+            while not self._stop.is_set():
+                data = stdout.read(self.block_bytes)
+                if not data:
+                    break
+                if not self._emit(self.planner.feed(pcm_to_float(data[:len(data) // 2 * 2]))):
+                    return
+
+            if self._stop.is_set() or (self.cancel is not None and self.cancel.cancelled):
+                return
+            self._process.wait()
+            self._process.check()
+
+            if not self._emit(self.planner.finish()):
+                return
+            self.logger.info(f"音频解码完成，时长{self.planner.duration:.1f}秒")
+            self._put(self._DONE)
+        except ProcessingCancelled:
+            return
+        except Exception as e:
+            self.logger.error(f"流式解码失败：{str(e)}")
+            self._put(e if isinstance(e, FFmpegError) else FFmpegError(f"Failed to extract audio: {str(e)}"))
@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .models import TranscriptionSegment, SegmentStore, AudioChunk
+from .stitching import TranscriptStitcher
+from .hallucination import HallucinationFilter
+
+class StreamingTranscriptWriter:
+    """Appends SRT and plain-text entries to disk as chunks are finalised, in chunk order
+
+    Without chunk_order, chunks are written in index order 0, 1, 2, ... which
+    suits pipelines where the total number of chunks is not known up front.
+    Chunks pass through a TranscriptStitcher, so the overlap between
+    neighbouring chunks is written once, and then through the optional
+    hallucination filter.
+    """
+
+    def __init__(self, srt_path: Path, text_path: Path, chunk_order: Optional[List[int]] = None,
+                 language: Optional[str] = None, segment_filter: Optional[HallucinationFilter] = None):
+        self.srt_path = Path(srt_path)
+        self.text_path = Path(text_path)
+        self._srt_file = open(self.srt_path, 'w', encoding='utf-8')
+        self._text_file = open(self.text_path, 'w', encoding='utf-8')
+        self._chunk_order = list(chunk_order) if chunk_order is not None else None
+        self._next_position = 0
+        self._pending: Dict[int, Tuple[AudioChunk, List[TranscriptionSegment]]] = {}
+        self._stitcher = TranscriptStitcher(language)
+        self._filter = segment_filter
+        self._segments = SegmentStore()
+        self._closed = False
+
+    def submit(self, chunk: AudioChunk, segments: List[TranscriptionSegment]):
+        """Hand over a finished chunk; it is written once all earlier chunks are written"""
+        self._pending[chunk.index] = (chunk, segments)
+        # 并行转写时块可能乱序完成，只写出连续完成的前缀
+        while True:
+            if self._chunk_order is None:
+                index = self._next_position
+            elif self._next_position < len(self._chunk_order):
+                index = self._chunk_order[self._next_position]
+            else:
+                break
+            if index not in self._pending:
+                break
+            self._write_segments(self._stitcher.push(*self._pending.pop(index)))
+            self._next_position += 1
+
+    def _write_segments(self, segments: List[TranscriptionSegment]):
+        batch = SegmentStore.from_segments(segments)
+        if self._filter is not None:
+            batch = self._filter.apply(batch)
+        if batch:
+            self._srt_file.write(batch.to_srt(first_index=len(self._segments) + 1))
+            self._text_file.write(batch.to_text() + "\n")
+            self._segments.extend(batch)
+        # 每个块写完立即落盘，便于界面实时读取
+        self._srt_file.flush()
+        self._text_file.flush()
+
+    @property
+    def entry_count(self) -> int:
+        """Number of subtitle entries written so far"""
+        return len(self._segments)
+
+    @property
+    def segments(self) -> SegmentStore:
+        """The stitched segments written so far, on the global timeline"""
+        return self._segments
+
+    def close(self):
+        """Write the segments still held for stitching and close both output files"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._write_segments(self._stitcher.finish())
+        finally:
+            self._srt_file.close()
+            self._text_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class TranscriptTail:
+    """Reads text appended to a transcript file since the last poll"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._offset = 0
+
+    def read_new(self) -> str:
+        """Return complete lines appended since the previous call"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return ""
+
+        # 只消费到最后一个换行符，避免截断多字节字符或半行文本
+        end = data.rfind(b"\n")
+        if end < 0:
+            return ""
+        self._offset += end + 1
+        return data[:end + 1].decode('utf-8', errors='replace')